@@ -1,17 +1,27 @@
-from time import perf_counter
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Union
 
+import polars as pl
+from polars import DataFrame, LazyFrame
 from tabulate import tabulate
 
 from .compare.compare import Difftool
 from .comparison_result import ComparisonResult
-from .config import BeetlConfig
-from .diff import DiffCalculator
+from .config import BeetlConfig, SyncConfiguration
+from .constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
+from .diff import DiffCalculator, RangeChecksum, RowHashManifest, SortedMergeDiff
+from .execution import SyncExecutor
+from .instrumentation import (
+    ConsoleSink,
+    Instrumentation,
+    InstrumentationSink,
+    JsonFileSink,
+    PrometheusTextfileSink,
+    SyncInstrumentation,
+)
 from .result import Result, SyncResult
 from .transformers import run_transformers
 
-BENCHMARK = []
-
 
 class Beetl:
     """The main class for BeETL. This class is responsible for orchestrating the ETL process."""
@@ -19,8 +29,14 @@ class Beetl:
     config: Union[BeetlConfig, None] = None
     """Holds the BeETL Configuration"""
 
-    def __init__(self, config: BeetlConfig):
+    sinks: list[InstrumentationSink] = None
+    """Receive the spans recorded for every phase of every sync, in addition to the sinks from the configuration"""
+
+    def __init__(
+        self, config: BeetlConfig, sinks: Optional[list[InstrumentationSink]] = None
+    ):
         self.config = config
+        self.sinks = list(sinks or [])
 
     @classmethod
     def from_yaml(cls, path: str, encoding: str = "utf-8") -> "Beetl":
@@ -48,16 +64,18 @@ class Beetl:
         """
         return cls(BeetlConfig.from_json_file(path, encoding))
 
-    def benchmark(self, text: str) -> None:
-        """Inserts a benchmark into the log"""
-        BENCHMARK.append({"text": text, "perf": perf_counter()})
+    def _create_instrumentation(self) -> Instrumentation:
+        """Creates the instrumentation for one run from the configured sinks and the sinks passed to the constructor"""
+        settings = self.config.instrumentation
+        sinks: list[InstrumentationSink] = []
+        if settings.console:
+            sinks.append(ConsoleSink())
+        if settings.json_file:
+            sinks.append(JsonFileSink(settings.json_file))
+        if settings.prometheus_textfile:
+            sinks.append(PrometheusTextfileSink(settings.prometheus_textfile))
 
-        if len(BENCHMARK) > 1:
-            print(
-                BENCHMARK[-1]["text"]
-                + ": "
-                + str(round(BENCHMARK[-1]["perf"] - BENCHMARK[-2]["perf"], 5))
-            )
+        return Instrumentation([*sinks, *self.sinks])
 
     def sync(
         self, dry_run: bool = False, generate_update_diff: bool = False
@@ -70,7 +88,7 @@ class Beetl:
 
         Returns:
             ComparisonResult: If the argument dry_run was passed as true, returns a list of ComparisionResult objects that contain the create, update and delete dataframes that would have been used by the destination if the dry_run argument was false.
-            Result: A Result object containing the amount of inserts, updates and deletes for each sync
+            Result: A Result object containing the amount of inserts, updates and deletes for each sync, and the instrumentation summary of the run
             list[tuple[list[DataFrame], set[str]]]: If generate_update_diff is set to true, returns a list of tuples containing the differences between the source and destination update dataframes and a set with the keys that have differences across the whole dataframe.
 
         The following steps will be performed:
@@ -83,143 +101,451 @@ class Beetl:
 
         4. Execute the respective insert, update and delete queries
 
+        Syncs run in configuration order, syncs that declare dependsOn run after the syncs they depend on.
+        When execution.maxWorkers is greater than 1, independent syncs run concurrently.
+        When execution.concurrentFetch is set, step 1 and 2 run concurrently for the source and the destination of each sync.
+        When the sync is lazy, step 1 and 2 only build a query plan that is executed during step 3.
+        When the sync uses sortedMerge, step 1 to 4 are repeated for every chunk of the data.
+        When the sync has a manifest, the destination is only read for periodic reconciliations,
+        otherwise the source is compared with the row hashes stored by the previous run.
+        When the sync uses rangeChecksum, step 1 only retrieves the key ranges whose checksums differ.
+        The results are always returned in configuration order.
+
+        Every step is recorded as a span and handed to the instrumentation sinks.
         """
-        dry_run_results = []
-        generate_update_diff_results = []
-        self.benchmark("Starting sync and retrieving source data")
-        allAmounts = []
-        for i, sync in enumerate(self.config.sync_list, 1):
-            start = perf_counter()
-            if sync.name != "":
-                print(f"Starting sync: {sync.name}")
-            else:
-                print(f"Starting sync {i}")
+        instrumentation = self._create_instrumentation()
+        executor = SyncExecutor(
+            self.config.execution.max_workers,
+            self.config.execution.source_concurrency,
+        )
+        try:
+            outcomes = executor.run(
+                self.config.sync_list,
+                lambda index, sync: self._sync_one(
+                    index,
+                    sync,
+                    dry_run,
+                    generate_update_diff,
+                    instrumentation.for_sync(sync.name or f"sync {index}"),
+                ),
+            )
+        finally:
+            summary = instrumentation.finish()
+
+        if generate_update_diff or dry_run:
+            return outcomes
+
+        print(
+            "\r\n\r\n"
+            + tabulate(outcomes, headers=["Sync", "Inserts", "Updates", "Deletes"])
+        )
+
+        return SyncResult(outcomes, summary)
+
+    @staticmethod
+    def _load_source(
+        sync: SyncConfiguration, instrumentation: SyncInstrumentation
+    ) -> Union[DataFrame, LazyFrame]:
+        """Retrieves and transforms the source data of a sync."""
+        with instrumentation.span("fetch_source") as span:
             sync.source.connect()
-            source_data = sync.source.query(sync.sourceConfig)
+            if sync.lazy:
+                source_data = sync.source.query_lazy(sync.sourceConfig)
+            else:
+                source_data = span.measure(sync.source.query(sync.sourceConfig))
             sync.source.disconnect()
-            self.benchmark("Finished data retrieval from source")
 
-            sync.destination.connect()
-            destination_data = sync.destination.query(sync.destinationConfig)
-            self.benchmark("Finished data retrieval from destination")
+        return run_transformers(
+            source_data, sync.sourceTransformers, instrumentation, "transform_source"
+        )
 
-            self.benchmark("Starting source data transformation")
-            transformedSource = run_transformers(source_data, sync.sourceTransformers)
-            self.benchmark(
-                "Finished source data transformation, starting destination transformation"
-            )
-            transformedDestination = run_transformers(
-                destination_data, sync.destinationTransformers
-            )
+    @staticmethod
+    def _load_destination(
+        sync: SyncConfiguration, instrumentation: SyncInstrumentation
+    ) -> Union[DataFrame, LazyFrame]:
+        """Retrieves and transforms the destination data of a sync.
+        The destination is left connected since it is used for the database operations.
+        """
+        with instrumentation.span("fetch_destination") as span:
+            sync.destination.connect()
+            if sync.lazy:
+                destination_data = sync.destination.query_lazy(sync.destinationConfig)
+            else:
+                destination_data = span.measure(
+                    sync.destination.query(sync.destinationConfig)
+                )
 
-            self.benchmark("Finished data transformation before comparison")
+        return run_transformers(
+            destination_data,
+            sync.destinationTransformers,
+            instrumentation,
+            "transform_destination",
+        )
 
-            self.benchmark("Starting comparison")
-            unique_columns = tuple(
-                column.name for column in sync.comparisonColumns if column.unique
-            )
-            comparison_columns = tuple(
+    @staticmethod
+    def _load_differing_ranges(
+        sync: SyncConfiguration, instrumentation: SyncInstrumentation
+    ) -> tuple[DataFrame, DataFrame]:
+        """Retrieves the rows of the key ranges whose checksums differ between the source and destination.
+        The destination is left connected since it is used for the database operations.
+        """
+        unique_column = next(
+            column.name for column in sync.comparisonColumns if column.unique
+        )
+        range_checksum = RangeChecksum(
+            sync.source,
+            sync.destination,
+            unique_column,
+            tuple(
                 column.name
                 for column in sync.comparisonColumns
-                if column.name not in unique_columns
-            )
+                if column.name != unique_column
+            ),
+            sync.range_checksum.buckets,
+            sync.range_checksum.leaf_rows,
+        )
 
-            if len(unique_columns) == 0:
-                raise ValueError(
-                    "You need to specify at least one unique column in the sync.comparisonColumns field"
+        sync.source.connect()
+        sync.destination.connect()
+        try:
+            with instrumentation.span("range_checksum") as span:
+                ranges = range_checksum.differing_ranges()
+                span.rows = len(ranges)
+            with instrumentation.span("fetch_source") as span:
+                source_data = span.measure(
+                    range_checksum.fetch_ranges(sync.source, ranges)
+                )
+            with instrumentation.span("fetch_destination") as span:
+                destination_data = span.measure(
+                    range_checksum.fetch_ranges(sync.destination, ranges)
                 )
+        finally:
+            sync.source.disconnect()
 
-            diff_calculator = DiffCalculator(
-                sync.name,
-                transformedSource,
-                transformedDestination,
-                sync.comparisonColumns,
+        return source_data, destination_data
+
+    def _sync_one(
+        self,
+        index: int,
+        sync: SyncConfiguration,
+        dry_run: bool,
+        generate_update_diff: bool,
+        instrumentation: SyncInstrumentation,
+    ) -> Union[
+        list[Union[str, int]], ComparisonResult, tuple[list[DataFrame], set[str]]
+    ]:
+        """Runs a single sync, see sync() for a description of the arguments and the steps performed.
+
+        Returns:
+            tuple[list[DataFrame], set[str]]: The update diff, if generate_update_diff is set to true.
+            ComparisonResult: The comparison result, if dry_run is set to true.
+            list[Union[str, int]]: The name of the sync followed by the amount of inserts, updates and deletes.
+        """
+        if sync.name != "":
+            print(f"Starting sync: {sync.name}")
+        else:
+            print(f"Starting sync {index}")
+
+        if sync.sorted_merge:
+            return self._sync_sorted_merge(
+                sync, dry_run, generate_update_diff, instrumentation
             )
-            create, update, delete = diff_calculator.get_create_update_delete_for_sync()
-            self.benchmark("Successfully extracted operations from dataset")
 
-            load_and_compare = perf_counter() - start
-            print(f"Load and compare took {load_and_compare} seconds")
+        manifest = (
+            RowHashManifest(
+                sync.manifest.path,
+                sync.comparisonColumns,
+                sync.manifest.reconcile_every,
+            )
+            if sync.manifest
+            else None
+        )
+        read_destination = (
+            manifest is None or generate_update_diff or manifest.requires_full_read()
+        )
 
-            amount = {}
+        if sync.range_checksum:
+            transformedSource, transformedDestination = self._load_differing_ranges(
+                sync, instrumentation
+            )
+        elif not read_destination:
+            transformedSource = self._load_source(sync, instrumentation)
+            sync.destination.connect()
+        elif self.config.execution.concurrent_fetch:
+            with ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="beetl-fetch"
+            ) as pool:
+                source_future = pool.submit(self._load_source, sync, instrumentation)
+                destination_future = pool.submit(
+                    self._load_destination, sync, instrumentation
+                )
+                transformedSource = source_future.result()
+                transformedDestination = destination_future.result()
+        else:
+            transformedSource = self._load_source(sync, instrumentation)
+            transformedDestination = self._load_destination(sync, instrumentation)
+
+        unique_columns = tuple(
+            column.name for column in sync.comparisonColumns if column.unique
+        )
+        comparison_columns = tuple(
+            column.name
+            for column in sync.comparisonColumns
+            if column.name not in unique_columns
+        )
 
-            print(
-                f"Insert: {len(create)}, Update: {len(update)}, Delete: {len(delete)}"
+        if len(unique_columns) == 0:
+            raise ValueError(
+                "You need to specify at least one unique column in the sync.comparisonColumns field"
             )
 
-            if generate_update_diff:
-                generate_update_diff_results.append(
-                    Difftool.diff_update(
-                        update,
-                        transformedDestination,
-                        comparison_columns,
-                        unique_columns,
-                    )
+        with instrumentation.span("diff") as span:
+            if read_destination:
+                diff_calculator = DiffCalculator(
+                    sync.name,
+                    transformedSource,
+                    transformedDestination,
+                    sync.comparisonColumns,
+                    sync.streaming,
+                    sync.diff_engine,
                 )
-                continue
-
-            if dry_run:
-                dry_run_results.append(
-                    ComparisonResult(
-                        run_transformers(create, sync.insertionTransformers),
-                        run_transformers(update, sync.insertionTransformers),
-                        run_transformers(delete, sync.deletionTransformers),
-                    )
+                create, update, delete = (
+                    diff_calculator.get_create_update_delete_for_sync()
+                )
+            else:
+                create, update, delete = manifest.diff(sync.name, transformedSource)
+            span.rows = len(create) + len(update) + len(delete)
+
+        print(f"Insert: {len(create)}, Update: {len(update)}, Delete: {len(delete)}")
+
+        if generate_update_diff:
+            with instrumentation.span("update_diff"):
+                if isinstance(transformedDestination, LazyFrame):
+                    transformedDestination = transformedDestination.collect()
+                return Difftool.diff_update(
+                    update,
+                    transformedDestination,
+                    comparison_columns,
+                    unique_columns,
                 )
-                sync.destination.disconnect()
-                continue
 
-            if sync.diff_destination_instance is not None:
+        if dry_run:
+            sync.destination.disconnect()
+            return ComparisonResult(
+                run_transformers(
+                    create,
+                    sync.insertionTransformers,
+                    instrumentation,
+                    "transform_insert",
+                ),
+                run_transformers(
+                    update,
+                    sync.insertionTransformers,
+                    instrumentation,
+                    "transform_update",
+                ),
+                run_transformers(
+                    delete,
+                    sync.deletionTransformers,
+                    instrumentation,
+                    "transform_delete",
+                ),
+            )
+
+        if sync.diff_destination_instance is not None:
+            with instrumentation.span("store_diff") as span:
                 diff = diff_calculator.create_diff(sync.diff_transformers)
+                span.rows = diff.stats.inserts + diff.stats.updates + diff.stats.deletes
                 sync.diff_destination_instance.connect()
                 sync.diff_destination_instance.store_diff(diff)
 
-            self.benchmark("Starting database operations")
-            self.benchmark("Starting deletes")
-            amount["deletes"] = 0
-            if len(delete):
-                amount["deletes"] = sync.destination.delete(
-                    run_transformers(delete, sync.deletionTransformers)
-                )
+        if read_destination:
+            update = diff_calculator.get_updates_with_unchanged_columns()
+
+        try:
+            amount = self._apply_changes(sync, create, update, delete, instrumentation)
+        except Exception:
+            if manifest is not None:
+                manifest.invalidate()
+            raise
+
+        if manifest is not None:
+            with instrumentation.span("store_manifest"):
+                if read_destination:
+                    manifest.stage(transformedSource)
+                manifest.commit(read_destination)
+
+        print("Inserted: " + str(amount["inserts"]))
+        print("Updated: " + str(amount["updates"]))
+        print("Deleted: " + str(amount["deletes"]))
+
+        sync.destination.disconnect()
+        if sync.diff_destination_instance:
+            sync.diff_destination_instance.disconnect()
+
+        return [sync.name, *[amount["inserts"], amount["updates"], amount["deletes"]]]
+
+    @staticmethod
+    def _apply_changes(
+        sync: SyncConfiguration,
+        create: DataFrame,
+        update: DataFrame,
+        delete: DataFrame,
+        instrumentation: SyncInstrumentation,
+    ) -> dict[str, int]:
+        """Transforms the changes and writes them to the destination.
+        The rows to update may list their unchanged columns, which is removed for destinations that always write whole rows.
 
-            self.benchmark("Finished deletes, starting inserts")
-            amount["inserts"] = 0
-            if len(create):
-                amount["inserts"] = sync.destination.insert(
-                    run_transformers(create, sync.insertionTransformers)
-                )
+        Returns:
+            dict[str, int]: The amount of inserts, updates and deletes reported by the destination.
+        """
+        amount = {}
 
-            self.benchmark("Finished inserts, starting updates")
+        amount["deletes"] = 0
+        if len(delete):
+            delete = run_transformers(
+                delete, sync.deletionTransformers, instrumentation, "transform_delete"
+            )
+            with instrumentation.span("delete") as span:
+                amount["deletes"] = sync.destination.delete(span.measure(delete))
 
-            amount["updates"] = 0
-            if len(update):
-                amount["updates"] = sync.destination.update(
-                    run_transformers(update, sync.insertionTransformers)
-                )
+        amount["inserts"] = 0
+        if len(create):
+            create = run_transformers(
+                create, sync.insertionTransformers, instrumentation, "transform_insert"
+            )
+            with instrumentation.span("insert") as span:
+                amount["inserts"] = sync.destination.insert(span.measure(create))
+
+        amount["updates"] = 0
+        if len(update):
+            if not sync.destination.supports_partial_updates:
+                update = update.drop(BEETL_UNCHANGED_COLUMNS_IDENTIFIER, strict=False)
+            update = run_transformers(
+                update, sync.insertionTransformers, instrumentation, "transform_update"
+            )
+            with instrumentation.span("update") as span:
+                amount["updates"] = sync.destination.update(span.measure(update))
+
+        return amount
+
+    @staticmethod
+    def _transform_chunks(
+        chunks: Iterable[DataFrame],
+        transformers: list,
+        instrumentation: SyncInstrumentation,
+        side: str,
+    ) -> Iterator[DataFrame]:
+        """Fetches and transforms the chunks of one side of a sync one at a time."""
+        chunks = iter(chunks)
+        while True:
+            with instrumentation.span(f"fetch_{side}") as span:
+                chunk = span.measure(next(chunks, None))
+            if chunk is None:
+                return
+            yield run_transformers(
+                chunk, transformers, instrumentation, f"transform_{side}"
+            )
 
-            self.benchmark("Finished updates, sync finished")
+    def _sync_sorted_merge(
+        self,
+        sync: SyncConfiguration,
+        dry_run: bool,
+        generate_update_diff: bool,
+        instrumentation: SyncInstrumentation,
+    ) -> Union[list[Union[str, int]], ComparisonResult]:
+        """Runs a sync by merging the sorted chunks of the source and the destination.
+        The changes are written chunk by chunk, so only a few chunks are held in memory at a time.
+        For dry runs the changes of all chunks are gathered into one ComparisonResult.
+        """
+        if generate_update_diff:
+            raise ValueError(
+                "generate_update_diff is not supported for syncs using sortedMerge"
+            )
 
-            print("Inserted: " + str(amount["inserts"]))
-            print("Updated: " + str(amount["updates"]))
-            print("Deleted: " + str(amount["deletes"]))
+        amount = {"inserts": 0, "updates": 0, "deletes": 0}
+        dry_run_changes = {"inserts": [], "updates": [], "deletes": []}
 
-            allAmounts.append(
-                [sync.name, *[amount["inserts"], amount["updates"], amount["deletes"]]]
+        sync.source.connect()
+        sync.destination.connect()
+        try:
+            merge = SortedMergeDiff(
+                sync.name,
+                self._transform_chunks(
+                    sync.source.query_chunks(sync.sourceConfig, sync.chunk_size),
+                    sync.sourceTransformers,
+                    instrumentation,
+                    "source",
+                ),
+                self._transform_chunks(
+                    sync.destination.query_chunks(
+                        sync.destinationConfig, sync.chunk_size
+                    ),
+                    sync.destinationTransformers,
+                    instrumentation,
+                    "destination",
+                ),
+                sync.comparisonColumns,
+                sync.diff_engine,
             )
-
+            chunks = iter(merge)
+            while True:
+                with instrumentation.span("diff") as span:
+                    diff_calculator = next(chunks, None)
+                    if diff_calculator is None:
+                        break
+                    create, update, delete = (
+                        diff_calculator.get_create_update_delete_for_sync()
+                    )
+                    span.rows = len(create) + len(update) + len(delete)
+
+                if dry_run:
+                    dry_run_changes["inserts"].append(create)
+                    dry_run_changes["updates"].append(update)
+                    dry_run_changes["deletes"].append(delete)
+                    continue
+
+                chunk_amount = self._apply_changes(
+                    sync,
+                    create,
+                    diff_calculator.get_updates_with_unchanged_columns(),
+                    delete,
+                    instrumentation,
+                )
+                for key, value in chunk_amount.items():
+                    amount[key] += value or 0
+        finally:
+            sync.source.disconnect()
             sync.destination.disconnect()
-            if sync.diff_destination_instance:
-                sync.diff_destination_instance.disconnect()
-
-        if generate_update_diff:
-            return generate_update_diff_results
 
         if dry_run:
-            return dry_run_results
+            create, update, delete = (
+                pl.concat(frames, how="diagonal_relaxed") if frames else DataFrame()
+                for frames in dry_run_changes.values()
+            )
+            return ComparisonResult(
+                run_transformers(
+                    create,
+                    sync.insertionTransformers,
+                    instrumentation,
+                    "transform_insert",
+                ),
+                run_transformers(
+                    update,
+                    sync.insertionTransformers,
+                    instrumentation,
+                    "transform_update",
+                ),
+                run_transformers(
+                    delete,
+                    sync.deletionTransformers,
+                    instrumentation,
+                    "transform_delete",
+                ),
+            )
 
-        print(
-            "\r\n\r\n"
-            + tabulate(allAmounts, headers=["Sync", "Inserts", "Updates", "Deletes"])
-        )
+        print("Inserted: " + str(amount["inserts"]))
+        print("Updated: " + str(amount["updates"]))
+        print("Deleted: " + str(amount["deletes"]))
 
-        return SyncResult(allAmounts)
+        return [sync.name, *[amount["inserts"], amount["updates"], amount["deletes"]]]
@@ -1,5 +1,9 @@
+from typing import Union
+
 import polars as pl
 
+from ..diff.row_hash import normalize_types
+
 
 class Difftool:
 
@@ -10,10 +14,12 @@ class Difftool:
         column_names_props: list[str],
         key_columns: list[str],
         ignore_dates=False,
-    ) -> tuple[list[pl.DataFrame], set[str]]:
+        compact=False,
+    ) -> tuple[Union[list[pl.DataFrame], pl.DataFrame], set[str]]:
         """
         This function compares two dataframes and returns a list of dataframes with the differences and a set with the keys that have differences across the whole dataframe.
-        It is not very efficient, but very helpful when doing data validation on a sync that is going to affect an already existing dataset.
+        The rows are matched with one join on the key columns and compared column by column, so it is usable for large update sets.
+        It is very helpful when doing data validation on a sync that is going to affect an already existing dataset.
 
         Args:
             update (pl.DataFrame): The dataframe returned by the beetl comparer containing the items going to be updated.
@@ -21,72 +27,109 @@ class Difftool:
             column_names_props (list[str]): The list of column names that are going to be compared.
             key_columns (list[str]): The list of columns that are going to be used as keys.
             ignore_dates (bool, optional): If true, it will ignore columns that have "date" in their name. Defaults to False.
+            compact (bool, optional): If true, the differences are returned as one dataframe with a row per differing value instead of a dataframe per row. Defaults to False.
 
         Returns:
             tuple[list[pl.DataFrame], set[str]]: A tuple containing a list of dataframes with the differences and a set with the keys that have differences across the whole dataframe
+            tuple[pl.DataFrame, set[str]]: If compact is true, a dataframe with the key columns and the columns "column", "update" and "destination", where the values are converted to strings, and the set of keys that differ
         """
-        column_names = [*column_names_props]
+        column_names = [name for name in column_names_props if name not in key_columns]
         if ignore_dates:
             column_names = [name for name in column_names if "date" not in name.lower()]
 
-        calcultated_dataframe_diffs = []
-        keys_that_differ_across_whole_dataset = set()
-
-        for row_index in range(update.height):
-            current_row_keys_dataframe = update.select(key_columns)[row_index]
-            current_update_dataframe_row = update.join(
-                current_row_keys_dataframe, on=key_columns
-            ).select(column_names)
-            current_destination_dataframe_row = destination.join(
-                current_row_keys_dataframe, on=key_columns
-            ).select(column_names)
-
-            multiple_rows_found_using_keys = (
-                current_update_dataframe_row.height > 1
-                or current_destination_dataframe_row.height > 1
-            )
-            if multiple_rows_found_using_keys:
+        update_rows = update.select(*key_columns, *column_names)
+        # Only the destination rows of the updated keys are compared, duplicates elsewhere don't matter
+        destination_rows = destination.select(*key_columns, *column_names).join(
+            update_rows.select(key_columns), on=key_columns, how="semi"
+        )
+
+        for dataset, rows in (
+            ("update", update_rows),
+            ("destination", destination_rows),
+        ):
+            duplicated = rows.select(pl.struct(key_columns).is_duplicated()).to_series()
+            if duplicated.any():
                 raise Exception(
-                    f"Multiple rows were found when using the keys {key_columns} for row index {row_index} in the update dataset. This is not allowed since it will cause beetl to miss or overwrite data that should't be overwritten."
+                    f"Multiple rows were found when using the keys {key_columns} for row index {duplicated.arg_true()[0]} in the {dataset} dataset. This is not allowed since it will cause beetl to miss or overwrite data that should't be overwritten."
                 )
 
-            current_row_comparison_dataframe = (
-                current_update_dataframe_row == current_destination_dataframe_row
-            )
-            current_row_comparison_dict = current_row_comparison_dataframe.to_dict()
-            keys_that_differ_in_current_row = []
-            for key, value in current_row_comparison_dict.items():
-                if not value[0]:
-                    keys_that_differ_in_current_row.append(key)
-
-            key_values_for_current_row = list(
-                map(str, list(current_row_keys_dataframe.to_dicts()[0].values()))
-            )
+        update_rows, destination_rows = normalize_types(
+            update_rows, destination_rows, column_names
+        )
+        destination_names = {name: f"{name}__destination" for name in column_names}
+        joined = update_rows.join(
+            destination_rows.rename(destination_names),
+            on=key_columns,
+            how="left",
+        )
+
+        differences = joined.select(
+            pl.col(name).ne_missing(pl.col(destination_names[name]))
+            for name in column_names
+        )
+        row_has_diff = differences.select(
+            pl.any_horizontal(pl.all()) if column_names else pl.lit(False)
+        ).to_series()
+        keys_that_differ_across_whole_dataset = {
+            name for name in column_names if differences[name].any()
+        }
 
-            current_diff_dataframe = pl.DataFrame().with_columns(
-                pl.Series("dataset", ["update", "destination"]),
-                pl.Series(
-                    "keys", [key_values_for_current_row, key_values_for_current_row]
+        joined = joined.filter(row_has_diff)
+        differences = differences.filter(row_has_diff)
+
+        if compact:
+            return (
+                Difftool._long_format(
+                    joined, differences, column_names, destination_names, key_columns
                 ),
+                keys_that_differ_across_whole_dataset,
             )
-            current_row_has_diff = False
-            for key in keys_that_differ_in_current_row:
-                value1 = current_update_dataframe_row[key][0]
-                value2 = current_destination_dataframe_row[key][0]
-                if value1 is None and value2 is None:
-                    continue
-                if value1 == value2:
-                    continue
-                series = pl.Series(key, [value1, value2])
-                current_diff_dataframe = current_diff_dataframe.with_columns(series)
-                current_row_has_diff = True
-
-            if not current_row_has_diff:
-                continue
-
-            calcultated_dataframe_diffs.append(current_diff_dataframe)
-            keys_that_differ_across_whole_dataset.update(
-                keys_that_differ_in_current_row
+
+        calcultated_dataframe_diffs = []
+        for row, row_differences in zip(
+            joined.iter_rows(named=True), differences.iter_rows()
+        ):
+            key_values_for_current_row = [str(row[key]) for key in key_columns]
+            calcultated_dataframe_diffs.append(
+                pl.DataFrame().with_columns(
+                    pl.Series("dataset", ["update", "destination"]),
+                    pl.Series(
+                        "keys", [key_values_for_current_row, key_values_for_current_row]
+                    ),
+                    *[
+                        pl.Series(name, [row[name], row[destination_names[name]]])
+                        for name, differs in zip(column_names, row_differences)
+                        if differs
+                    ],
+                )
             )
 
         return (calcultated_dataframe_diffs, keys_that_differ_across_whole_dataset)
+
+    @staticmethod
+    def _long_format(
+        joined: pl.DataFrame,
+        differences: pl.DataFrame,
+        column_names: list[str],
+        destination_names: dict[str, str],
+        key_columns: list[str],
+    ) -> pl.DataFrame:
+        """Creates one row per differing value, with the values converted to strings."""
+        schema = {
+            **{key: joined.schema[key] for key in key_columns},
+            "column": pl.String,
+            "update": pl.String,
+            "destination": pl.String,
+        }
+        frames = [
+            joined.filter(differences[name]).select(
+                *key_columns,
+                pl.lit(name, pl.String).alias("column"),
+                pl.col(name).cast(pl.String, strict=False).alias("update"),
+                pl.col(destination_names[name])
+                .cast(pl.String, strict=False)
+                .alias("destination"),
+            )
+            for name in column_names
+        ]
+        return pl.concat([pl.DataFrame(schema=schema), *frames])
@@ -1,2 +1,9 @@
-from .config_base import BeetlConfig, SyncConfiguration
+from .config_base import (
+    BeetlConfig,
+    ExecutionConfig,
+    InstrumentationConfig,
+    ManifestConfig,
+    RangeChecksumConfig,
+    SyncConfiguration,
+)
 from .v1.v1_config import BeetlConfigV1
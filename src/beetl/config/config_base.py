@@ -1,5 +1,5 @@
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Literal
 
 import polars as pl
@@ -40,6 +40,40 @@ class ChangeDetectionConfig:
     webhookPayload: Dict[str, str] = None
 
 
+@dataclass
+class ExecutionConfig:
+    """How the syncs of a configuration are scheduled"""
+
+    max_workers: int = 1
+    source_concurrency: Dict[str, int] = field(default_factory=dict)
+    concurrent_fetch: bool = False
+
+
+@dataclass
+class InstrumentationConfig:
+    """Where the spans recorded during a run are sent"""
+
+    console: bool = True
+    json_file: str = None
+    prometheus_textfile: str = None
+
+
+@dataclass
+class ManifestConfig:
+    """Where the row hashes of the destination are kept between runs"""
+
+    path: str
+    reconcile_every: int = 10
+
+
+@dataclass
+class RangeChecksumConfig:
+    """How the differing key ranges are searched for when the checksums are calculated by the databases"""
+
+    buckets: int = 64
+    leaf_rows: int = 10_000
+
+
 @dataclass
 class SyncConfiguration:
     """The configuration for a single sync between two sources"""
@@ -61,6 +95,18 @@ class SyncConfiguration:
     diff_destination_instance: SourceInterface = None
     diff_transformers: list[TransformerConfiguration] = None
 
+    source_name: str = ""
+    destination_name: str = ""
+    diff_destination_name: str = ""
+    depends_on: list[str] = None
+    lazy: bool = False
+    streaming: bool = False
+    diff_engine: str = "join"
+    sorted_merge: bool = False
+    chunk_size: int = 100_000
+    manifest: ManifestConfig = None
+    range_checksum: RangeChecksumConfig = None
+
     def __post_init__(self) -> None:
         self.source.config = self.sourceConfig
         self.destination.config = self.destinationConfig
@@ -72,6 +118,8 @@ class BeetlConfig:
     version: Literal["V1"]
     sources: Dict[str, SourceSettings]
     sync_list: List[SyncConfiguration]
+    execution: ExecutionConfig
+    instrumentation: InstrumentationConfig
 
     def __init__(self, config: dict) -> None:
         # Set version to keep track of changes
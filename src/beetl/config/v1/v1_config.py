@@ -3,9 +3,17 @@ import json
 import os
 
 from ...sources import Sources
+from ...transformers import leading_filters, referenced_columns
 from ...transformers.interface import TransformerConfiguration
 from ...typings import ComparisonColumn
-from ..config_base import BeetlConfig, SyncConfiguration
+from ..config_base import (
+    BeetlConfig,
+    ExecutionConfig,
+    InstrumentationConfig,
+    ManifestConfig,
+    RangeChecksumConfig,
+    SyncConfiguration,
+)
 from .v1_schema import BeetlConfigSchemaV1
 
 
@@ -39,6 +47,8 @@ class BeetlConfigV1(BeetlConfig):
         BeetlConfigV1.validate_config(config)
 
         self.sources = self.initialize_sources(config)
+        self.execution = self.initialize_execution(config)
+        self.instrumentation = self.initialize_instrumentation(config)
 
         if len(config.get("sync", "")) == 0:
             raise ValueError("The configuration file is missing the 'sync' section.")
@@ -76,6 +86,7 @@ class BeetlConfigV1(BeetlConfig):
             raw_diff_section = sync.get("diff", {})
             raw_diff_destination = raw_diff_section.get("destination", None)
             diff_instance = None
+            diff_name = ""
             if raw_diff_destination:
                 diff_name = raw_diff_destination.get("name", None)
                 diff_instance = copy.deepcopy(self.sources.get(diff_name, None))
@@ -85,6 +96,22 @@ class BeetlConfigV1(BeetlConfig):
                     )
                 diff_instance.set_diff_config(raw_diff_destination)
 
+            if sync.get("sortedMerge", False) and (diff_instance or sync.get("lazy")):
+                raise ValueError(
+                    "The sortedMerge option can not be combined with diff tracking or the lazy option."
+                )
+
+            manifest = None
+            if sync.get("manifest"):
+                if diff_instance or sync.get("sortedMerge", False):
+                    raise ValueError(
+                        "The manifest option can not be combined with diff tracking or the sortedMerge option."
+                    )
+                manifest = ManifestConfig(
+                    path=sync["manifest"]["path"],
+                    reconcile_every=sync["manifest"].get("reconcileEvery", 10),
+                )
+
             comparisonColumnsConf = sync.get("comparisonColumns", None)
             if not comparisonColumnsConf:
                 raise ValueError(
@@ -117,6 +144,17 @@ class BeetlConfigV1(BeetlConfig):
                     "The comparisonColumns must be a list of dictionaries containing the mandatory keys 'name', 'type', and optionally 'unique'. Or a dictionary with the column names as key and types as values, where the first key is treated as the unique column."
                 )
 
+            column_types = {column.name: column.type for column in comparisonColumns}
+            source_instance.column_types = destination_instance.column_types = (
+                column_types
+            )
+
+            range_checksum = None
+            if sync.get("rangeChecksum") is not None:
+                range_checksum = self.initialize_range_checksum(
+                    sync, source_instance, destination_instance, comparisonColumns
+                )
+
             syncConfig = SyncConfiguration(
                 name=sync.get("name", ""),
                 source=source_instance,
@@ -125,6 +163,17 @@ class BeetlConfigV1(BeetlConfig):
                 destinationConfig=sync["destinationConfig"],
                 comparisonColumns=comparisonColumns,
                 diff_destination_instance=diff_instance,
+                source_name=source_name,
+                destination_name=destination_name,
+                diff_destination_name=diff_name,
+                depends_on=sync.get("dependsOn", []),
+                lazy=sync.get("lazy", False),
+                streaming=sync.get("streaming", False),
+                diff_engine=sync.get("diffEngine", "join"),
+                sorted_merge=sync.get("sortedMerge", False),
+                chunk_size=sync.get("chunkSize", 100_000),
+                manifest=manifest,
+                range_checksum=range_checksum,
             )
 
             source_instance = destination_instance = None
@@ -187,8 +236,133 @@ class BeetlConfigV1(BeetlConfig):
                         )
                     )
 
+            if sync.get("projectColumns", False):
+                self.initialize_projection(syncConfig)
+            self.initialize_pushdown(syncConfig)
+
             self.sync_list.append(syncConfig)
 
+        self.validate_dependencies(self.sync_list)
+
+    @staticmethod
+    def validate_dependencies(sync_list: list[SyncConfiguration]):
+        """Makes sure that every sync referenced in a dependsOn setting exists, has a unique name and that the dependencies are free from cycles."""
+        referenced_names = {
+            name for sync in sync_list for name in (sync.depends_on or ())
+        }
+        if not referenced_names:
+            return
+
+        sync_names = [sync.name for sync in sync_list]
+        for name in referenced_names:
+            if sync_names.count(name) > 1:
+                raise ValueError(
+                    f"The sync name '{name}' is used by more than one sync and can therefore not be used in dependsOn."
+                )
+
+        # Imported here since the execution package depends on the config package
+        # pylint: disable=import-outside-toplevel
+        from ...execution import SyncExecutor
+
+        SyncExecutor.execution_order(sync_list)
+
+    def initialize_execution(self, config) -> ExecutionConfig:
+        execution = config.get("execution", None) or {}
+        return ExecutionConfig(
+            max_workers=execution.get("maxWorkers", 1),
+            source_concurrency=execution.get("sourceConcurrency", {}),
+            concurrent_fetch=execution.get("concurrentFetch", False),
+        )
+
+    @staticmethod
+    def initialize_range_checksum(
+        sync: dict,
+        source_instance,
+        destination_instance,
+        comparison_columns: list[ComparisonColumn],
+    ) -> RangeChecksumConfig:
+        """Validates that the sync can compare checksums of key ranges in the databases."""
+        if not source_instance.supports_range_checksum or type(
+            source_instance
+        ) is not type(destination_instance):
+            raise ValueError(
+                "The rangeChecksum option requires the source and destination to be of the same type, "
+                "one of Sqlserver, Postgresql or Mysql."
+            )
+
+        unique_columns = [column for column in comparison_columns if column.unique]
+        if len(unique_columns) != 1 or not unique_columns[0].type.is_integer():
+            raise ValueError(
+                "The rangeChecksum option requires exactly one unique column of an integer type."
+            )
+
+        if sync.get("sourceTransformers") or sync.get("destinationTransformers"):
+            raise ValueError(
+                "The rangeChecksum option can not be combined with source or destination transformers, "
+                "the checksums are calculated on the data as it is stored."
+            )
+
+        if sync.get("lazy") or sync.get("sortedMerge") or sync.get("manifest"):
+            raise ValueError(
+                "The rangeChecksum option can not be combined with the lazy, sortedMerge or manifest options."
+            )
+
+        return RangeChecksumConfig(
+            buckets=sync["rangeChecksum"].get("buckets", 64),
+            leaf_rows=sync["rangeChecksum"].get("leafRows", 10_000),
+        )
+
+    @staticmethod
+    def initialize_pushdown(sync: SyncConfiguration) -> None:
+        """Lets the source and destination apply the frames.filter transformers they start with while reading.
+        The transformers still run, so sources that can't apply the filters return the same result.
+        """
+        sync.source.pushed_filters = tuple(leading_filters(sync.sourceTransformers))
+        sync.destination.pushed_filters = tuple(
+            leading_filters(sync.destinationTransformers)
+        )
+
+    @staticmethod
+    def initialize_projection(sync: SyncConfiguration) -> None:
+        """Sets the columns the source and destination of the sync need to read.
+        A side keeps reading every column when one of its transformers may read columns it doesn't name.
+        """
+        comparison_columns = {column.name for column in sync.comparisonColumns}
+        for instance, transformers in (
+            (
+                sync.source,
+                [
+                    *(sync.sourceTransformers or []),
+                    *(sync.insertionTransformers or []),
+                    *(sync.diff_transformers or []),
+                ],
+            ),
+            (
+                sync.destination,
+                [
+                    *(sync.destinationTransformers or []),
+                    *(sync.deletionTransformers or []),
+                    *(sync.diff_transformers or []),
+                ],
+            ),
+        ):
+            names = referenced_columns(transformers)
+            if names is None:
+                continue
+
+            configuration = instance.source_configuration
+            for attribute in ("unique_columns", "skip_columns", "unique_fields"):
+                names |= set(getattr(configuration, attribute, None) or ())
+            instance.required_columns = comparison_columns | names
+
+    def initialize_instrumentation(self, config) -> InstrumentationConfig:
+        instrumentation = config.get("instrumentation", None) or {}
+        return InstrumentationConfig(
+            console=instrumentation.get("console", True),
+            json_file=instrumentation.get("jsonFile", None),
+            prometheus_textfile=instrumentation.get("prometheusTextfile", None),
+        )
+
     def initialize_sources(self, config):
         sources = {}
         for source_index, source in enumerate(config["sources"]):
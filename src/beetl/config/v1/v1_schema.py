@@ -102,6 +102,47 @@ class DiffArguments(BaseModel):
     destination: Annotated[SourceDiffArguments, Field(discriminator="type")]
 
 
+class ManifestArguments(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    path: Annotated[
+        str,
+        Field(
+            min_length=1,
+            description="Path of the Parquet file holding the row hashes of the destination.",
+        ),
+    ]
+    reconcileEvery: Annotated[
+        int,
+        Field(
+            default=10,
+            ge=1,
+            description="Read the destination every n-th run instead of using the manifest, to catch changes made outside of beetl.",
+        ),
+    ]
+
+
+class RangeChecksumArguments(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    buckets: Annotated[
+        int,
+        Field(
+            default=64,
+            ge=2,
+            description="The amount of buckets a differing key range is split into.",
+        ),
+    ]
+    leafRows: Annotated[
+        int,
+        Field(
+            default=10_000,
+            ge=1,
+            description="Differing buckets with at most this amount of rows are fetched instead of split further.",
+        ),
+    ]
+
+
 class V1Sync(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -135,6 +176,70 @@ class V1Sync(BaseModel):
     deletionTransformers: OptionalTransformers
 
     diff: Annotated[Optional[DiffArguments], Field(default=None)]
+    dependsOn: Annotated[
+        list[str],
+        Field(
+            default=[],
+            description="Names of syncs that must finish before this sync is started.",
+        ),
+    ]
+    lazy: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Retrieve and transform the data as lazy frames so that polars can optimize the whole sync as one query.",
+        ),
+    ]
+    streaming: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Collect the comparison of the source and destination with the streaming engine of polars.",
+        ),
+    ]
+    sortedMerge: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Compare the source and destination chunk by chunk, both must be ordered by the unique columns. Keeps the memory usage bounded regardless of the amount of rows.",
+        ),
+    ]
+    chunkSize: Annotated[
+        int,
+        Field(
+            default=100_000,
+            ge=1,
+            description="The amount of rows per chunk when sortedMerge is enabled.",
+        ),
+    ]
+    manifest: Annotated[
+        Optional[ManifestArguments],
+        Field(
+            default=None,
+            description="Keep the row hashes of the destination between runs, so that the destination only needs to be read periodically.",
+        ),
+    ]
+    rangeChecksum: Annotated[
+        Optional[RangeChecksumArguments],
+        Field(
+            default=None,
+            description="Let the databases compare checksums of key ranges and only fetch the rows of the ranges that differ.",
+        ),
+    ]
+    diffEngine: Annotated[
+        Literal["join", "hash"],
+        Field(
+            default="join",
+            description="How updated rows are found. join compares every comparison column, hash compares one hash of the comparison columns per row, which uses less memory for wide tables.",
+        ),
+    ]
+    projectColumns: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Only read the columns used by the sync, derived from the comparison columns, the unique and skip columns and the configuration of the transformers. Inserted rows only contain these columns.",
+        ),
+    ]
 
     @model_validator(mode="before")
     def validate_sources(cls, values):
@@ -181,6 +286,59 @@ class V1Sync(BaseModel):
         return errors
 
 
+class ExecutionArguments(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    maxWorkers: Annotated[
+        int,
+        Field(
+            default=1,
+            ge=1,
+            description="The amount of syncs that are allowed to run at the same time. Defaults to 1, running the syncs sequentially.",
+        ),
+    ]
+    sourceConcurrency: Annotated[
+        dict[str, Annotated[int, Field(ge=1)]],
+        Field(
+            default={},
+            description="The maximum amount of concurrently running syncs that use a source, keyed by source name.",
+        ),
+    ]
+    concurrentFetch: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Retrieve and transform the source and destination data of a sync concurrently.",
+        ),
+    ]
+
+
+class InstrumentationArguments(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    console: Annotated[
+        bool,
+        Field(
+            default=True,
+            description="Print the duration of every phase of every sync to the console.",
+        ),
+    ]
+    jsonFile: Annotated[
+        Optional[str],
+        Field(
+            default=None,
+            description="Path of a JSON file that the spans of each run are written to.",
+        ),
+    ]
+    prometheusTextfile: Annotated[
+        Optional[str],
+        Field(
+            default=None,
+            description="Path of a Prometheus textfile collector file that the spans of each run are written to.",
+        ),
+    ]
+
+
 class BeetlConfigSchemaV1(BaseModel):
     """Represents the configuration as supplied by the user. This class is used to validate the configuration against the static jsonschema and the dynamic beetl validation rules."""
 
@@ -189,6 +347,8 @@ class BeetlConfigSchemaV1(BaseModel):
     version: Literal["V1"]
     sources: Annotated[SourceConfigArguments, Field(min_items=1)]
     sync: Annotated[list[V1Sync], Field(min_items=1)]
+    execution: Annotated[Optional[ExecutionArguments], Field(default=None)]
+    instrumentation: Annotated[Optional[InstrumentationArguments], Field(default=None)]
 
     @model_validator(mode="before")
     def populate_validation_values_in_nested_types(cls, values):
@@ -1,5 +1,9 @@
 """Project constants"""
 
 BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER = "beetl_comparison_hash"
+BEETL_UNCHANGED_COLUMNS_IDENTIFIER = "beetl_unchanged_columns"
 
-RESERVED_IDENTIFIERS: tuple[str, ...] = (BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER,)
+RESERVED_IDENTIFIERS: tuple[str, ...] = (
+    BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER,
+    BEETL_UNCHANGED_COLUMNS_IDENTIFIER,
+)
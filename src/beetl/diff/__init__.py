@@ -1,2 +1,7 @@
-from .diff_calculator import DiffCalculator
+from .diff_calculator import DiffCalculator, DiffEngine
+from .diff_file import DiffFileFormat, read_diff_file, write_diff_file
+from .diff_log import DiffLog, DiffLogSegment
 from .diff_model import Diff, DiffRow, DiffStats, DiffUpdate
+from .manifest import RowHashManifest
+from .range_checksum import KeyRange, RangeChecksum
+from .sorted_merge import SortedMergeDiff
@@ -1,14 +1,21 @@
 """Utilities related to calculating the diff between two datasets."""
 
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
 import polars as pl
-from polars import DataFrame
+from polars import DataFrame, LazyFrame
 
-from ..constants import BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER, RESERVED_IDENTIFIERS
+from ..constants import (
+    BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER,
+    BEETL_UNCHANGED_COLUMNS_IDENTIFIER,
+    RESERVED_IDENTIFIERS,
+)
 from ..transformers import TransformerConfiguration, run_transformers
 from ..typings import CASTABLE, ComparisonColumn
-from .diff_model import Diff, DiffRow, DiffUpdate
+from .diff_model import Diff
+from .row_hash import normalize_types, row_hash_expression
+
+DiffEngine = Literal["join", "hash"]
 
 
 class DiffCalculator:
@@ -17,13 +24,20 @@ class DiffCalculator:
       between two datasets represented as DataFrames.
     It identifies changes based on unique and comparison
       columns specified during initialization.
+    The source and destination can be eager or lazy frames, the inserts, updates and deletes
+      are planned as one lazy query that is collected once.
+    The join engine compares every comparison column of the joined rows,
+      the hash engine compares one hash of the comparison columns per row
+      and only materializes the comparison columns of the changed rows.
     """
 
     sync_name: str
     unique_columns: tuple[str, ...]
     comparison_columns: tuple[str, ...]
-    source: DataFrame
-    destination: DataFrame
+    source: Union[DataFrame, LazyFrame]
+    destination: Union[DataFrame, LazyFrame]
+    streaming: bool = False
+    engine: DiffEngine = "join"
 
     updates_old: Optional[DataFrame] = None
     updates_new: Optional[DataFrame] = None
@@ -35,11 +49,15 @@ class DiffCalculator:
     def __init__(
         self,
         sync_name: str,
-        source: DataFrame,
-        destination: DataFrame,
+        source: Union[DataFrame, LazyFrame],
+        destination: Union[DataFrame, LazyFrame],
         columns: list[ComparisonColumn],
+        streaming: bool = False,
+        engine: DiffEngine = "join",
     ):
         self.sync_name = sync_name
+        self.streaming = streaming
+        self.engine = engine
         self.source = self._cast_columns_to_specified_types(
             self._initialize_columns_if_empty(source, columns), columns
         )
@@ -59,12 +77,15 @@ class DiffCalculator:
             self.deletes,
         ) = self._calculate_diff()
 
-    def _calculate_diff(self) -> tuple[DataFrame, DataFrame, DataFrame]:
+    def _calculate_diff(
+        self,
+    ) -> tuple[DataFrame, DataFrame, DataFrame, DataFrame, DataFrame]:
+        source_schema = self.source.collect_schema()
         columns_contain_list_column = any(
             [
                 True
                 for name in self.comparison_columns
-                if isinstance(self.source.get_column(name).dtype, pl.List)
+                if isinstance(source_schema.get(name), pl.List)
             ]
         )
         if columns_contain_list_column:
@@ -74,21 +95,33 @@ class DiffCalculator:
                 """
             )
 
-        inserts = self._calculate_inserts(
-            self.source, self.destination, self.unique_columns
-        )
-        deletes = self._calculate_deletes(
-            self.source, self.destination, self.unique_columns
-        )
+        source = self.source.lazy()
+        destination = self.destination.lazy()
+
+        inserts = self._calculate_inserts(source, destination, self.unique_columns)
+        deletes = self._calculate_deletes(source, destination, self.unique_columns)
 
         if self.diff_cannot_contain_any_updates():
+            inserts, deletes = pl.collect_all(
+                [inserts, deletes], streaming=self.streaming
+            )
             return (inserts, DataFrame(), DataFrame(), DataFrame(), deletes)
 
-        updates_old, updates_new, updated_diff_mask = self._calculate_updates(
-            self.source, self.destination, self.unique_columns, self.comparison_columns
+        calculate_updates = (
+            self._calculate_updates_by_hash
+            if self.engine == "hash"
+            else self._calculate_updates
+        )
+        updates_old, updates_new, updated_diff_mask = calculate_updates(
+            source, destination, self.unique_columns, self.comparison_columns
         )
 
-        return (inserts, updates_old, updates_new, updated_diff_mask, deletes)
+        return tuple(
+            pl.collect_all(
+                [inserts, updates_old, updates_new, updated_diff_mask, deletes],
+                streaming=self.streaming,
+            )
+        )
 
     def diff_cannot_contain_any_updates(self):
         """
@@ -103,49 +136,47 @@ class DiffCalculator:
 
     @staticmethod
     def _calculate_inserts(
-        source: DataFrame,
-        destination: DataFrame,
+        source: LazyFrame,
+        destination: LazyFrame,
         unique_columns: tuple[str, ...],
-    ) -> DataFrame:
+    ) -> LazyFrame:
         return source.join(destination, on=unique_columns, how="anti")
 
     @staticmethod
     def _calculate_deletes(
-        source: DataFrame,
-        destination: DataFrame,
+        source: LazyFrame,
+        destination: LazyFrame,
         unique_columns: tuple[str, ...],
-    ) -> DataFrame:
+    ) -> LazyFrame:
         return destination.join(source, on=unique_columns, how="anti")
 
     @staticmethod
     def _calculate_updates(
-        source: DataFrame,
-        destination: DataFrame,
+        source: LazyFrame,
+        destination: LazyFrame,
         unique_columns: tuple[str, ...],
         comparison_columns: tuple[str, ...],
-    ) -> tuple[DataFrame, DataFrame]:
+    ) -> tuple[LazyFrame, LazyFrame, LazyFrame]:
         source_filtered = source.select(*unique_columns, *comparison_columns)
         destination_filtered = destination.select(*unique_columns, *comparison_columns)
 
         destination_renamed_as_old = destination_filtered.rename(
-            {
-                col: f"{col}_old"
-                for col in destination_filtered.columns
-                if col not in unique_columns
-            }
+            {col: f"{col}_old" for col in comparison_columns}
         )
 
         merged = source_filtered.join(
-            destination_renamed_as_old, on=unique_columns, how="outer"
+            destination_renamed_as_old, on=unique_columns, how="full"
         )
 
         update_diff_mask_expression = [
-            (merged[col] != merged[f"{col}_old"]).alias(f"diff_{col}")
+            (pl.col(col) != pl.col(f"{col}_old")).alias(f"diff_{col}")
             for col in comparison_columns
         ]
 
         merged = merged.with_columns(update_diff_mask_expression)
-        updated_rows = merged.filter(pl.any_horizontal(update_diff_mask_expression))
+        updated_rows = merged.filter(
+            pl.any_horizontal([f"diff_{col}" for col in comparison_columns])
+        )
         diff_mask = updated_rows.select(
             *unique_columns, *[f"diff_{col}" for col in comparison_columns]
         )
@@ -156,21 +187,73 @@ class DiffCalculator:
 
         return (old, new, diff_mask)
 
+    @staticmethod
+    def _calculate_updates_by_hash(
+        source: LazyFrame,
+        destination: LazyFrame,
+        unique_columns: tuple[str, ...],
+        comparison_columns: tuple[str, ...],
+    ) -> tuple[LazyFrame, LazyFrame, LazyFrame]:
+        source_normalized, destination_normalized = normalize_types(
+            source, destination, comparison_columns
+        )
+
+        hash_expression = row_hash_expression(
+            comparison_columns, BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER
+        )
+        source_hashes = source_normalized.select(*unique_columns, hash_expression)
+        destination_hashes = destination_normalized.select(
+            *unique_columns, hash_expression
+        )
+
+        updated_rows_identifiers = (
+            source_hashes.join(
+                destination_hashes, on=unique_columns, how="inner", suffix="_old"
+            )
+            .filter(
+                pl.col(BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER)
+                != pl.col(f"{BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER}_old")
+            )
+            .select(*unique_columns)
+        )
+
+        old = destination.join(updated_rows_identifiers, on=unique_columns, how="inner")
+        new = source.join(updated_rows_identifiers, on=unique_columns, how="inner")
+
+        old_renamed = old.select(
+            *unique_columns,
+            *[pl.col(col).alias(f"{col}_old") for col in comparison_columns],
+        )
+        diff_mask = (
+            new.select(*unique_columns, *comparison_columns)
+            .join(old_renamed, on=unique_columns, how="inner")
+            .select(
+                *unique_columns,
+                *[
+                    pl.col(col).ne_missing(pl.col(f"{col}_old")).alias(f"diff_{col}")
+                    for col in comparison_columns
+                ],
+            )
+        )
+
+        return (old, new, diff_mask)
+
     @staticmethod
     def _initialize_columns_if_empty(
-        dataframe: DataFrame, columns: tuple[ComparisonColumn, ...]
-    ) -> DataFrame:
-        if len(dataframe) == 0 and dataframe.width == 0:
-            for col in columns:
-                dataframe = dataframe.with_columns(pl.Series(col.name, dtype=col.type))
+        dataframe: Union[DataFrame, LazyFrame], columns: tuple[ComparisonColumn, ...]
+    ) -> Union[DataFrame, LazyFrame]:
+        if len(dataframe.collect_schema()) == 0:
+            empty = DataFrame(schema={col.name: col.type for col in columns})
+            return empty.lazy() if isinstance(dataframe, LazyFrame) else empty
         return dataframe
 
     @staticmethod
     def _cast_columns_to_specified_types(
-        dataframe: DataFrame, columns: tuple[ComparisonColumn, ...]
-    ) -> DataFrame:
+        dataframe: Union[DataFrame, LazyFrame], columns: tuple[ComparisonColumn, ...]
+    ) -> Union[DataFrame, LazyFrame]:
+        column_names = dataframe.collect_schema().names()
         for col in columns:
-            if col.name in dataframe.columns and col.type in CASTABLE:
+            if col.name in column_names and col.type in CASTABLE:
                 dataframe = dataframe.with_columns(pl.col(col.name).cast(col.type))
         return dataframe
 
@@ -193,18 +276,8 @@ class DiffCalculator:
             Diff: An object containing the differences, including updates, inserts,
             and deletes, between the old and new datasets.
         """
-        diff_deletes = tuple(
-            map(
-                DiffRow,
-                run_transformers(self.deletes, transformers).to_dicts(),
-            )
-        )
-        diff_inserts = tuple(
-            map(
-                DiffRow,
-                run_transformers(self.inserts, transformers).to_dicts(),
-            )
-        )
+        diff_deletes = run_transformers(self.deletes, transformers)
+        diff_inserts = run_transformers(self.inserts, transformers)
 
         add_hash_expression = (
             pl.struct(self.unique_columns)
@@ -239,13 +312,7 @@ class DiffCalculator:
 
         updates = updates.select(["old", "new"])
 
-        diff_updates = []
-        for update_row in updates.to_dicts():
-            old = DiffRow(update_row["old"])
-            new = DiffRow(update_row["new"])
-            diff_updates.append(DiffUpdate(old, new))
-
-        return Diff(self.sync_name, diff_updates, diff_inserts, diff_deletes)
+        return Diff(self.sync_name, updates, diff_inserts, diff_deletes)
 
     @staticmethod
     def _create_rename_mapping(
@@ -283,3 +350,31 @@ class DiffCalculator:
                 - The third DataFrame represents the rows to be deleted.
         """
         return (self.inserts, self.updates_new, self.deletes)
+
+    def get_updates_with_unchanged_columns(self) -> DataFrame:
+        """
+        Retrieves the rows to be updated together with the comparison columns that did not change,
+        so that destinations can leave those columns untouched.
+
+        Returns:
+            DataFrame: The rows to be updated with a list column named after BEETL_UNCHANGED_COLUMNS_IDENTIFIER
+                holding the names of the comparison columns that are equal in the source and destination.
+        """
+        if len(self.updates_new) == 0:
+            return self.updates_new
+
+        unchanged_columns = (
+            pl.concat_list(
+                pl.when(pl.col(f"diff_{col}").fill_null(True))
+                .then(pl.lit(None, pl.String))
+                .otherwise(pl.lit(col))
+                for col in self.comparison_columns
+            )
+            .list.drop_nulls()
+            .alias(BEETL_UNCHANGED_COLUMNS_IDENTIFIER)
+        )
+        return self.updates_new.join(
+            self.updates_diff_mask.select(*self.unique_columns, unchanged_columns),
+            on=self.unique_columns,
+            how="left",
+        )
@@ -0,0 +1,44 @@
+"""Storage of a single diff as a compressed Parquet or Arrow IPC file."""
+
+import os
+from typing import Literal
+
+import polars as pl
+
+from .diff_model import Diff
+
+DiffFileFormat = Literal["parquet", "ipc"]
+
+DIFF_FILE_EXTENSIONS: dict[str, str] = {"parquet": ".parquet", "ipc": ".arrow"}
+
+
+def write_diff_file(diff: Diff, directory: str, file_format: DiffFileFormat) -> str:
+    """
+    Writes the changes of the diff to a zstd compressed file named after the diff uuid.
+    The file holds one row per change, see Diff.changes_frame.
+
+    Returns:
+        str: The path of the written file
+    """
+    if file_format not in DIFF_FILE_EXTENSIONS:
+        raise ValueError(
+            f"Unknown diff file format '{file_format}', use one of {list(DIFF_FILE_EXTENSIONS)}"
+        )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{diff.uuid}{DIFF_FILE_EXTENSIONS[file_format]}")
+    changes = diff.changes_frame()
+
+    if file_format == "parquet":
+        changes.write_parquet(path, compression="zstd")
+    else:
+        changes.write_ipc(path, compression="zstd")
+
+    return path
+
+
+def read_diff_file(path: str) -> pl.DataFrame:
+    """Reads the changes of a diff written by write_diff_file"""
+    if path.endswith(DIFF_FILE_EXTENSIONS["ipc"]):
+        return pl.read_ipc(path, memory_map=False)
+    return pl.read_parquet(path)
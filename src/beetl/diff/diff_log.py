@@ -0,0 +1,142 @@
+"""The file layout of diffs stored by the file based diff destinations."""
+
+import glob
+import os
+import re
+from datetime import datetime
+from typing import Callable, Literal, Optional
+
+import polars as pl
+
+DiffLogSegment = Literal["day", "month", "year"]
+
+SEGMENT_DATE_FORMATS: dict[str, str] = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+SEGMENT_KEY_PATTERNS: dict[str, str] = {
+    "day": r"\d{4}-\d{2}-\d{2}",
+    "month": r"\d{4}-\d{2}",
+    "year": r"\d{4}",
+}
+COMPACTED_EXTENSION = ".parquet"
+
+
+class DiffLog:
+    """
+    Decides which file a diff is stored in and maintains the older files.
+
+    Without a segment every diff is stored in the configured path.
+    With a segment the diffs are stored in one file per day, month or year of the diff date,
+      the key of the segment is added before the extension, e.g. diffs.2024-05.csv.
+    When compact is set, segments that are no longer written to are converted
+      to zstd compressed Parquet files with the same name.
+    When retention is set, only the newest retention segments are kept,
+      older segments are removed together with the diff files they reference.
+    """
+
+    path: str
+    segment: Optional[DiffLogSegment]
+    retention: Optional[int]
+    compact: bool
+
+    def __init__(
+        self,
+        path: str,
+        segment: Optional[DiffLogSegment] = None,
+        retention: Optional[int] = None,
+        compact: bool = False,
+    ):
+        self.validate_options(segment, retention, compact)
+        self.path = path
+        self.segment = segment
+        self.retention = retention
+        self.compact = compact
+        self._root, self._extension = os.path.splitext(path)
+
+    @staticmethod
+    def validate_options(
+        segment: Optional[DiffLogSegment], retention: Optional[int], compact: bool
+    ) -> None:
+        if (retention or compact) and segment is None:
+            raise ValueError(
+                "The retention and compact options of a diff destination require a segment."
+            )
+
+    def path_for(self, date: datetime) -> str:
+        """The path of the file a diff created at the date is stored in"""
+        if self.segment is None:
+            return self.path
+        key = date.strftime(SEGMENT_DATE_FORMATS[self.segment])
+        return f"{self._root}.{key}{self._extension}"
+
+    def segments(self) -> dict[str, list[str]]:
+        """The paths of the existing segment files by segment key, oldest first"""
+        if self.segment is None:
+            return {}
+
+        pattern = re.compile(
+            re.escape(self._root + ".")
+            + f"({SEGMENT_KEY_PATTERNS[self.segment]})"
+            + f"({re.escape(self._extension)}|{re.escape(COMPACTED_EXTENSION)})$"
+        )
+        segments: dict[str, list[str]] = {}
+        for path in sorted(glob.glob(f"{glob.escape(self._root)}.*")):
+            match = pattern.match(path)
+            if match:
+                segments.setdefault(match.group(1), []).append(path)
+        return dict(sorted(segments.items()))
+
+    def maintain(
+        self, current_path: str, read_segment: Callable[[str], pl.DataFrame]
+    ) -> None:
+        """Compacts the closed segments and removes the segments outside of the retention.
+
+        Args:
+            current_path (str): The path of the segment that was just written to, it is left as is
+            read_segment (Callable[[str], pl.DataFrame]): Reads a segment in the format of the diff destination
+        """
+        if self.segment is None:
+            return
+
+        segments = self.segments()
+
+        if self.retention:
+            expired = list(segments)[: max(len(segments) - self.retention, 0)]
+            for key in expired:
+                for path in segments.pop(key):
+                    if path != current_path:
+                        self._remove_segment(path, read_segment)
+
+        if self.compact:
+            for paths in segments.values():
+                for path in paths:
+                    if path != current_path and not path.endswith(COMPACTED_EXTENSION):
+                        self._compact_segment(path, read_segment)
+
+    @staticmethod
+    def _compact_segment(
+        path: str, read_segment: Callable[[str], pl.DataFrame]
+    ) -> None:
+        compacted_path = os.path.splitext(path)[0] + COMPACTED_EXTENSION
+        data = read_segment(path)
+        if os.path.exists(compacted_path):
+            data = pl.concat(
+                [pl.read_parquet(compacted_path), data], how="diagonal_relaxed"
+            )
+        data.write_parquet(compacted_path, compression="zstd")
+        os.remove(path)
+
+    @staticmethod
+    def _remove_segment(path: str, read_segment: Callable[[str], pl.DataFrame]) -> None:
+        data = (
+            pl.read_parquet(path)
+            if path.endswith(COMPACTED_EXTENSION)
+            else read_segment(path)
+        )
+        if "file" in data.columns:
+            for diff_file in data["file"].drop_nulls():
+                if os.path.exists(diff_file):
+                    os.remove(diff_file)
+        os.remove(path)
@@ -1,11 +1,16 @@
 import json
 from datetime import datetime
 from json import JSONEncoder
-from typing import Any, Literal
+from typing import Any, Iterable, Iterator, Literal, Union
 from uuid import uuid4
 
+import polars as pl
+
 DiffRow = dict[str, Any]
 
+CHUNK_SIZE = 10_000
+"""The amount of rows converted to python objects or json at a time"""
+
 
 class DiffUpdate:
     old: DiffRow
@@ -37,11 +42,15 @@ class DiffStats:
     inserts: int
     deletes: int
 
-    def __init__(self, updates: int, inserts: int, deletes: int):
+    def __init__(
+        self,
+        updates: Union[int, Iterable],
+        inserts: Union[int, Iterable],
+        deletes: Union[int, Iterable],
+    ):
         self.updates, self.inserts, self.deletes = (
-            len(updates),
-            len(inserts),
-            len(deletes),
+            value if isinstance(value, int) else len(value)
+            for value in (updates, inserts, deletes)
         )
 
     class JsonEncoder(JSONEncoder):
@@ -66,50 +75,207 @@ class DiffStats:
 
 
 class Diff:
+    """
+    The changes of a sync.
+    The inserts and deletes are held as frames with one row per change,
+      the updates as a frame with the struct columns old and new.
+    Rows are only converted to python objects or json when they are accessed, a chunk at a time.
+    """
+
     name: str
     date: datetime
     uuid: str
     version: Literal["1.0.0"] = "1.0.0"
-    updates: tuple[DiffUpdate, ...]
-    inserts: tuple[DiffRow, ...]
-    deletes: tuple[DiffRow, ...]
+    update_frame: pl.DataFrame
+    insert_frame: pl.DataFrame
+    delete_frame: pl.DataFrame
     stats: DiffStats
 
     def __init__(
         self,
         name: str,
-        updates: tuple[DiffUpdate, ...],
-        inserts: tuple[DiffRow, ...],
-        deletes: tuple[DiffRow, ...],
+        updates: Union[pl.DataFrame, Iterable[DiffUpdate]],
+        inserts: Union[pl.DataFrame, Iterable[DiffRow]],
+        deletes: Union[pl.DataFrame, Iterable[DiffRow]],
     ):
         self.name = name
         self.date = datetime.now()
         self.uuid = uuid4()
-        self.updates = updates
-        self.inserts = inserts
-        self.deletes = deletes
-        self.stats = DiffStats(updates, inserts, deletes)
+        self.update_frame = self._as_update_frame(updates)
+        self.insert_frame = self._as_frame(inserts)
+        self.delete_frame = self._as_frame(deletes)
+        self.stats = DiffStats(
+            self.update_frame.height,
+            self.insert_frame.height,
+            self.delete_frame.height,
+        )
 
-    def dump_json(self):
-        return json.dumps(self, cls=DiffJsonEncoder)
+    @staticmethod
+    def _as_frame(rows: Union[pl.DataFrame, Iterable[DiffRow]]) -> pl.DataFrame:
+        if isinstance(rows, pl.DataFrame):
+            return rows
+        rows = list(rows)
+        return pl.DataFrame(rows) if rows else pl.DataFrame()
+
+    @staticmethod
+    def _as_update_frame(
+        updates: Union[pl.DataFrame, Iterable[DiffUpdate]],
+    ) -> pl.DataFrame:
+        if isinstance(updates, pl.DataFrame):
+            return updates
+        updates = list(updates)
+        if not updates:
+            return pl.DataFrame()
+        return pl.DataFrame(
+            {
+                "old": [update.old for update in updates],
+                "new": [update.new for update in updates],
+            }
+        )
+
+    @property
+    def updates(self) -> tuple[DiffUpdate, ...]:
+        return tuple(self.iter_updates())
+
+    @property
+    def inserts(self) -> tuple[DiffRow, ...]:
+        return tuple(self.iter_inserts())
+
+    @property
+    def deletes(self) -> tuple[DiffRow, ...]:
+        return tuple(self.iter_deletes())
+
+    def iter_updates(self, chunk_size: int = CHUNK_SIZE) -> Iterator[DiffUpdate]:
+        for row in _iter_rows(self.update_frame, chunk_size):
+            yield DiffUpdate(row["old"], row["new"])
+
+    def iter_inserts(self, chunk_size: int = CHUNK_SIZE) -> Iterator[DiffRow]:
+        return _iter_rows(self.insert_frame, chunk_size)
+
+    def iter_deletes(self, chunk_size: int = CHUNK_SIZE) -> Iterator[DiffRow]:
+        return _iter_rows(self.delete_frame, chunk_size)
+
+    def updates_json(self) -> str:
+        """The updates as a json array of objects with the keys old and new"""
+        return _frame_json(self.update_frame)
+
+    def inserts_json(self) -> str:
+        return _frame_json(self.insert_frame)
+
+    def deletes_json(self) -> str:
+        return _frame_json(self.delete_frame)
+
+    def stats_json(self) -> str:
+        return json.dumps(self.stats, cls=DiffStats.JsonEncoder)
+
+    def dump_json(self) -> str:
+        return "".join(self.iter_json())
+
+    def iter_json(self, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Yields the json representation of the diff in pieces,
+        so it can be written to a file without holding the whole document in memory.
+        """
+        yield "{"
+        yield f'"name": {json.dumps(self.name)}, '
+        yield f'"date": {json.dumps(self.date_as_string())}, '
+        yield f'"uuid": {json.dumps(str(self.uuid))}, '
+        yield f'"version": {json.dumps(self.version)}, '
+        for key, frame in (
+            ("updates", self.update_frame),
+            ("inserts", self.insert_frame),
+            ("deletes", self.delete_frame),
+        ):
+            yield f'"{key}": '
+            yield from _iter_frame_json(frame, chunk_size)
+            yield ", "
+        yield f'"stats": {self.stats_json()}'
+        yield "}"
 
     def date_as_string(self) -> str:
         return self.date.isoformat()
 
+    def changes_frame(self) -> pl.DataFrame:
+        """
+        One row per change with the column operation (insert, update or delete)
+          and the columns of the old and new row prefixed with old. and new.
+        Columns only present in some changes are null for the others.
+        """
+        frames = []
+        if self.insert_frame.height:
+            frames.append(
+                self.insert_frame.select(
+                    pl.lit("insert").alias("operation"), pl.all().name.prefix("new.")
+                )
+            )
+        if self.update_frame.height:
+            frames.append(
+                self.update_frame.select(
+                    pl.lit("update").alias("operation"),
+                    pl.col("old").struct.unnest().name.prefix("old."),
+                    pl.col("new").struct.unnest().name.prefix("new."),
+                )
+            )
+        if self.delete_frame.height:
+            frames.append(
+                self.delete_frame.select(
+                    pl.lit("delete").alias("operation"), pl.all().name.prefix("old.")
+                )
+            )
+
+        if not frames:
+            return pl.DataFrame(schema={"operation": pl.String})
+        return pl.concat(frames, how="diagonal_relaxed")
+
+    def change_rows(self) -> pl.DataFrame:
+        """
+        One row per change with the columns operation, old and new,
+          where old and new hold the row encoded as a json object, or null.
+        Unlike changes_frame the columns do not depend on the data, which suits database tables.
+        """
+        schema = {"operation": pl.String, "old": pl.String, "new": pl.String}
+        frames = [pl.DataFrame(schema=schema)]
+        for operation, frame, old, new in (
+            ("insert", self.insert_frame, None, pl.struct(pl.all())),
+            ("update", self.update_frame, pl.col("old"), pl.col("new")),
+            ("delete", self.delete_frame, pl.struct(pl.all()), None),
+        ):
+            if not frame.height:
+                continue
+            frames.append(
+                frame.select(
+                    pl.lit(operation).alias("operation"),
+                    (
+                        old.struct.json_encode() if old is not None else pl.lit(None)
+                    ).alias("old"),
+                    (
+                        new.struct.json_encode() if new is not None else pl.lit(None)
+                    ).alias("new"),
+                ).cast(schema)
+            )
+        return pl.concat(frames)
+
+
+def _iter_rows(frame: pl.DataFrame, chunk_size: int) -> Iterator[DiffRow]:
+    for chunk in frame.iter_slices(chunk_size):
+        yield from chunk.to_dicts()
+
+
+def _frame_json(frame: pl.DataFrame) -> str:
+    return "".join(_iter_frame_json(frame, CHUNK_SIZE))
+
+
+def _iter_frame_json(frame: pl.DataFrame, chunk_size: int) -> Iterator[str]:
+    """Yields a json array of the rows of the frame, encoded a chunk at a time by polars"""
+    yield "["
+    for index, chunk in enumerate(frame.iter_slices(chunk_size)):
+        if index:
+            yield ","
+        yield chunk.write_json()[1:-1]
+    yield "]"
+
 
 class DiffJsonEncoder(JSONEncoder):
     def default(self, o: Any):
         if isinstance(o, Diff):
-            return {
-                "name": o.name,
-                "date": o.date.isoformat(),
-                "uuid": str(o.uuid),
-                "version": o.version,
-                "updates": [
-                    DiffUpdate.JsonEncoder().default(update) for update in o.updates
-                ],
-                "inserts": o.inserts,
-                "deletes": o.deletes,
-                "stats": DiffStats.JsonEncoder().default(o.stats),
-            }
+            return json.loads(o.dump_json())
         return super().default(o)
@@ -0,0 +1,177 @@
+"""Persistence of the row hashes of a destination between runs."""
+
+import json
+import os
+from typing import Optional, Union
+
+import polars as pl
+from polars import DataFrame, LazyFrame
+
+from ..constants import BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER
+from ..typings import ComparisonColumn
+from .diff_calculator import DiffCalculator
+from .row_hash import row_hash_expression
+
+
+class RowHashManifest:
+    """
+    A local Parquet file holding the unique columns and a hash of the comparison columns
+      of every row in the destination, as written or observed by the previous run.
+    The diff can be calculated against the manifest instead of the destination,
+      which saves reading the destination on every run.
+    A state file next to the manifest counts the runs since the destination was last read,
+      every reconcile_every run reads the destination to catch changes made outside of beetl.
+
+    Usage:
+      stage() or diff() the source, write the changes, then commit() on success or invalidate() on failure.
+    """
+
+    path: str
+    state_path: str
+    columns: list[ComparisonColumn]
+    unique_columns: tuple[str, ...]
+    comparison_columns: tuple[str, ...]
+    reconcile_every: int
+
+    _staged: Optional[DataFrame] = None
+
+    def __init__(
+        self, path: str, columns: list[ComparisonColumn], reconcile_every: int = 10
+    ):
+        self.path = path
+        self.state_path = f"{path}.json"
+        self.columns = columns
+        self.unique_columns = tuple(col.name for col in columns if col.unique)
+        self.comparison_columns = tuple(
+            col.name for col in columns if col.name not in self.unique_columns
+        )
+        self.reconcile_every = reconcile_every
+
+    def _signature(self) -> dict:
+        """Describes what the hashes depend on, a manifest with another signature can not be used."""
+        return {
+            "polars": pl.__version__,
+            "columns": [[col.name, str(col.type), col.unique] for col in self.columns],
+        }
+
+    def _read_state(self) -> Optional[dict]:
+        if not os.path.exists(self.path) or not os.path.exists(self.state_path):
+            return None
+
+        with open(self.state_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def requires_full_read(self) -> bool:
+        """
+        Returns true if the destination must be read this run, because there is no usable manifest
+          or it is time for a full reconciliation.
+        """
+        state = self._read_state()
+        if state is None or state.get("signature") != self._signature():
+            return True
+
+        return state.get("runs_since_full_read", 0) + 1 >= self.reconcile_every
+
+    def stage(self, source: Union[DataFrame, LazyFrame]) -> DataFrame:
+        """
+        Hashes the comparison columns of the source and keeps the hashes to be committed.
+        Once the changes are written, the destination matches the source, so the hashes of the source become the manifest.
+
+        Args:
+            source (Union[DataFrame, LazyFrame]): The transformed source data.
+
+        Returns:
+            DataFrame: The source with the hash column added.
+        """
+        source = DiffCalculator._cast_columns_to_specified_types(
+            DiffCalculator._initialize_columns_if_empty(source, self.columns),
+            self.columns,
+        )
+        hashed = source.with_columns(
+            row_hash_expression(
+                self.comparison_columns, BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER
+            )
+        )
+        if isinstance(hashed, LazyFrame):
+            hashed = hashed.collect()
+
+        self._staged = hashed.select(
+            *self.unique_columns, BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER
+        )
+        return hashed
+
+    def diff(
+        self, sync_name: str, source: Union[DataFrame, LazyFrame]
+    ) -> tuple[DataFrame, DataFrame, DataFrame]:
+        """
+        Calculates the inserts, updates and deletes by comparing the hashes of the source to the manifest.
+        The inserts and updates contain the rows of the source,
+          the deletes only contain the unique columns since the rest of the row is not kept in the manifest.
+
+        Args:
+            sync_name (str): The name of the sync.
+            source (Union[DataFrame, LazyFrame]): The transformed source data.
+
+        Returns:
+            tuple[DataFrame, DataFrame, DataFrame]: The rows to insert, update and delete.
+        """
+        hashed = self.stage(source)
+        manifest = pl.read_parquet(self.path)
+
+        diff_calculator = DiffCalculator(
+            sync_name,
+            hashed,
+            manifest,
+            [
+                *[col for col in self.columns if col.unique],
+                ComparisonColumn(BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER, "UInt64"),
+            ],
+        )
+        return tuple(
+            frame.drop(BEETL_COMPARISON_HASH_COLUMN_IDENTIFIER, strict=False)
+            for frame in diff_calculator.get_create_update_delete_for_sync()
+        )
+
+    def commit(self, full_read: bool) -> None:
+        """
+        Replaces the manifest with the staged hashes, call once the changes have been written.
+
+        Args:
+            full_read (bool): Whether the destination was read this run, which resets the reconciliation counter.
+        """
+        if self._staged is None:
+            raise ValueError(
+                "The source must be staged before the manifest is committed"
+            )
+
+        state = self._read_state() or {}
+        runs_since_full_read = (
+            0 if full_read else state.get("runs_since_full_read", 0) + 1
+        )
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        self._staged.write_parquet(temporary_path)
+        os.replace(temporary_path, self.path)
+
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "signature": self._signature(),
+                    "runs_since_full_read": runs_since_full_read,
+                },
+                file,
+            )
+
+        self._staged = None
+
+    def invalidate(self) -> None:
+        """Removes the manifest, forcing the next run to read the destination.
+        Used when writing the changes failed and the destination is in an unknown state.
+        """
+        for path in (self.path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
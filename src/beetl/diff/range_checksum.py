@@ -0,0 +1,158 @@
+"""Utilities related to finding the differing key ranges of two databases by comparing checksums."""
+
+from typing import TYPE_CHECKING, Optional
+
+import polars as pl
+from polars import DataFrame
+
+if TYPE_CHECKING:
+    from ..sources.interface import SourceInterface
+
+KeyRange = tuple[int, int]
+"""A range of integer keys, the lower bound is inclusive and the upper bound exclusive"""
+
+
+class RangeChecksum:
+    """
+    Finds the ranges of an integer key where the source and destination differ,
+    without transferring the rows of the ranges that are equal.
+
+    The key space is split into buckets and both databases are asked for the amount of rows
+      and a checksum of the rows in every bucket.
+    Buckets that differ are split again until they hold at most leaf_rows rows,
+      then the rows of the differing buckets are fetched from both sides.
+    A diff of the fetched rows is equal to the diff of the complete data,
+      since the rows outside of the fetched ranges are identical on both sides.
+
+    The checksums are calculated by the databases,
+      so both sides must be of the same source type and expose the same columns.
+    """
+
+    source: "SourceInterface"
+    destination: "SourceInterface"
+    key: str
+    columns: tuple[str, ...]
+    buckets: int
+    leaf_rows: int
+    range_batch_size: int = 100
+    """The maximum amount of ranges fetched by one query"""
+
+    def __init__(
+        self,
+        source: "SourceInterface",
+        destination: "SourceInterface",
+        key: str,
+        columns: tuple[str, ...],
+        buckets: int = 64,
+        leaf_rows: int = 10_000,
+    ):
+        if buckets < 2:
+            raise ValueError("The range checksum requires at least two buckets")
+
+        self.source = source
+        self.destination = destination
+        self.key = key
+        self.columns = columns
+        self.buckets = buckets
+        self.leaf_rows = leaf_rows
+
+    def differing_ranges(self) -> list[KeyRange]:
+        """
+        Compares the checksums of both sides and returns the ranges that differ,
+        adjacent ranges are merged.
+
+        Returns:
+            list[KeyRange]: The differing ranges in ascending order.
+        """
+        bounds = self._bounds()
+        if bounds is None:
+            return []
+
+        pending = [bounds]
+        differing: list[KeyRange] = []
+
+        while pending:
+            subdivide = []
+            for lower, upper in pending:
+                width = -(-(upper - lower) // self.buckets)
+                source = self._checksums(self.source, lower, upper, width)
+                destination = self._checksums(self.destination, lower, upper, width)
+
+                for bucket in sorted(source.keys() | destination.keys()):
+                    source_bucket = source.get(bucket, (0, None))
+                    destination_bucket = destination.get(bucket, (0, None))
+                    if source_bucket == destination_bucket:
+                        continue
+
+                    bucket_range = (
+                        lower + bucket * width,
+                        min(lower + (bucket + 1) * width, upper),
+                    )
+                    rows = max(source_bucket[0], destination_bucket[0])
+                    if rows <= self.leaf_rows or width == 1:
+                        differing.append(bucket_range)
+                    else:
+                        subdivide.append(bucket_range)
+
+            pending = subdivide
+
+        return self._merge(sorted(differing))
+
+    def fetch(self) -> tuple[DataFrame, DataFrame]:
+        """
+        Fetches the rows of the differing ranges from both sides.
+
+        Returns:
+            tuple[DataFrame, DataFrame]: The rows of the source and the destination.
+        """
+        ranges = self.differing_ranges()
+        return (
+            self.fetch_ranges(self.source, ranges),
+            self.fetch_ranges(self.destination, ranges),
+        )
+
+    def fetch_ranges(
+        self, side: "SourceInterface", ranges: list[KeyRange]
+    ) -> DataFrame:
+        """Fetches the rows of the ranges from one side, a few ranges per query."""
+        frames = [
+            side.query_ranges(self.key, ranges[i : i + self.range_batch_size])
+            for i in range(0, len(ranges), self.range_batch_size)
+        ]
+        if not frames:
+            return DataFrame()
+
+        return pl.concat(frames, how="diagonal_relaxed")
+
+    def _bounds(self) -> Optional[KeyRange]:
+        """The smallest range covering the keys of both sides, None if both are empty"""
+        lowers, uppers = [], []
+        for side in (self.source, self.destination):
+            lower, upper = side.key_bounds(self.key)
+            if lower is not None:
+                lowers.append(int(lower))
+                uppers.append(int(upper))
+
+        if not lowers:
+            return None
+
+        return min(lowers), max(uppers) + 1
+
+    def _checksums(
+        self, side: "SourceInterface", lower: int, upper: int, width: int
+    ) -> dict[int, tuple[int, str]]:
+        checksums = side.range_checksums(self.key, self.columns, lower, upper, width)
+        return {
+            int(row["bucket"]): (int(row["row_count"]), str(row["checksum"]))
+            for row in checksums.iter_rows(named=True)
+        }
+
+    @staticmethod
+    def _merge(ranges: list[KeyRange]) -> list[KeyRange]:
+        merged: list[KeyRange] = []
+        for lower, upper in ranges:
+            if merged and merged[-1][1] == lower:
+                merged[-1] = (merged[-1][0], upper)
+            else:
+                merged.append((lower, upper))
+        return merged
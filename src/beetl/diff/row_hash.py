@@ -0,0 +1,66 @@
+"""Utilities related to hashing the comparison columns of a row."""
+
+from typing import Union
+
+import polars as pl
+from polars import DataFrame, LazyFrame
+
+Frame = Union[DataFrame, LazyFrame]
+
+
+def row_hash_expression(columns: tuple[str, ...], alias: str) -> pl.Expr:
+    """
+    Creates an expression that hashes the given columns of a row into one 64-bit value.
+    Nulls hash differently from any value, so changes to and from null are detected.
+    The hash depends on the data types, use normalize_types to align the types of two frames first.
+
+    Args:
+        columns (tuple[str, ...]): The columns to hash.
+        alias (str): The name of the resulting column.
+
+    Returns:
+        pl.Expr: The hash expression.
+    """
+    return pl.struct(columns).hash().alias(alias)
+
+
+def normalize_types(
+    source: Frame, destination: Frame, columns: tuple[str, ...]
+) -> tuple[Frame, Frame]:
+    """
+    Casts the columns that differ in type between the frames to their common supertype,
+    the same type polars uses when the columns are compared with each other.
+
+    Args:
+        source (Frame): The source frame.
+        destination (Frame): The destination frame.
+        columns (tuple[str, ...]): The columns to align.
+
+    Returns:
+        tuple[Frame, Frame]: The source and destination with aligned types.
+    """
+    source_schema = source.collect_schema()
+    destination_schema = destination.collect_schema()
+
+    casts = {}
+    for column in columns:
+        source_type = source_schema[column]
+        destination_type = destination_schema[column]
+        if source_type != destination_type:
+            casts[column] = supertype(source_type, destination_type)
+
+    if not casts:
+        return source, destination
+
+    return (
+        source.with_columns(pl.col(col).cast(type) for col, type in casts.items()),
+        destination.with_columns(pl.col(col).cast(type) for col, type in casts.items()),
+    )
+
+
+def supertype(left: pl.DataType, right: pl.DataType) -> pl.DataType:
+    """Returns the type polars casts both types to when they are combined."""
+    return pl.concat(
+        [DataFrame(schema={"column": left}), DataFrame(schema={"column": right})],
+        how="vertical_relaxed",
+    ).schema["column"]
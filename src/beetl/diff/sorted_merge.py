@@ -0,0 +1,150 @@
+"""Utilities related to calculating the diff between two datasets delivered in sorted chunks."""
+
+from typing import Any, Iterable, Iterator, Optional
+
+import polars as pl
+from polars import DataFrame
+
+from ..typings import ComparisonColumn
+from .diff_calculator import DiffCalculator, DiffEngine
+
+
+class SortedMergeDiff:
+    """
+    Calculates the diff between two datasets that are delivered as chunks sorted by the unique columns.
+    The chunks are merged like two sorted lists, every merge step resolves the rows
+      up to the smallest last key of the buffered chunks and yields a DiffCalculator for them.
+    At most one chunk per side is buffered, so the memory used is bounded by the chunk size
+      regardless of the size of the datasets.
+
+    The unique columns must be unique, non null and sorted in ascending order
+      the same way polars sorts them, otherwise a ValueError is raised.
+    """
+
+    sync_name: str
+    columns: list[ComparisonColumn]
+    unique_columns: tuple[str, ...]
+    engine: DiffEngine
+
+    def __init__(
+        self,
+        sync_name: str,
+        source: Iterable[DataFrame],
+        destination: Iterable[DataFrame],
+        columns: list[ComparisonColumn],
+        engine: DiffEngine = "join",
+    ):
+        self.sync_name = sync_name
+        self.columns = columns
+        self.unique_columns = tuple(col.name for col in columns if col.unique)
+        self.engine = engine
+        self._source = _SortedChunks(source, columns, self.unique_columns, "source")
+        self._destination = _SortedChunks(
+            destination, columns, self.unique_columns, "destination"
+        )
+
+    def __iter__(self) -> Iterator[DiffCalculator]:
+        source_buffer: Optional[DataFrame] = None
+        destination_buffer: Optional[DataFrame] = None
+
+        while True:
+            if source_buffer is None:
+                source_buffer = next(self._source, None)
+            if destination_buffer is None:
+                destination_buffer = next(self._destination, None)
+
+            if source_buffer is None and destination_buffer is None:
+                return
+
+            if source_buffer is None or destination_buffer is None:
+                yield self._calculate(
+                    source_buffer if source_buffer is not None else DataFrame(),
+                    (
+                        destination_buffer
+                        if destination_buffer is not None
+                        else DataFrame()
+                    ),
+                )
+                source_buffer = destination_buffer = None
+                continue
+
+            boundary = min(
+                self._last_key(source_buffer), self._last_key(destination_buffer)
+            )
+            source_part, source_buffer = self._split(source_buffer, boundary)
+            destination_part, destination_buffer = self._split(
+                destination_buffer, boundary
+            )
+
+            yield self._calculate(source_part, destination_part)
+
+    def _calculate(self, source: DataFrame, destination: DataFrame) -> DiffCalculator:
+        return DiffCalculator(
+            self.sync_name, source, destination, self.columns, engine=self.engine
+        )
+
+    def _last_key(self, data: DataFrame) -> tuple[Any, ...]:
+        return data.select(self.unique_columns).row(-1)
+
+    def _split(
+        self, data: DataFrame, boundary: tuple[Any, ...]
+    ) -> tuple[DataFrame, Optional[DataFrame]]:
+        """Splits the chunk into the rows up to and including the boundary and the rows after it.
+        The rows after the boundary are None when there are none.
+        """
+        at_or_before = pl.lit(True)
+        for column, value in reversed(tuple(zip(self.unique_columns, boundary))):
+            at_or_before = (pl.col(column) < value) | (
+                (pl.col(column) == value) & at_or_before
+            )
+
+        resolved = data.filter(at_or_before)
+        remaining = data.filter(~at_or_before)
+        return resolved, (remaining if remaining.height else None)
+
+
+class _SortedChunks:
+    """Iterates over the non empty chunks of one side and verifies that they are sorted."""
+
+    def __init__(
+        self,
+        chunks: Iterable[DataFrame],
+        columns: list[ComparisonColumn],
+        unique_columns: tuple[str, ...],
+        side: str,
+    ):
+        self._chunks = iter(chunks)
+        self._columns = columns
+        self._unique_columns = unique_columns
+        self._side = side
+        self._previous_last_key: Optional[tuple[Any, ...]] = None
+
+    def __iter__(self) -> "_SortedChunks":
+        return self
+
+    def __next__(self) -> DataFrame:
+        chunk = next(self._chunks)
+        while chunk.height == 0:
+            chunk = next(self._chunks)
+
+        chunk = DiffCalculator._cast_columns_to_specified_types(chunk, self._columns)
+        keys = chunk.select(self._unique_columns)
+
+        if keys.null_count().sum_horizontal().item() > 0:
+            raise ValueError(
+                f"The unique columns of the {self._side} contain null values, "
+                "which is not supported when merging sorted chunks."
+            )
+
+        if not keys.equals(keys.sort(self._unique_columns)) or (
+            self._previous_last_key is not None
+            and keys.row(0) <= self._previous_last_key
+        ):
+            raise ValueError(
+                f"The {self._side} is not sorted by the unique columns "
+                f"{', '.join(self._unique_columns)} or contains duplicate keys. "
+                "The sorted_merge diff engine requires both sides to be ordered by the unique columns."
+            )
+
+        self._previous_last_key = keys.row(-1)
+        return chunk
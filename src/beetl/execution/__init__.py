@@ -0,0 +1 @@
+from .sync_executor import SyncExecutor
@@ -0,0 +1,190 @@
+"""Scheduling of syncs, sequentially or on a bounded worker pool."""
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from ..config import SyncConfiguration
+
+SyncOutcome = TypeVar("SyncOutcome")
+
+
+class SyncExecutor:
+    """
+    SyncExecutor runs the syncs of a configuration while honouring the
+      dependencies declared through `dependsOn`.
+    With a single worker the syncs run one after another in the calling thread.
+    With more workers, independent syncs run concurrently on a thread pool,
+      limited by the per source concurrency limits.
+    """
+
+    max_workers: int
+    source_concurrency: dict[str, int]
+
+    def __init__(
+        self, max_workers: int = 1, source_concurrency: Optional[dict[str, int]] = None
+    ):
+        if max_workers < 1:
+            raise ValueError("The amount of workers must be at least 1")
+
+        self.max_workers = max_workers
+        self.source_concurrency = source_concurrency or {}
+
+    def run(
+        self,
+        syncs: list[SyncConfiguration],
+        run_sync: Callable[[int, SyncConfiguration], SyncOutcome],
+    ) -> list[SyncOutcome]:
+        """
+        Runs all syncs and returns their outcomes in configuration order.
+
+        Args:
+            syncs (list[SyncConfiguration]): The syncs to run.
+            run_sync (Callable[[int, SyncConfiguration], SyncOutcome]):
+                Called once per sync with its 1-based position in the configuration.
+
+        Raises:
+            Exception: The first exception raised by a sync. No new syncs are
+              started after a failure, already running syncs are allowed to finish.
+
+        Returns:
+            list[SyncOutcome]: The value returned by run_sync for each sync.
+        """
+        order = self.execution_order(syncs)
+
+        if self.max_workers == 1:
+            outcomes = [None] * len(syncs)
+            for index in order:
+                outcomes[index] = run_sync(index + 1, syncs[index])
+            return outcomes
+
+        return self._run_concurrently(syncs, order, run_sync)
+
+    def _run_concurrently(
+        self,
+        syncs: list[SyncConfiguration],
+        order: list[int],
+        run_sync: Callable[[int, SyncConfiguration], SyncOutcome],
+    ) -> list[SyncOutcome]:
+        outcomes = [None] * len(syncs)
+        pending = list(order)
+        running: dict[Future, int] = {}
+        finished_names: set[str] = set()
+        sources_in_use: Counter = Counter()
+        first_error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="beetl-sync"
+        ) as pool:
+            while pending or running:
+                for index in tuple(pending):
+                    if len(running) >= self.max_workers:
+                        break
+
+                    sync = syncs[index]
+                    dependencies_finished = all(
+                        name in finished_names for name in sync.depends_on or ()
+                    )
+                    if not dependencies_finished:
+                        continue
+
+                    sources = self._sources_used_by(sync)
+                    if not self._has_capacity(sources, sources_in_use):
+                        continue
+
+                    sources_in_use.update(sources)
+                    pending.remove(index)
+                    running[pool.submit(run_sync, index + 1, sync)] = index
+
+                if not running:
+                    raise RuntimeError(
+                        "None of the remaining syncs can be started, "
+                        "please check the dependsOn and sourceConcurrency settings."
+                    )
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    sources_in_use.subtract(self._sources_used_by(syncs[index]))
+
+                    error = future.exception()
+                    if error is not None:
+                        first_error = first_error or error
+                        pending.clear()
+                        continue
+
+                    outcomes[index] = future.result()
+                    finished_names.add(syncs[index].name)
+
+        if first_error is not None:
+            raise first_error
+
+        return outcomes
+
+    def _has_capacity(self, sources: set[str], sources_in_use: Counter) -> bool:
+        for source in sources:
+            limit = self.source_concurrency.get(source, None)
+            if limit is not None and sources_in_use[source] >= limit:
+                return False
+        return True
+
+    @staticmethod
+    def _sources_used_by(sync: SyncConfiguration) -> set[str]:
+        return {
+            name
+            for name in (
+                sync.source_name,
+                sync.destination_name,
+                sync.diff_destination_name,
+            )
+            if name
+        }
+
+    @staticmethod
+    def execution_order(syncs: list[SyncConfiguration]) -> list[int]:
+        """
+        Orders the syncs so that every sync comes after the syncs it depends on.
+        Syncs without dependencies between them keep their configuration order.
+
+        Args:
+            syncs (list[SyncConfiguration]): The syncs to order.
+
+        Raises:
+            ValueError: If a dependency is unknown or the dependencies contain a cycle.
+
+        Returns:
+            list[int]: The indexes of the syncs in the order they should run.
+        """
+        index_by_name = {sync.name: index for index, sync in enumerate(syncs)}
+        remaining_dependencies = []
+        for sync in syncs:
+            dependencies = set()
+            for name in sync.depends_on or ():
+                if name not in index_by_name:
+                    raise ValueError(
+                        f"The sync '{sync.name}' depends on '{name}' which is not the name of any sync."
+                    )
+                dependencies.add(index_by_name[name])
+            remaining_dependencies.append(dependencies)
+
+        order = []
+        scheduled = set()
+        while len(order) < len(syncs):
+            ready = [
+                index
+                for index in range(len(syncs))
+                if index not in scheduled and remaining_dependencies[index] <= scheduled
+            ]
+            if not ready:
+                cyclic = [
+                    syncs[index].name
+                    for index in range(len(syncs))
+                    if index not in scheduled
+                ]
+                raise ValueError(
+                    f"The dependsOn settings of the syncs {cyclic} contain a cycle."
+                )
+            order.append(ready[0])
+            scheduled.add(ready[0])
+
+        return order
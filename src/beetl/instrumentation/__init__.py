@@ -0,0 +1,10 @@
+from .instrumentation import Instrumentation, SyncInstrumentation
+from .sinks import (
+    CallbackSink,
+    ConsoleSink,
+    InstrumentationSink,
+    JsonFileSink,
+    PrometheusTextfileSink,
+)
+from .span import Span
+from .summary import InstrumentationSummary
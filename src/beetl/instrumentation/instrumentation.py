@@ -0,0 +1,76 @@
+"""Recording of spans during a run of Beetl.sync."""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+from typing import Iterator, Optional
+
+from .sinks import InstrumentationSink
+from .span import Span
+from .summary import InstrumentationSummary
+
+
+class Instrumentation:
+    """
+    Collects the spans of one run and forwards them to the sinks.
+    A new instance is created for every run so nothing accumulates in long lived processes.
+    Safe to use from the threads of concurrently running syncs.
+    """
+
+    sinks: tuple[InstrumentationSink, ...]
+
+    def __init__(self, sinks: Optional[list[InstrumentationSink]] = None):
+        self.sinks = tuple(sinks or ())
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, sync: str, phase: str) -> Iterator[Span]:
+        """Measures the duration of the enclosed block.
+        Call measure on the yielded span to record the rows and size of the data produced.
+
+        Args:
+            sync (str): The name of the sync.
+            phase (str): The name of the phase.
+
+        Yields:
+            Span: The span being recorded.
+        """
+        span = Span(sync, phase, datetime.now())
+        start = perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration = perf_counter() - start
+            with self._lock:
+                self._spans.append(span)
+                for sink in self.sinks:
+                    sink.on_span(span)
+
+    def for_sync(self, sync: str) -> "SyncInstrumentation":
+        """Returns an instrumentation bound to the sync with the given name."""
+        return SyncInstrumentation(self, sync)
+
+    def summary(self) -> InstrumentationSummary:
+        with self._lock:
+            return InstrumentationSummary(tuple(self._spans))
+
+    def finish(self) -> InstrumentationSummary:
+        """Hands the summary of the run to the sinks and returns it."""
+        summary = self.summary()
+        for sink in self.sinks:
+            sink.on_finish(summary)
+        return summary
+
+
+class SyncInstrumentation:
+    """An instrumentation bound to a single sync."""
+
+    def __init__(self, instrumentation: Instrumentation, sync: str):
+        self.instrumentation = instrumentation
+        self.sync = sync
+
+    def span(self, phase: str):
+        """See Instrumentation.span"""
+        return self.instrumentation.span(self.sync, phase)
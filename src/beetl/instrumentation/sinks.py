@@ -0,0 +1,104 @@
+"""Destinations for the spans recorded during a run."""
+
+import json
+import os
+from typing import Callable
+
+from .span import Span
+from .summary import InstrumentationSummary
+
+
+class InstrumentationSink:
+    """Receives spans as they finish and the summary when the run is over. Override the methods you need."""
+
+    def on_span(self, span: Span) -> None:
+        """Called every time a span finishes."""
+
+    def on_finish(self, summary: InstrumentationSummary) -> None:
+        """Called once when the run is over, also when it failed."""
+
+
+class ConsoleSink(InstrumentationSink):
+    """Prints every span as it finishes."""
+
+    def on_span(self, span: Span) -> None:
+        rows = f" ({span.rows} rows)" if span.rows is not None else ""
+        sync = f"{span.sync}: " if span.sync else ""
+        print(f"{sync}{span.phase} took {round(span.duration, 5)} seconds{rows}")
+
+
+class CallbackSink(InstrumentationSink):
+    """Calls the callback with every span as it finishes."""
+
+    def __init__(self, callback: Callable[[Span], None]):
+        self.callback = callback
+
+    def on_span(self, span: Span) -> None:
+        self.callback(span)
+
+
+class JsonFileSink(InstrumentationSink):
+    """Writes all spans of the run to a JSON file, replacing the previous contents."""
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self.encoding = encoding
+
+    def on_finish(self, summary: InstrumentationSummary) -> None:
+        _write_atomically(
+            self.path, json.dumps(summary.to_dict(), indent=2), self.encoding
+        )
+
+
+class PrometheusTextfileSink(InstrumentationSink):
+    """Writes the spans of the run as gauges in the Prometheus text format,
+    to be picked up by the textfile collector of the node exporter.
+    """
+
+    def __init__(self, path: str, prefix: str = "beetl"):
+        self.path = path
+        self.prefix = prefix
+
+    def on_finish(self, summary: InstrumentationSummary) -> None:
+        metrics = (
+            ("phase_duration_seconds", "Seconds spent in the phase.", "duration"),
+            ("phase_rows", "Rows produced or processed by the phase.", "rows"),
+            (
+                "phase_estimated_size_bytes",
+                "Estimated size of the data produced by the phase.",
+                "estimated_size",
+            ),
+        )
+
+        lines = []
+        for name, description, attribute in metrics:
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} gauge")
+            for span in summary.spans:
+                value = getattr(span, attribute)
+                if value is None:
+                    continue
+                labels = (
+                    f'sync="{_escape_label(span.sync)}",'
+                    f'phase="{_escape_label(span.phase)}"'
+                )
+                lines.append(f"{metric}{{{labels}}} {value}")
+
+        _write_atomically(self.path, "\n".join(lines) + "\n", "utf-8")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomically(path: str, content: str, encoding: str) -> None:
+    """Writes to a temporary file next to the target and moves it in place so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding=encoding) as file:
+        file.write(content)
+    os.replace(temporary_path, path)
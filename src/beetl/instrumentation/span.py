@@ -0,0 +1,54 @@
+"""The measurement of a single phase of a sync."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+import polars as pl
+
+
+@dataclass
+class Span:
+    """
+    A span records how long a phase of a sync took and how much data it produced.
+
+    Attributes:
+      sync (str): The name of the sync the phase belongs to.
+      phase (str): The name of the phase, e.g. fetch_source or transform_source.strings.lowercase.
+      started (datetime): When the phase started.
+      duration (float): The duration of the phase in seconds.
+      rows (Optional[int]): The amount of rows produced or processed by the phase, if known.
+      estimated_size (Optional[int]): The estimated size in bytes of the data produced by the phase, if known.
+    """
+
+    sync: str
+    phase: str
+    started: datetime
+    duration: float = 0.0
+    rows: Optional[int] = None
+    estimated_size: Optional[int] = None
+
+    def measure(self, data: Any) -> Any:
+        """Records the row count and estimated size of the data and returns it unchanged.
+        Only eager DataFrames are measured, anything else is passed through as is.
+
+        Args:
+            data (Any): The data produced by the phase.
+
+        Returns:
+            Any: The data passed in.
+        """
+        if isinstance(data, pl.DataFrame):
+            self.rows = data.height
+            self.estimated_size = int(data.estimated_size())
+        return data
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sync": self.sync,
+            "phase": self.phase,
+            "started": self.started.isoformat(),
+            "duration": self.duration,
+            "rows": self.rows,
+            "estimated_size": self.estimated_size,
+        }
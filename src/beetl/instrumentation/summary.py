@@ -0,0 +1,49 @@
+"""Aggregation of the spans recorded during a run."""
+
+from typing import Any
+
+from tabulate import tabulate
+
+from .span import Span
+
+
+class InstrumentationSummary:
+    """The spans recorded during one run of Beetl.sync, in the order they finished."""
+
+    spans: tuple[Span, ...]
+
+    def __init__(self, spans: tuple[Span, ...] = ()):
+        self.spans = tuple(spans)
+
+    def for_sync(self, sync: str) -> tuple[Span, ...]:
+        """Returns the spans recorded for the sync with the given name."""
+        return tuple(span for span in self.spans if span.sync == sync)
+
+    def duration_by_phase(self) -> dict[tuple[str, str], float]:
+        """Returns the total duration in seconds per sync and phase."""
+        durations: dict[tuple[str, str], float] = {}
+        for span in self.spans:
+            key = (span.sync, span.phase)
+            durations[key] = durations.get(key, 0.0) + span.duration
+        return durations
+
+    def slowest(self, amount: int = 5) -> tuple[Span, ...]:
+        """Returns the spans that took the longest, slowest first."""
+        return tuple(
+            sorted(self.spans, key=lambda span: span.duration, reverse=True)[:amount]
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"spans": [span.to_dict() for span in self.spans]}
+
+    def __str__(self) -> str:
+        return tabulate(
+            [
+                [span.sync, span.phase, round(span.duration, 5), span.rows]
+                for span in self.spans
+            ],
+            headers=["Sync", "Phase", "Seconds", "Rows"],
+        )
+
+    def __repr__(self) -> str:
+        return f"InstrumentationSummary({len(self.spans)} spans)"
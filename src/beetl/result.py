@@ -1,4 +1,6 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from .instrumentation import InstrumentationSummary
 
 
 class Result:
@@ -25,8 +27,15 @@ class Result:
 
 
 class SyncResult(Result):
-    def __init__(self, results: List[Tuple[str, int, int, int]] = []):
+    instrumentation: InstrumentationSummary
+
+    def __init__(
+        self,
+        results: List[Tuple[str, int, int, int]] = [],
+        instrumentation: Optional[InstrumentationSummary] = None,
+    ):
         super().__init__()
+        self.instrumentation = instrumentation or InstrumentationSummary()
         self.names = tuple([result[0] for result in results])
         for result in results:
             self.inserts += result[1] or 0
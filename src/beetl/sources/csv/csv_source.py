@@ -1,12 +1,11 @@
 """Contains the CsvSource class for handling CSV data sources."""
 
-import json
 import os
-from pathlib import Path
+from typing import Optional
 
 import polars as pl
 
-from ...diff import Diff, DiffStats, DiffUpdate
+from ...diff import Diff, DiffLog, write_diff_file
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .csv_config import CsvConfig, CsvConfigArguments
@@ -35,8 +34,42 @@ class CsvSource(SourceInterface):
         pass
 
     def _query(self, params=None) -> pl.DataFrame:
+        if self.pushed_filters and self._scan_encoding() is not None:
+            # Scanning filters the rows while parsing instead of after reading the file
+            return self._query_lazy(params).collect()
+
         return pl.read_csv(
-            self.connection_settings.path, encoding=self.connection_settings.encoding
+            self.connection_settings.path,
+            encoding=self.connection_settings.encoding,
+            columns=self._csv_columns(),
+        )
+
+    def _csv_columns(self) -> Optional[list[str]]:
+        """The columns to parse, limited to the required columns when they are known"""
+        if self.required_columns is None:
+            return None
+        header = pl.read_csv(
+            self.connection_settings.path,
+            n_rows=0,
+            encoding=self.connection_settings.encoding,
+        ).columns
+        return self._projected_columns(header)
+
+    def _query_lazy(self, params=None) -> pl.LazyFrame:
+        encoding = self._scan_encoding()
+        if encoding is None:
+            return self._query(params).lazy()
+
+        data = pl.scan_csv(self.connection_settings.path, encoding=encoding)
+        for column_filter in self.pushed_filters:
+            data = data.filter(column_filter.expression())
+        columns = self._projected_columns(data.collect_schema().names())
+        return data if columns is None else data.select(columns)
+
+    def _scan_encoding(self) -> Optional[str]:
+        # scan_csv only decodes utf-8, other encodings are read eagerly
+        return {"utf-8": "utf8", "utf8": "utf8", "utf8-lossy": "utf8-lossy"}.get(
+            self.connection_settings.encoding.lower()
         )
 
     def insert(self, data: pl.DataFrame):
@@ -54,43 +87,73 @@ class CsvSource(SourceInterface):
         print(data)
         return len(data)
 
+    def _diff_directory(self) -> str:
+        if self.diff_config.directory:
+            return self.diff_config.directory
+        return os.path.splitext(self.connection_settings.path)[0] + "_diffs"
+
+    def _diff_log(self) -> DiffLog:
+        return DiffLog(
+            self.connection_settings.path,
+            self.diff_config.segment,
+            self.diff_config.retention,
+            self.diff_config.compact,
+        )
+
+    def _read_diff_segment(self, path: str) -> pl.DataFrame:
+        return pl.read_csv(path, encoding=self.connection_settings.encoding)
+
     def store_diff(self, diff: Diff):
         if not self.diff_config:
             raise ValueError("Diff configuration is missing")
 
-        existing_data = pl.DataFrame()
+        index_row = {
+            "uuid": str(diff.uuid),
+            "name": diff.name,
+            "date": diff.date_as_string(),
+            "version": diff.version,
+        }
+        if self.diff_config.format == "json":
+            index_row["updates"] = diff.updates_json()
+            index_row["inserts"] = diff.inserts_json()
+            index_row["deletes"] = diff.deletes_json()
+            index_row["stats"] = diff.stats_json()
+        else:
+            # The changes are kept in a compressed file per diff, the csv only indexes them
+            index_row["stats"] = diff.stats_json()
+            index_row["file"] = write_diff_file(
+                diff, self._diff_directory(), self.diff_config.format
+            )
 
-        if not os.path.exists(self.connection_settings.path):
-            os.makedirs(os.path.dirname(self.connection_settings.path), exist_ok=True)
-            Path(os.path.join(self.connection_settings.path)).touch()
+        diff_log = self._diff_log()
+        path = diff_log.path_for(diff.date)
+        self._append_diff_row(path, pl.DataFrame(index_row))
+        diff_log.maintain(path, self._read_diff_segment)
 
+    def _append_diff_row(self, path: str, new_data: pl.DataFrame):
+        """Appends the row to the end of the file, only the header is read.
+        The file is rewritten when its columns differ from the row, e.g. after changing the format.
+        """
+        columns = None
         try:
-            existing_data = pl.read_csv(
-                self.connection_settings.path,
-                encoding=self.connection_settings.encoding,
-            )
+            columns = pl.read_csv(
+                path, n_rows=0, encoding=self.connection_settings.encoding
+            ).columns
         # Ok to catch broadly here since we are just figuring out if we should replace the file or not.
         # pylint: disable=broad-exception-caught
         except Exception:
             # Do nothing, just replace the file
             pass
 
-        new_data = pl.DataFrame(
-            {
-                "uuid": str(diff.uuid),
-                "name": diff.name,
-                "date": diff.date_as_string(),
-                "version": diff.version,
-                "updates": json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-                "inserts": json.dumps(diff.inserts),
-                "deletes": json.dumps(diff.deletes),
-                "stats": json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
-            }
-        )
+        if columns == new_data.columns:
+            with open(path, "ab") as file:
+                new_data.write_csv(file, include_header=False)
+            return
 
-        if existing_data.is_empty():
-            existing_data = new_data
-        else:
-            existing_data = pl.concat([existing_data, new_data])
+        existing_data = pl.DataFrame()
+        if columns:
+            existing_data = self._read_diff_segment(path)
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        existing_data.write_csv(self.connection_settings.path)
+        pl.concat([existing_data, new_data], how="diagonal_relaxed").write_csv(path)
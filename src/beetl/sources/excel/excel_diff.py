@@ -1,5 +1,8 @@
-from typing import Literal
+from typing import Annotated, Literal, Optional
 
+from pydantic import Field
+
+from ...diff.diff_log import DiffLog, DiffLogSegment
 from ..interface.interface_diff import (
     SourceDiff,
     SourceDiffArguments,
@@ -8,7 +11,11 @@ from ..interface.interface_diff import (
 
 
 class ExcelDiffConfigArguments(SourceDiffConfigArguments):
-    pass
+    format: Literal["json", "parquet", "ipc"] = "json"
+    directory: Optional[str] = None
+    segment: Optional[DiffLogSegment] = None
+    retention: Optional[Annotated[int, Field(ge=1)]] = None
+    compact: bool = False
 
 
 class ExcelDiffArguments(SourceDiffArguments):
@@ -17,6 +24,17 @@ class ExcelDiffArguments(SourceDiffArguments):
 
 
 class ExcelDiff(SourceDiff):
+    format: Literal["json", "parquet", "ipc"]
+    directory: Optional[str]
+    segment: Optional[DiffLogSegment]
+    retention: Optional[int]
+    compact: bool
 
     def __init__(self, diff_config: ExcelDiffArguments) -> None:
         super().__init__(diff_config)
+        self.format = diff_config.config.format
+        self.directory = diff_config.config.directory
+        self.segment = diff_config.config.segment
+        self.retention = diff_config.config.retention
+        self.compact = diff_config.config.compact
+        DiffLog.validate_options(self.segment, self.retention, self.compact)
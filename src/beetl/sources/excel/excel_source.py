@@ -1,12 +1,11 @@
 """A source for excel data"""
 
-import json
 import os
 from pathlib import Path
 
 import polars as pl
 
-from ...diff.diff_model import Diff, DiffStats, DiffUpdate
+from ...diff import Diff, DiffLog, write_diff_file
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .excel_config import ExcelConfig, ExcelConfigArguments
@@ -61,37 +60,66 @@ class ExcelSource(SourceInterface):
         print(data)
         return len(data)
 
+    def _diff_directory(self) -> str:
+        if self.diff_config.directory:
+            return self.diff_config.directory
+        return os.path.splitext(self.connection_settings.path)[0] + "_diffs"
+
+    def _diff_log(self) -> DiffLog:
+        return DiffLog(
+            self.connection_settings.path,
+            self.diff_config.segment,
+            self.diff_config.retention,
+            self.diff_config.compact,
+        )
+
     def store_diff(self, diff: Diff):
+        """Adds a row for the diff to the workbook.
+        A workbook can not be appended to, so it is rewritten on every call.
+        Use a segment to bound the size of the workbook that is rewritten.
+        """
+        if not self.diff_config:
+            raise ValueError("Diff configuration is missing")
+
         existing_data = pl.DataFrame()
+        diff_log = self._diff_log()
+        path = diff_log.path_for(diff.date)
 
-        if not os.path.exists(self.connection_settings.path):
-            os.makedirs(os.path.dirname(self.connection_settings.path), exist_ok=True)
-            Path(os.path.join(self.connection_settings.path)).touch()
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Path(os.path.join(path)).touch()
 
         try:
-            existing_data = pl.read_excel(self.connection_settings.path)
+            existing_data = pl.read_excel(path)
         # Broad catch is ok here since we just want to figure out if we need to create the file
         # pylint: disable=broad-exception-caught
         except Exception:
             # Do nothing, just replace the file
             pass
 
-        new_data = pl.DataFrame(
-            {
-                "uuid": str(diff.uuid),
-                "name": diff.name,
-                "date": diff.date_as_string(),
-                "version": diff.version,
-                "updates": json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-                "inserts": json.dumps(diff.inserts),
-                "deletes": json.dumps(diff.deletes),
-                "stats": json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
-            }
-        )
+        index_row = {
+            "uuid": str(diff.uuid),
+            "name": diff.name,
+            "date": diff.date_as_string(),
+            "version": diff.version,
+        }
+        if self.diff_config.format == "json":
+            index_row["updates"] = diff.updates_json()
+            index_row["inserts"] = diff.inserts_json()
+            index_row["deletes"] = diff.deletes_json()
+            index_row["stats"] = diff.stats_json()
+        else:
+            # The changes are kept in a compressed file per diff, the workbook only indexes them
+            index_row["stats"] = diff.stats_json()
+            index_row["file"] = write_diff_file(
+                diff, self._diff_directory(), self.diff_config.format
+            )
+        new_data = pl.DataFrame(index_row)
 
         if existing_data.is_empty():
             existing_data = new_data
         else:
-            existing_data = pl.concat([existing_data, new_data])
+            existing_data = pl.concat([existing_data, new_data], how="diagonal_relaxed")
 
-        existing_data.write_excel(self.connection_settings.path)
+        existing_data.write_excel(path)
+        diff_log.maintain(path, pl.read_excel)
@@ -5,4 +5,9 @@ from .interface_config import (
 )
 from .interface_diff import SourceDiff, SourceDiffArguments, SourceDiffConfigArguments
 from .interface_source import SourceInterface
-from .interface_sync import SourceSync, SourceSyncArguments
+from .interface_sync import (
+    Partition,
+    PartitionArguments,
+    SourceSync,
+    SourceSyncArguments,
+)
@@ -1,11 +1,14 @@
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Literal, Optional
 
 import polars as pl
 
+from ...constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
 from ...diff import Diff
+from ...transformers.frames import ColumnFilter
 from .interface_config import SourceConfig, SourceConfigArguments
 from .interface_diff import SourceDiff, SourceDiffArguments
-from .interface_sync import SourceSync, SourceSyncArguments
+from .interface_sync import Partition, SourceSync, SourceSyncArguments
 
 
 class SourceInterface:
@@ -24,6 +27,16 @@ class SourceInterface:
     source_configuration = None
     diff_config_arguments: SourceDiffArguments = None
     diff_config: SourceDiff = None
+    supports_range_checksum: bool = False
+    """Whether the source implements key_bounds, range_checksums and query_ranges"""
+    supports_partial_updates: bool = False
+    """Whether update accepts the unchanged columns of every row and only writes the changed columns"""
+    column_types: dict[str, pl.DataType] = {}
+    """The types of the comparison columns of the sync, sources may read the columns as these types"""
+    required_columns: Optional[set[str]] = None
+    """The names the sync uses, sources may leave out other columns when reading. None reads every column"""
+    pushed_filters: tuple[ColumnFilter, ...] = ()
+    """Conditions of the first transformers, sources may leave out rows that don't match them when reading"""
 
     def __init__(self, source: dict) -> None:
         """Initiates a source class
@@ -110,6 +123,229 @@ class SourceInterface:
         """
         raise NotImplementedError
 
+    def query_lazy(self, params=None) -> pl.LazyFrame:
+        """Returns the data of the source as a LazyFrame, used when the sync is lazy
+
+        Args:
+            params (mixed, optional): Parameters for the query. Defaults to None.
+
+        Returns:
+            pl.LazyFrame: The lazy query plan for the data
+        """
+        return self._query_lazy(params)
+
+    def _query_lazy(self, params=None) -> pl.LazyFrame:
+        """Returns a LazyFrame for the query.
+        Sources that can scan their data override this, the default runs the query eagerly.
+
+        Args:
+            params (mixed, optional): Parameters for the query. Defaults to None.
+
+        Returns:
+            pl.LazyFrame: The lazy query plan for the data
+        """
+        return self._query(params).lazy()
+
+    def query_chunks(
+        self, params=None, chunk_size: int = 100_000
+    ) -> Iterator[pl.DataFrame]:
+        """Returns the data of the source as consecutive chunks, used when the sync merges sorted chunks
+
+        Args:
+            params (mixed, optional): Parameters for the query. Defaults to None.
+            chunk_size (int, optional): The maximum amount of rows per chunk. Defaults to 100 000.
+
+        Returns:
+            Iterator[pl.DataFrame]: The chunks, in the order the source returned the rows
+        """
+        return self._query_chunks(params, chunk_size)
+
+    def _query_chunks(
+        self, params=None, chunk_size: int = 100_000
+    ) -> Iterator[pl.DataFrame]:
+        """Yields the data of the query in chunks.
+        Sources that can fetch their data in batches override this, the default runs the query and slices the result.
+
+        Args:
+            params (mixed, optional): Parameters for the query. Defaults to None.
+            chunk_size (int, optional): The maximum amount of rows per chunk. Defaults to 100 000.
+
+        Yields:
+            pl.DataFrame: The next chunk of the data
+        """
+        yield from self._query(params).iter_slices(chunk_size)
+
+    def _projected_columns(self, columns: list[str]) -> Optional[list[str]]:
+        """The columns to read out of the columns of the source, in their order.
+        Returns None when every column should be read.
+        """
+        if self.required_columns is None:
+            return None
+        projected = [column for column in columns if column in self.required_columns]
+        if not projected or len(projected) == len(columns):
+            return None
+        return projected
+
+    def _has_custom_query(self) -> bool:
+        """Whether the sync configures a query, which is read as it is"""
+        return bool(getattr(self.source_configuration, "query", None))
+
+    def _quote_column(self, column: str) -> str:
+        return '"' + column.replace('"', '""') + '"'
+
+    def _sql_literal(self, value: Any) -> str:
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return repr(value)
+
+    def _where_clause(self, *conditions: str) -> str:
+        """A where clause of the conditions and the pushed filters, empty when there are none.
+        The filters are only pushed to tables, a configured query is read as it is.
+        """
+        conditions = [f"({condition})" for condition in conditions]
+        if not self._has_custom_query():
+            for column_filter in self.pushed_filters:
+                column = self._quote_column(column_filter.column)
+                if column_filter.value is None:
+                    negation = "NOT " if column_filter.reverse else ""
+                    conditions.append(f"{column} IS {negation}NULL")
+                else:
+                    operator = "<>" if column_filter.reverse else "="
+                    literal = self._sql_literal(column_filter.value)
+                    conditions.append(f"{column} {operator} {literal}")
+        if not conditions:
+            return ""
+        return " WHERE " + " AND ".join(conditions)
+
+    def _rows_to_frame(self, column_names: list[str], rows: list) -> pl.DataFrame:
+        """Builds a frame from the rows of a database cursor, the columns described by the comparison columns get their type.
+        A column whose values don't fit the type is inferred instead and cast later like any other source.
+        """
+        series = []
+        for column_name, values in zip(column_names, zip(*rows)):
+            dtype = self.column_types.get(column_name)
+            try:
+                series.append(pl.Series(column_name, values, dtype=dtype))
+            except (TypeError, pl.exceptions.PolarsError):
+                series.append(pl.Series(column_name, values))
+        return pl.DataFrame(series)
+
+    def _query_partitioned(self, partition: Partition, column: str) -> pl.DataFrame:
+        """Reads the rows of every partition in parallel, over a connection per partition.
+        The frames are concatenated without copying them into one chunk.
+
+        Args:
+            partition (Partition): The partitioning of the sync
+            column (str): The partition column, quoted for the sql dialect of the source
+
+        Returns:
+            pl.DataFrame: The rows of all partitions
+        """
+        filters = self._partition_filters(partition, column)
+        with ThreadPoolExecutor(max_workers=len(filters)) as executor:
+            frames = list(executor.map(self._query_partition, filters))
+        return pl.concat(frames, how="vertical_relaxed", rechunk=False)
+
+    def _partition_filters(self, partition: Partition, column: str) -> list[str]:
+        """The where clause of every partition, rows with a null key are read with the first partition"""
+        if partition.method == "modulo":
+            filters = [
+                f"ABS({column} % {partition.partitions}) = {bucket}"
+                for bucket in range(partition.partitions)
+            ]
+        else:
+            filters = self._range_partition_filters(partition, column)
+        filters[0] = f"({filters[0]}) OR {column} IS NULL"
+        return filters
+
+    def _range_partition_filters(self, partition: Partition, column: str) -> list[str]:
+        lower, upper = self.key_bounds(partition.column)
+        if lower is None:
+            return ["1 = 1"]
+        if not all(
+            isinstance(bound, int) and not isinstance(bound, bool)
+            for bound in (lower, upper)
+        ):
+            raise ValueError(
+                f"The range partitioning of '{partition.column}' requires an integer column, use the modulo method or another column."
+            )
+
+        width = -(-(upper - lower + 1) // partition.partitions)
+        edges = [
+            lower + width * index
+            for index in range(1, partition.partitions)
+            if lower + width * index <= upper
+        ]
+        # The outer partitions are open ended so rows written after the bounds were read are included
+        filters = []
+        for start, end in zip([None, *edges], [*edges, None]):
+            conditions = []
+            if start is not None:
+                conditions.append(f"{column} >= {start}")
+            if end is not None:
+                conditions.append(f"{column} < {end}")
+            filters.append(" AND ".join(conditions) or "1 = 1")
+        return filters
+
+    def _query_partition(self, partition_filter: str) -> pl.DataFrame:
+        """Reads the rows matching the filter over a connection of its own, used by _query_partitioned
+
+        Args:
+            partition_filter (str): The where clause of the partition
+
+        Returns:
+            pl.DataFrame: The rows of the partition
+        """
+        raise NotImplementedError
+
+    def key_bounds(self, key: str) -> tuple[Optional[Any], Optional[Any]]:
+        """Returns the smallest and largest value of the key, used by the range checksum
+
+        Args:
+            key (str): The integer key column
+
+        Returns:
+            tuple[Optional[Any], Optional[Any]]: The bounds, both None when there are no rows
+        """
+        raise NotImplementedError
+
+    def range_checksums(
+        self,
+        key: str,
+        columns: tuple[str, ...],
+        lower: int,
+        upper: int,
+        width: int,
+    ) -> pl.DataFrame:
+        """Calculates a checksum of the rows per bucket of keys, used by the range checksum
+        The rows with lower <= key < upper belong to bucket (key - lower) // width.
+
+        Args:
+            key (str): The integer key column
+            columns (tuple[str, ...]): The columns to include in the checksum besides the key
+            lower (int): The inclusive lower bound of the keys
+            upper (int): The exclusive upper bound of the keys
+            width (int): The amount of keys per bucket
+
+        Returns:
+            pl.DataFrame: The columns bucket, row_count and checksum for every non empty bucket
+        """
+        raise NotImplementedError
+
+    def query_ranges(self, key: str, ranges: list[tuple[int, int]]) -> pl.DataFrame:
+        """Returns the rows with a key in any of the ranges, used by the range checksum
+
+        Args:
+            key (str): The integer key column
+            ranges (list[tuple[int, int]]): The ranges, lower bounds are inclusive and upper bounds exclusive
+
+        Returns:
+            pl.DataFrame: The rows in the ranges
+        """
+        raise NotImplementedError
+
     def insert(self, data: pl.DataFrame) -> None:
         """Insert data into the source
 
@@ -126,6 +362,55 @@ class SourceInterface:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _split_by_unchanged_columns(
+        data: pl.DataFrame, keep: tuple[str, ...] = ()
+    ) -> Iterator[pl.DataFrame]:
+        """Splits the rows to update into groups of rows with the same unchanged columns
+        and removes the unchanged columns, so that each group can be written with a statement
+        that only sets the changed columns. Rows without the information are returned as they are.
+
+        Args:
+            data (pl.DataFrame): The data to update
+            keep (tuple[str, ...], optional): Columns that are never removed, such as the unique columns
+
+        Yields:
+            pl.DataFrame: The groups of rows to update
+        """
+        if BEETL_UNCHANGED_COLUMNS_IDENTIFIER not in data.columns:
+            yield data
+            return
+
+        for group in data.partition_by(
+            BEETL_UNCHANGED_COLUMNS_IDENTIFIER, maintain_order=True
+        ):
+            unchanged = group[BEETL_UNCHANGED_COLUMNS_IDENTIFIER][0].to_list()
+            yield group.drop(
+                BEETL_UNCHANGED_COLUMNS_IDENTIFIER,
+                *[
+                    column
+                    for column in unchanged
+                    if column in group.columns and column not in keep
+                ],
+            )
+
+    @staticmethod
+    def _without_unchanged_fields(row: dict, keep: tuple[str, ...] = ()) -> dict:
+        """Removes the unchanged columns from a row to update, see _split_by_unchanged_columns
+
+        Args:
+            row (dict): The row to update
+            keep (tuple[str, ...], optional): Fields that are never removed, such as the unique fields
+
+        Returns:
+            dict: The row with only the changed fields
+        """
+        unchanged = row.pop(BEETL_UNCHANGED_COLUMNS_IDENTIFIER, None) or ()
+        for field in unchanged:
+            if field not in keep:
+                row.pop(field, None)
+        return row
+
     def delete(self, data: pl.DataFrame) -> None:
         """Delete data from the source
 
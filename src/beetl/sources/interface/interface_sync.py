@@ -18,3 +18,43 @@ class SourceSync:
 
     def __init__(cls, arguments: SourceSyncArguments):
         pass
+
+
+class PartitionArguments(ValidationBaseModel):
+    """Class representation of the partitionOn setting of the sql sources"""
+
+    column: Annotated[
+        str,
+        Field(
+            min_length=1,
+            description="The integer column the rows are partitioned on.",
+        ),
+    ]
+    partitions: Annotated[
+        int,
+        Field(
+            default=4,
+            ge=1,
+            description="The amount of partitions, every partition is read over a connection of its own.",
+        ),
+    ]
+    method: Annotated[
+        Literal["range", "modulo"],
+        Field(
+            default="range",
+            description="'range' splits the keys between the smallest and largest key into equally wide ranges, 'modulo' puts every key in the bucket of its remainder.",
+        ),
+    ]
+
+
+class Partition:
+    """The partitioning of the reads of a sql source"""
+
+    column: str
+    partitions: int
+    method: Literal["range", "modulo"]
+
+    def __init__(self, arguments: PartitionArguments):
+        self.column = arguments.column
+        self.partitions = arguments.partitions
+        self.method = arguments.method
@@ -6,6 +6,7 @@ import requests.adapters
 import urllib3
 from alive_progress import alive_bar
 
+from ...constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
 from ...typings import PolarTypeOverridesParameters
 from ..interface import SourceInterface
 from ..registrated_source import register_source
@@ -29,6 +30,7 @@ class ItopSource(SourceInterface):
     connection_settings: ItopConfig = None
     auth_data: dict = None
     soft_deleted_items: pl.DataFrame = None
+    supports_partial_updates = True
 
     """ A source for Combodo iTop Data data """
 
@@ -392,13 +394,18 @@ class ItopSource(SourceInterface):
         )
 
         for column in data.columns:
-            if column not in update_cols:
+            if (
+                column not in update_cols
+                and column != BEETL_UNCHANGED_COLUMNS_IDENTIFIER
+            ):
                 updateData.drop_in_place(column)
 
         iters = (
             {
                 "type": self.source_configuration.datamodel,
-                "data": x,
+                "data": self._without_unchanged_fields(
+                    x, tuple(self.source_configuration.unique_columns)
+                ),
                 "comment": "Updated via API Sync",
             }
             for x in updateData.iter_rows(named=True)
@@ -1,4 +1,6 @@
-from typing import Literal
+from typing import Annotated, Literal
+
+from pydantic import Field
 
 from ..interface.interface_diff import (
     SourceDiff,
@@ -9,6 +11,8 @@ from ..interface.interface_diff import (
 
 class MongodbDiffConfigArguments(SourceDiffConfigArguments):
     collection: str
+    format: Literal["document", "chunks"] = "document"
+    chunkSize: Annotated[int, Field(default=1000, ge=1)]
 
 
 class MongodbDiffArguments(SourceDiffArguments):
@@ -18,7 +22,11 @@ class MongodbDiffArguments(SourceDiffArguments):
 
 class MongodbDiff(SourceDiff):
     collection: str
+    format: Literal["document", "chunks"]
+    chunk_size: int
 
     def __init__(self, diff_config: MongodbDiffArguments) -> None:
         super().__init__(diff_config)
         self.collection = diff_config.config.collection
+        self.format = diff_config.config.format
+        self.chunk_size = diff_config.config.chunkSize
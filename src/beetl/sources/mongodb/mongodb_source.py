@@ -1,18 +1,22 @@
 """Source for communicating with MongoDB"""
 
-import json
-from typing import Optional
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
 
 from polars import DataFrame, Object
 from pymongo import DeleteOne, MongoClient, UpdateOne
 
-from ...diff.diff_model import DiffStats, DiffUpdate
+from ...diff.diff_model import Diff
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .mongodb_config import MongodbConfig, MongodbConfigArguments
 from .mongodb_diff import MongodbDiff, MongodbDiffArguments
 from .mongodb_sync import MongodbSync, MongodbSyncArguments
 
+DIFF_CHUNK_INSERT_BATCH_SIZE = 16
+"""The amount of chunk documents sent per insert_many"""
+
 
 @register_source("Mongodb")
 class MongodbSource(SourceInterface):
@@ -27,6 +31,7 @@ class MongodbSource(SourceInterface):
 
     diff_config_arguments: Optional[MongodbDiffArguments] = None
     diff_config: Optional[MongodbDiff] = None
+    supports_partial_updates = True
 
     def _configure(self):
         pass
@@ -43,8 +48,9 @@ class MongodbSource(SourceInterface):
             collection = db[self.source_configuration.collection]
             polar = DataFrame(
                 collection.find(
-                    self.source_configuration.filter,
-                    projection=self.source_configuration.projection,
+                    self._query_filter(),
+                    projection=self.source_configuration.projection
+                    or self._required_projection(),
                 )
             )
             if "_id" in polar.columns and polar["_id"].dtype == Object:
@@ -53,6 +59,45 @@ class MongodbSource(SourceInterface):
                 )
             return polar
 
+    def _query_filter(self) -> dict:
+        """The configured filter combined with the pushed filters"""
+        conditions = {}
+        for column_filter in self.pushed_filters:
+            # _id is compared as a string after reading, but stored as an ObjectId
+            if column_filter.column == "_id":
+                continue
+            if not column_filter.reverse:
+                conditions[column_filter.column] = column_filter.value
+            elif column_filter.value is None:
+                conditions[column_filter.column] = {"$ne": None}
+            else:
+                # $ne matches missing fields, which the transformer removes as nulls
+                conditions[column_filter.column] = {"$nin": [column_filter.value, None]}
+
+        configured = self.source_configuration.filter or {}
+        if not conditions:
+            return configured
+        if not configured:
+            return conditions
+        return {"$and": [configured, conditions]}
+
+    def _required_projection(self) -> Optional[dict[str, int]]:
+        """A projection of the required fields, used when no projection is configured"""
+        if self.required_columns is None:
+            return None
+        fields = [
+            field
+            for field in self.required_columns
+            if field and not field.startswith("$")
+        ]
+        # A path can't be projected together with a path inside of it
+        fields = [
+            field
+            for field in fields
+            if not any(field.startswith(f"{other}.") for other in fields)
+        ]
+        return {field: 1 for field in sorted(fields)}
+
     def insert(self, data: DataFrame) -> int:
         with MongoClient(self.connection_settings.connection_string) as client:
             db = client[self.connection_settings.database]
@@ -71,6 +116,7 @@ class MongodbSource(SourceInterface):
             }
             for field_name in self.source_configuration.unique_fields:
                 del row[field_name]
+            row = self._without_unchanged_fields(row)
             updates.append(UpdateOne(mutation_filter, {"$set": row}))
 
         if not len(updates):
@@ -106,23 +152,114 @@ class MongodbSource(SourceInterface):
                 "Unique fields are required for MongoDB when used as a destination"
             )
 
-    def store_diff(self, diff):
+    def store_diff(self, diff: Diff):
+        if not self.diff_config:
+            raise ValueError("Diff configuration is missing")
+
+        header = {
+            "name": diff.name,
+            "date": diff.date_as_string(),
+            "uuid": str(diff.uuid),
+            "version": diff.version,
+        }
         with MongoClient(self.connection_settings.connection_string) as client:
             db = client[self.connection_settings.database]
+
+            if self.diff_config.format == "chunks":
+                chunk_count = self._insert_diff_chunks(
+                    db[self._diff_chunk_collection()], diff
+                )
+                header.update(format="chunks", chunks=chunk_count)
+            else:
+                header.update(
+                    updates=diff.update_frame.to_dicts(),
+                    inserts=diff.insert_frame.to_dicts(),
+                    deletes=diff.delete_frame.to_dicts(),
+                )
+            header["stats"] = diff.stats.to_dict()
+
+            # The header is written last, a diff is only visible once all of its chunks are stored
             collection = db[self.diff_config.collection]
-            result = collection.insert_many(
-                [
-                    {
-                        "name": diff.name,
-                        "date": diff.date_as_string(),
-                        "uuid": str(diff.uuid),
-                        "version": diff.version,
-                        "updates": [update.to_dict() for update in diff.updates],
-                        "inserts": diff.inserts,
-                        "deletes": diff.deletes,
-                        "stats": diff.stats.to_dict(),
-                    }
-                ]
-            )
+            result = collection.insert_many([header])
             if not len(result.inserted_ids) == 1:
                 raise ValueError("Error inserting diff into MongoDB")
+
+    def _diff_chunk_collection(self) -> str:
+        return f"{self.diff_config.collection}_chunks"
+
+    def _insert_diff_chunks(self, collection, diff: Diff) -> int:
+        """Inserts the chunk documents in unordered batches and returns the amount of chunks"""
+        collection.create_index([("diff_uuid", 1), ("sequence", 1)])
+        chunk_count = 0
+        batch = []
+        for document in self._diff_chunk_documents(diff, self.diff_config.chunk_size):
+            batch.append(document)
+            chunk_count += 1
+            if len(batch) == DIFF_CHUNK_INSERT_BATCH_SIZE:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+        return chunk_count
+
+    @staticmethod
+    def _diff_chunk_documents(diff: Diff, chunk_size: int) -> Iterator[dict]:
+        """One document per chunk_size changes of the same operation, numbered by sequence"""
+        sequence = 0
+        for operation, frame in (
+            ("update", diff.update_frame),
+            ("insert", diff.insert_frame),
+            ("delete", diff.delete_frame),
+        ):
+            for chunk in frame.iter_slices(chunk_size):
+                yield {
+                    "diff_uuid": str(diff.uuid),
+                    "sequence": sequence,
+                    "operation": operation,
+                    "changes": chunk.to_dicts(),
+                }
+                sequence += 1
+
+    def read_diff(self, uuid: str) -> Diff:
+        """Reads a diff stored by store_diff, reassembling the chunks of a diff stored as chunks"""
+        if not self.diff_config:
+            raise ValueError("Diff configuration is missing")
+
+        with MongoClient(self.connection_settings.connection_string) as client:
+            db = client[self.connection_settings.database]
+            header = db[self.diff_config.collection].find_one(
+                {"uuid": str(uuid)}, projection={"_id": False}
+            )
+            if header is None:
+                raise ValueError(f"No diff with the uuid '{uuid}' was found")
+
+            chunks = []
+            if header.get("format") == "chunks":
+                chunks = db[self._diff_chunk_collection()].find(
+                    {"diff_uuid": str(uuid)}, projection={"_id": False}
+                )
+                chunks = chunks.sort("sequence")
+            return self._diff_from_documents(header, chunks)
+
+    @staticmethod
+    def _diff_from_documents(header: dict, chunks: Iterable[dict]) -> Diff:
+        changes = {"update": [], "insert": [], "delete": []}
+        if header.get("format") == "chunks":
+            for chunk in chunks:
+                changes[chunk["operation"]].extend(chunk["changes"])
+        else:
+            changes = {
+                "update": header["updates"],
+                "insert": header["inserts"],
+                "delete": header["deletes"],
+            }
+
+        diff = Diff(
+            header["name"],
+            DataFrame(changes["update"]) if changes["update"] else DataFrame(),
+            changes["insert"],
+            changes["delete"],
+        )
+        diff.date = datetime.fromisoformat(header["date"])
+        diff.uuid = UUID(header["uuid"])
+        return diff
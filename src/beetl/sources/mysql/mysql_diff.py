@@ -9,6 +9,7 @@ from ..interface.interface_diff import (
 
 class MysqlDiffConfigArguments(SourceDiffConfigArguments):
     table: str
+    format: Literal["json", "rows"] = "json"
 
 
 class MysqlDiffArguments(SourceDiffArguments):
@@ -18,7 +19,9 @@ class MysqlDiffArguments(SourceDiffArguments):
 
 class MysqlDiff(SourceDiff):
     table: str
+    format: Literal["json", "rows"]
 
     def __init__(self, diff_config: MysqlDiffArguments) -> None:
         super().__init__(diff_config)
         self.table = diff_config.config.table
+        self.format = diff_config.config.format
@@ -1,12 +1,15 @@
 """A source for MySQL data"""
 
-import json
-from typing import Any
+import os
+import tempfile
+from typing import Any, Iterator, Optional
 
 import polars as pl
 import sqlalchemy as sqla
 
-from ...diff import DiffStats, DiffUpdate
+from ...constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
+from ...diff import Diff
+from ...diff.diff_model import CHUNK_SIZE
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .mysql_config import MysqlConfig, MysqlConfigArguments
@@ -27,6 +30,8 @@ class MysqlSource(SourceInterface):
 
     diff_config: MysqlDiff = None
     diff_config_arguments: MysqlDiffArguments = None
+    supports_range_checksum = True
+    supports_partial_updates = True
 
     def _configure(self):
         pass
@@ -37,20 +42,31 @@ class MysqlSource(SourceInterface):
     def _disconnect(self):
         pass
 
+    def _create_engine(self) -> sqla.Engine:
+        """An engine using pymysql, allowed to load local files when the insertMethod is load_data"""
+        connect_args = {}
+        if (
+            self.source_configuration is not None
+            and self.source_configuration.insert_method == "load_data"
+        ):
+            connect_args["local_infile"] = True
+        return sqla.create_engine(
+            self.connection_settings.connection_string.replace(
+                "mysql://", "mysql+pymysql://"
+            ),
+            connect_args=connect_args,
+        )
+
     def _query(
         self, params=None, customQuery: str = None, returnData: bool = True
     ) -> pl.DataFrame:
         query = customQuery
 
         if query is None:
-            if self.source_configuration.query is not None:
-                query = self.source_configuration.query
-
-            if query is None:
-                if self.source_configuration.table is None:
-                    raise ValueError("No query or table specified")
-
-                query = f"SELECT * FROM {self.source_configuration.table}"
+            partition = self.source_configuration.partition_on
+            if returnData and partition is not None:
+                return self._query_partitioned(partition, f"`{partition.column}`")
+            query = self._source_query()
 
         if returnData:
             try:
@@ -83,13 +99,123 @@ class MysqlSource(SourceInterface):
                 con.execute(sqla.text(query))
                 con.commit()
 
+    def _source_query(self) -> str:
+        if self.source_configuration.query is not None:
+            return self.source_configuration.query
+
+        if self.source_configuration.table is None:
+            raise ValueError("No query or table specified")
+
+        return f"SELECT {self._select_list()} FROM {self.source_configuration.table}{self._where_clause()}"
+
+    def _select_list(self) -> str:
+        """The columns read from the table, limited to the required columns when they are known"""
+        if self.required_columns is None or self._has_custom_query():
+            return "*"
+        columns = self._projected_columns(
+            self._query(
+                customQuery=f"SELECT * FROM {self.source_configuration.table} LIMIT 0"
+            ).columns
+        )
+        if columns is None:
+            return "*"
+        return ", ".join(self._quote_column(column) for column in columns)
+
+    def _quote_column(self, column: str) -> str:
+        return "`" + column.replace("`", "``") + "`"
+
+    def _sql_literal(self, value: Any) -> str:
+        # Backslashes start escape sequences in mysql strings
+        if isinstance(value, str):
+            value = value.replace("\\", "\\\\")
+        return super()._sql_literal(value)
+
+    def _query_chunks(
+        self, params=None, chunk_size: int = 100_000
+    ) -> Iterator[pl.DataFrame]:
+        """Yields the rows of the query in chunks read from an unbuffered cursor,
+        the rows are read from the server as the chunks are fetched instead of all at once.
+        """
+        with sqla.create_engine(
+            self.connection_settings.connection_string.replace(
+                "mysql://", "mysql+pymysql://"
+            )
+        ).connect() as con:
+            result = con.execution_options(
+                stream_results=True, max_row_buffer=chunk_size
+            ).execute(sqla.text(self._source_query()))
+            column_names = list(result.keys())
+            for rows in result.partitions(chunk_size):
+                yield self._rows_to_frame(column_names, rows)
+
+    def _relation(self) -> str:
+        """The table or query of the sync, usable in a FROM clause"""
+        if self.source_configuration.query is not None:
+            return f"({self.source_configuration.query}) AS beetl_relation"
+        if self.source_configuration.table is None:
+            raise ValueError("No query or table specified")
+        return self.source_configuration.table
+
+    def _query_partition(self, partition_filter: str) -> pl.DataFrame:
+        # Every read opens a connection of its own
+        return self._query(
+            customQuery=f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(partition_filter)}"
+        )
+
+    def key_bounds(self, key: str):
+        bounds = self._query(
+            customQuery=f"SELECT MIN(`{key}`) AS lower, MAX(`{key}`) AS upper FROM {self._relation()}"
+        )
+        return bounds.row(0)
+
+    def range_checksums(
+        self, key: str, columns: tuple[str, ...], lower: int, upper: int, width: int
+    ) -> pl.DataFrame:
+        # CONCAT_WS skips nulls, the ISNULL flags keep a null apart from an empty value
+        values = ", ".join(f"`{column}`" for column in (key, *columns))
+        null_flags = ", ".join(f"ISNULL(`{column}`)" for column in columns)
+        row = f"CONCAT_WS('|', {values}{', ' + null_flags if null_flags else ''})"
+        query = f"""
+            SELECT
+                (`{key}` - {lower}) DIV {width} AS bucket,
+                COUNT(*) AS row_count,
+                BIT_XOR(CAST(CONV(SUBSTRING(MD5({row}), 1, 16), 16, 10) AS UNSIGNED)) AS checksum
+            FROM {self._relation()}
+            WHERE `{key}` >= {lower} AND `{key}` < {upper}
+            GROUP BY 1
+        """
+        return self._query(customQuery=query)
+
+    def query_ranges(self, key: str, ranges: list[tuple[int, int]]) -> pl.DataFrame:
+        range_clause = " OR ".join(
+            f"(`{key}` >= {lower} AND `{key}` < {upper})" for lower, upper in ranges
+        )
+        return self._query(
+            customQuery=f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(range_clause)}"
+        )
+
     def _insert(
-        self, data: pl.DataFrame, table: str = None, connection_string: str = None
+        self,
+        data: pl.DataFrame,
+        table: str = None,
+        connection: Optional[sqla.Connection] = None,
     ):
+        """Inserts the rows into the table, over the connection when one is given"""
         if table is None:
             table = self.source_configuration.table
-        if connection_string is None:
-            connection_string = self.connection_settings.connection_string
+
+        if connection is not None:
+            if self.source_configuration.insert_method == "load_data":
+                self._load_data(connection, data, table)
+            else:
+                data.write_database(table, connection, if_table_exists="append")
+            return len(data)
+
+        if self.source_configuration.insert_method == "load_data":
+            with self._create_engine().connect() as con:
+                self._load_data(con, data, table)
+                con.commit()
+            return len(data)
 
         try:
             data.write_database(
@@ -108,45 +234,67 @@ class MysqlSource(SourceInterface):
 
         return len(data)
 
+    def _load_data(self, connection: sqla.Connection, data: pl.DataFrame, table: str):
+        """Writes the rows to a temporary csv file and loads it with LOAD DATA LOCAL INFILE.
+        Strings are always quoted and nulls are written as an unquoted NULL, which is only read as null when it isn't quoted.
+        Without an escape character backslashes are kept as is, quotes in strings are doubled.
+        Columns that can't be written as csv are inserted with write_database instead.
+        """
+        if any(
+            dtype.is_nested() or dtype in (pl.Binary, pl.Object)
+            for dtype in data.dtypes
+        ):
+            data.write_database(table, connection, if_table_exists="append")
+            return
+
+        # Booleans are written as true and false, which mysql doesn't read as numbers
+        data = data.with_columns(pl.col(pl.Boolean).cast(pl.Int8))
+        columns = ", ".join(self._quote_column(column) for column in data.columns)
+        descriptor, path = tempfile.mkstemp(suffix=".csv")
+        os.close(descriptor)
+        try:
+            data.write_csv(
+                path,
+                include_header=False,
+                null_value="NULL",
+                quote_style="non_numeric",
+                datetime_format="%Y-%m-%d %H:%M:%S%.f",
+            )
+            cursor = connection.connection.cursor()
+            try:
+                cursor.execute(f"""
+                    LOAD DATA LOCAL INFILE {self._sql_literal(path)}
+                    INTO TABLE {table}
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                    LINES TERMINATED BY '\\n'
+                    ({columns})
+                    """)
+            finally:
+                cursor.close()
+        finally:
+            os.remove(path)
+
     def insert(self, data: pl.DataFrame):
         self._validate_unique_columns()
         return self._insert(data)
 
     def update(self, data: pl.DataFrame):
         self._validate_unique_columns()
+        partial = BEETL_UNCHANGED_COLUMNS_IDENTIFIER in data.columns
+        for group in self._split_by_unchanged_columns(
+            data, tuple(self.source_configuration.unique_columns)
+        ):
+            self._update(group, partial)
 
-        tempDB = (self.source_configuration.table + "_udTemp").lower()
-        try:
-            with sqla.create_engine(
-                self.connection_settings.connection_string
-            ).connect() as con:
-                con.execute(sqla.text(f"DROP TABLE IF EXISTS {tempDB}"))
-                con.execute(
-                    sqla.text(
-                        f"CREATE TEMPORARY TABLE {tempDB} "
-                        f"LIKE {self.source_configuration.table}"
-                    )
-                )
-                con.commit()
-
-        except ModuleNotFoundError:
-            with sqla.create_engine(
-                self.connection_settings.connection_string.replace(
-                    "mysql://", "mysql+pymysql://"
-                )
-            ).connect() as con:
-                con.execute(sqla.text(f"DROP TABLE IF EXISTS {tempDB}"))
-                con.execute(
-                    sqla.text(
-                        f"CREATE TEMPORARY TABLE {tempDB} "
-                        f"LIKE {self.source_configuration.table}"
-                    )
-                )
-                con.commit()
-
-        # Insert data into temporary table
-        self._insert(data, table=tempDB)
+        return len(data)
 
+    def _update(self, data: pl.DataFrame, partial: bool):
+        """Writes the rows through a temporary table.
+        Rows with all columns are replaced, partial rows only set the columns they contain,
+        since REPLACE INTO would reset the missing columns to their defaults.
+        """
+        tempDB = (self.source_configuration.table + "_udTemp").lower()
         fields_to_update = [
             field.name
             for field in data.get_columns()
@@ -161,34 +309,68 @@ class MysqlSource(SourceInterface):
             SELECT {field_spec} FROM {tempDB}
         """
 
-        self._query(customQuery=query, returnData=False)
+        if partial:
+            set_clause = ", ".join(
+                f"target.`{fieldName}` = changes.`{fieldName}`"
+                for fieldName in data.columns
+                if fieldName not in self.source_configuration.unique_columns
+                and fieldName not in self.source_configuration.skip_columns
+            )
+            on_clause = " AND ".join(
+                f"target.`{fieldName}` = changes.`{fieldName}`"
+                for fieldName in self.source_configuration.unique_columns
+            )
+            query = f"""
+                UPDATE {self.source_configuration.table} AS target
+                INNER JOIN {tempDB} AS changes ON {on_clause}
+                SET {set_clause}
+            """
 
-        return len(data)
+        # Temporary tables only exist on the connection that created them
+        with self._create_engine().connect() as con:
+            con.execute(sqla.text(f"DROP TABLE IF EXISTS {tempDB}"))
+            con.execute(
+                sqla.text(
+                    f"CREATE TEMPORARY TABLE {tempDB} "
+                    f"SELECT {', '.join(map(self._quote_column, data.columns))} "
+                    f"FROM {self.source_configuration.table} LIMIT 0"
+                )
+            )
+            self._insert(data, table=tempDB, connection=con)
+            con.execute(sqla.text(query))
+            con.execute(sqla.text(f"DROP TEMPORARY TABLE {tempDB}"))
+            con.commit()
 
     def delete(self, data: pl.DataFrame):
-        batch_size = 500
-        batches = [data]
-
-        if len(data) > batch_size:
-            batches = []
-
-            for i in range(0, len(data), batch_size):
-                batches.append(data[i : i + batch_size])
+        """Deletes the rows matching the unique columns of the data.
+        The keys are loaded into a temporary table, deleteBatchSize at a time, and deleted with a join on it.
+        """
+        self._validate_unique_columns()
+        unique_columns = self.source_configuration.unique_columns
+        keys = data.select(unique_columns)
+        key_list = ", ".join(self._quote_column(column) for column in unique_columns)
+        matching_keys = " AND ".join(
+            f"target.{column} = staged.{column}"
+            for column in map(self._quote_column, unique_columns)
+        )
 
-        for batch in batches:
-            id_clause = " AND ".join(
-                (
-                    f"`{fieldName}` IN ({','.join([self._quote_if_needed(x) for x in batch[fieldName].to_list()])})"
-                    for fieldName in self.source_configuration.unique_columns
+        # Temporary tables only exist on the connection that created them
+        with self._create_engine().connect() as con:
+            con.execute(
+                sqla.text(
+                    f"CREATE TEMPORARY TABLE beetl_delete_keys (INDEX ({key_list})) "
+                    f"SELECT {key_list} FROM {self.source_configuration.table} LIMIT 0"
                 )
             )
-
-            query = f"""
-                DELETE FROM {self.source_configuration.table}
-                WHERE {id_clause}
-            """
-
-            self._query(customQuery=query, returnData=False)
+            for batch in keys.iter_slices(self.source_configuration.delete_batch_size):
+                self._insert(batch, table="beetl_delete_keys", connection=con)
+                con.execute(sqla.text(f"""
+                        DELETE target FROM {self.source_configuration.table} AS target
+                        INNER JOIN beetl_delete_keys AS staged ON {matching_keys}
+                        """))
+                con.execute(sqla.text("TRUNCATE TABLE beetl_delete_keys"))
+            con.execute(sqla.text("DROP TEMPORARY TABLE beetl_delete_keys"))
+            con.commit()
 
         return len(data)
 
@@ -198,14 +380,10 @@ class MysqlSource(SourceInterface):
                 "MySQL source requires the unique_columns to be set if used as a destination"
             )
 
-    def _quote_if_needed(self, identifier: Any) -> str:
-        if isinstance(identifier, str):
-            return f"'{identifier}'"
-        return str(identifier)
-
-    def store_diff(self, diff):
+    def store_diff(self, diff: Diff):
         if not self.diff_config:
             raise ValueError("Diff configuration is missing")
+        as_rows = self.diff_config.format == "rows"
         metadata = sqla.MetaData()
         table = sqla.Table(
             self.diff_config.table,
@@ -219,22 +397,48 @@ class MysqlSource(SourceInterface):
             sqla.Column("deletes", sqla.TEXT),
             sqla.Column("stats", sqla.TEXT),
         )
+        changes_table = sqla.Table(
+            f"{self.diff_config.table}_changes",
+            metadata,
+            sqla.Column("diff_uuid", sqla.Uuid, nullable=False, index=True),
+            sqla.Column("operation", sqla.String(length=16), nullable=False),
+            sqla.Column("old", sqla.TEXT),
+            sqla.Column("new", sqla.TEXT),
+        )
 
         insert_statement = sqla.insert(table).values(
             name=diff.name,
             date=diff.date,
             uuid=diff.uuid,
             version=diff.version,
-            updates=json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-            inserts=json.dumps(diff.inserts),
-            deletes=json.dumps(diff.deletes),
-            stats=json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
+            updates=None if as_rows else diff.updates_json(),
+            inserts=None if as_rows else diff.inserts_json(),
+            deletes=None if as_rows else diff.deletes_json(),
+            stats=diff.stats_json(),
         )
         with sqla.create_engine(
             self.connection_settings.connection_string.replace(
                 "mysql://", "mysql+pymysql://"
             )
         ).connect() as con:
-            metadata.create_all(con)
+            metadata.create_all(
+                con, tables=[table, changes_table] if as_rows else [table]
+            )
             con.execute(insert_statement)
+            if as_rows:
+                self._store_diff_rows(con, changes_table, diff)
             con.commit()
+
+    @staticmethod
+    def _store_diff_rows(
+        connection: sqla.Connection, changes_table: sqla.Table, diff: Diff
+    ):
+        """Stores one row per change in the changes table, a chunk at a time with executemany"""
+        for chunk in diff.change_rows().iter_slices(CHUNK_SIZE):
+            connection.execute(
+                sqla.insert(changes_table),
+                [
+                    {"diff_uuid": diff.uuid, **row}
+                    for row in chunk.iter_rows(named=True)
+                ],
+            )
@@ -3,7 +3,12 @@ from typing import Annotated, Literal, Optional
 from pydantic import ConfigDict, Field, model_validator
 
 from ...errors import ConfigValidationError, RequiredDestinationFieldError
-from ..interface import SourceSync, SourceSyncArguments
+from ..interface import (
+    Partition,
+    PartitionArguments,
+    SourceSync,
+    SourceSyncArguments,
+)
 
 
 class MysqlSyncArguments(SourceSyncArguments):
@@ -20,6 +25,34 @@ class MysqlSyncArguments(SourceSyncArguments):
     uniqueColumns: Annotated[list[str], Field(default=[])]
     skipColumns: Annotated[list[str], Field(default=[])]
     type: Annotated[Literal["Mysql"], Field(defauls="Mysql")] = "Mysql"
+    insertMethod: Annotated[
+        Literal["write_database", "load_data"],
+        Field(
+            default="write_database",
+            description="How rows are written. 'write_database' issues batched INSERT statements, 'load_data' writes the rows to a csv file and loads it with LOAD DATA LOCAL INFILE. Also used to fill the staging tables of updates and deletes.",
+        ),
+    ]
+    deleteBatchSize: Annotated[
+        int,
+        Field(
+            default=100_000,
+            ge=1,
+            description="The amount of keys staged in a temporary table and deleted per statement.",
+        ),
+    ]
+    partitionOn: Annotated[
+        Optional[PartitionArguments],
+        Field(
+            default=None,
+            description="Reads the rows in parallel, one partition of the column per connection.",
+        ),
+    ]
+
+    @model_validator(mode="before")
+    def propagate_nested_location(cls, values: dict):
+        cls.propagate_location("partitionOn", values)
+
+        return values
 
     @model_validator(mode="after")
     def validate_as_source(cls, instance: "MysqlSyncArguments"):
@@ -59,6 +92,9 @@ class MysqlSync(SourceSync):
     skip_columns: list[str] = None
     table: str = None
     query: str = None
+    partition_on: Partition = None
+    insert_method: Literal["write_database", "load_data"] = "write_database"
+    delete_batch_size: int = 100_000
 
     def __init__(self, arguments: MysqlSyncArguments):
         super().__init__(arguments)
@@ -67,3 +103,8 @@ class MysqlSync(SourceSync):
         self.query = arguments.query
         self.unique_columns = arguments.uniqueColumns
         self.skip_columns = arguments.skipColumns
+        self.insert_method = arguments.insertMethod
+        self.delete_batch_size = arguments.deleteBatchSize
+        self.partition_on = (
+            Partition(arguments.partitionOn) if arguments.partitionOn else None
+        )
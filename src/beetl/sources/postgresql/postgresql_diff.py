@@ -13,6 +13,7 @@ class PostgresDiffConfigArguments(SourceDiffConfigArguments):
     """Represents the source specifig config for the diff configuration of the Postgresql source."""
 
     table: str
+    format: Literal["json", "rows"] = "json"
 
 
 class PostgresDiffArguments(SourceDiffArguments):
@@ -26,7 +27,9 @@ class PostgresDiff(SourceDiff):
     """Represents the parsed diff configuration for the Postgresql source."""
 
     table: str
+    format: Literal["json", "rows"]
 
     def __init__(self, diff_config: PostgresDiffArguments) -> None:
         super().__init__(diff_config)
         self.table = diff_config.config.table
+        self.format = diff_config.config.format
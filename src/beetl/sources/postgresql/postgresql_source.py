@@ -1,13 +1,15 @@
 """Contains the Postgresql source implementation."""
 
-import json
 import uuid
-from typing import Any
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 import polars as pl
 import psycopg
+import sqlalchemy as sqla
 
-from ...diff import DiffStats, DiffUpdate
+from ...diff import Diff
+from ...diff.diff_model import CHUNK_SIZE
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .postgresql_config import PostgresConfig, PostgresConfigArguments
@@ -28,15 +30,54 @@ class PostgresSource(SourceInterface):
 
     diff_config: PostgresDiff = None
     diff_config_arguments: PostgresDiffArguments = None
+    engine: Optional[sqla.Engine] = None
+    supports_range_checksum = True
+    supports_partial_updates = True
 
     def _configure(self):
         pass
 
     def _connect(self):
-        pass
+        if self.engine is None:
+            self.engine = self._create_engine()
 
     def _disconnect(self):
-        pass
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
+
+    def _create_engine(self) -> sqla.Engine:
+        """An engine holding a pool of psycopg connections, checked before they are reused"""
+        return sqla.create_engine(
+            self.connection_settings.connection_string.replace(
+                "postgresql://", "postgresql+psycopg://"
+            ),
+            pool_pre_ping=True,
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqla.Connection]:
+        """A connection from the pool with a transaction that is committed when the block completes
+        and rolled back if it raises. Outside of connect and disconnect an engine is created for the block.
+        """
+        engine = self.engine or self._create_engine()
+        try:
+            with engine.begin() as connection:
+                yield connection
+        finally:
+            if engine is not self.engine:
+                engine.dispose()
+
+    def _fetch(self, query: str) -> pl.DataFrame:
+        """Reads the result of a small query through a pooled connection"""
+        with self._transaction() as connection:
+            with connection.connection.cursor() as cursor:
+                cursor.execute(query)
+                column_names = [column.name for column in cursor.description]
+                rows = cursor.fetchall()
+        if not rows:
+            return pl.DataFrame(schema=column_names)
+        return self._rows_to_frame(column_names, rows)
 
     def _query(
         self, params=None, customQuery: str = None, returnData: bool = True
@@ -44,140 +85,250 @@ class PostgresSource(SourceInterface):
         query = customQuery
 
         if query is None:
-            if self.source_configuration.query is not None:
-                query = self.source_configuration.query
-
-            if query is None:
-                if self.source_configuration.table is None:
-                    raise ValueError("No query or table specified")
-
-                query = f"SELECT * FROM {self.source_configuration.table}"
+            partition = self.source_configuration.partition_on
+            if returnData and partition is not None:
+                return self._query_partitioned(partition, partition.column)
+            query = self._source_query()
 
         if returnData:
             return pl.read_database_uri(
                 query=query,
                 uri=self.connection_settings.connection_string,
+                protocol=self.source_configuration.read_protocol,
             )
 
-            # Pylint failes to acnowledge that the context manager is used
-            # The changes won't commit if you remove it
-            # pylint: disable=not-context-manager
-        with psycopg.connect(self.connection_settings.connection_string) as connection:
-            with connection.cursor() as cursor:
+        with self._transaction() as connection:
+            with connection.connection.cursor() as cursor:
                 cursor.execute(query)
 
+    def _source_query(self) -> str:
+        if self.source_configuration.query is not None:
+            return self.source_configuration.query
+
+        if self.source_configuration.table is None:
+            raise ValueError("No query or table specified")
+
+        return f"SELECT {self._select_list()} FROM {self.source_configuration.table}{self._where_clause()}"
+
+    def _select_list(self) -> str:
+        """The columns read from the table, limited to the required columns when they are known"""
+        if self.required_columns is None or self._has_custom_query():
+            return "*"
+        columns = self._projected_columns(
+            self._fetch(
+                f"SELECT * FROM {self.source_configuration.table} LIMIT 0"
+            ).columns
+        )
+        if columns is None:
+            return "*"
+        return ", ".join(self._quote_column(column) for column in columns)
+
+    def _query_chunks(
+        self, params=None, chunk_size: int = 100_000
+    ) -> Iterator[pl.DataFrame]:
+        """Yields the rows of the query in chunks read from a server side cursor,
+        the server only sends the rows of the chunk that is fetched.
+        """
+        with self._transaction() as connection:
+            # A named cursor is declared on the server
+            with connection.connection.cursor(
+                name=f"beetl_{uuid.uuid4().hex}"
+            ) as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(self._source_query())
+                column_names = [column.name for column in cursor.description]
+                while rows := cursor.fetchmany(chunk_size):
+                    yield self._rows_to_frame(column_names, rows)
+
+    def _relation(self) -> str:
+        """The table or query of the sync, usable in a FROM clause"""
+        if self.source_configuration.query is not None:
+            return f"({self.source_configuration.query}) AS beetl_relation"
+        if self.source_configuration.table is None:
+            raise ValueError("No query or table specified")
+        return self.source_configuration.table
+
+    def _query_partition(self, partition_filter: str) -> pl.DataFrame:
+        # Every read opens a connection of its own
+        return self._query(
+            customQuery=f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(partition_filter)}"
+        )
+
+    def key_bounds(self, key: str):
+        bounds = self._fetch(
+            f"SELECT MIN({key}) AS lower, MAX({key}) AS upper FROM {self._relation()}"
+        )
+        return bounds.row(0)
+
+    def range_checksums(
+        self, key: str, columns: tuple[str, ...], lower: int, upper: int, width: int
+    ) -> pl.DataFrame:
+        row = ", ".join((key, *columns))
+        query = f"""
+            SELECT
+                ({key} - {lower}) / {width} AS bucket,
+                COUNT(*) AS row_count,
+                md5(string_agg(md5(ROW({row})::text), '' ORDER BY {key})) AS checksum
+            FROM {self._relation()}
+            WHERE {key} >= {lower} AND {key} < {upper}
+            GROUP BY 1
+        """
+        return self._fetch(query)
+
+    def query_ranges(self, key: str, ranges: list[tuple[int, int]]) -> pl.DataFrame:
+        range_clause = " OR ".join(
+            f"({key} >= {lower} AND {key} < {upper})" for lower, upper in ranges
+        )
+        return self._query(
+            customQuery=f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(range_clause)}"
+        )
+
     def _insert(
-        self, data: pl.DataFrame, table: str = None, connection_string: str = None
+        self,
+        data: pl.DataFrame,
+        table: str = None,
+        connection: Optional[sqla.Connection] = None,
     ):
+        """Inserts the rows into the table, in the transaction of the connection when one is given"""
         if table is None:
             table = self.source_configuration.table
-        if connection_string is None:
-            connection_string = self.connection_settings.connection_string
-
-        connection_string = connection_string.replace(
-            "postgresql://", "postgresql+psycopg://"
-        )
+        if connection is None:
+            with self._transaction() as connection:
+                return self._insert(data, table, connection)
 
-        data.write_database(table, connection_string, if_table_exists="append")
+        if self.source_configuration.insert_method == "copy":
+            with connection.connection.cursor() as cursor:
+                self._copy_rows(cursor, data, table)
+        else:
+            data.write_database(table, connection, if_table_exists="append")
 
         return len(data)
 
+    def _copy_rows(self, cursor: psycopg.Cursor, data: pl.DataFrame, table: str):
+        """Loads the rows into the table with COPY FROM STDIN.
+        The rows are sent as csv written by polars a chunk at a time, strings are quoted
+          so that only nulls are written as an unquoted \\N.
+        Columns that can't be written as csv are sent row by row in the text format, adapted by psycopg.
+        """
+        columns = ", ".join(self._quote_column(column) for column in data.columns)
+        if any(
+            dtype.is_nested() or dtype in (pl.Binary, pl.Object)
+            for dtype in data.dtypes
+        ):
+            with cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in data.iter_rows():
+                    copy.write_row(row)
+            return
+
+        with cursor.copy(
+            f"COPY {table} ({columns}) FROM STDIN (FORMAT csv, NULL '\\N')"
+        ) as copy:
+            for chunk in data.iter_slices(CHUNK_SIZE):
+                copy.write(
+                    chunk.write_csv(
+                        include_header=False,
+                        null_value="\\N",
+                        quote_style="non_numeric",
+                    )
+                )
+
     def insert(self, data: pl.DataFrame):
         return self._insert(data)
 
     def update(self, data: pl.DataFrame):
         self._validate_unique_columns()
-        temp_table_name = (
-            self.source_configuration.table
-            + "_udTemp_"
-            + str(uuid.uuid4()).replace("-", "")
-        ).lower()
+        with self._transaction() as connection:
+            for group in self._split_by_unchanged_columns(
+                data, tuple(self.source_configuration.unique_columns)
+            ):
+                self._update(group, connection)
 
-        try:
-            # Pylint failes to acnowledge that the context manager is used
-            # The changes won't commit if you remove it
-            # pylint: disable=not-context-manager
-            with psycopg.connect(
-                self.connection_settings.connection_string
-            ) as connection:
-                with connection.cursor() as cursor:
-                    create_temp_table_with_same_structure_as_destination = f"CREATE TABLE {temp_table_name} AS SELECT * FROM {self.source_configuration.table} where 1=0"
-                    cursor.execute(create_temp_table_with_same_structure_as_destination)
-
-            self._insert(data, table=temp_table_name)
-
-            source_table_name = temp_table_name
-            destination_table_name = self.source_configuration.table
-
-            columns_to_update = [
-                column.name
-                for column in data.get_columns()
-                if not column.name in self.source_configuration.unique_columns
-                and not column.name in self.source_configuration.skip_columns
-            ]
-            set_values_of_comparison_columns = "SET " + ", ".join(
-                (
-                    f"{columnName} = {source_table_name}.{columnName}"
-                    for columnName in columns_to_update
-                )
-            )
+        return len(data)
 
-            where_unique_columns_are_matching = "WHERE " + " AND ".join(
-                (
-                    f"{destination_table_name}.{columnName} = {source_table_name}.{columnName}"
-                    for columnName in self.source_configuration.unique_columns
-                )
-            )
+    def _update(self, data: pl.DataFrame, connection: sqla.Connection):
+        """Stages the rows in a temporary table on the connection of the update and updates the table from it.
+        The keys of the staged rows are indexed after they are loaded, and analyzed so the planner can join on the index.
+        """
+        unique_columns = self.source_configuration.unique_columns
+        columns_to_update = [
+            column
+            for column in data.columns
+            if column not in unique_columns
+            and column not in self.source_configuration.skip_columns
+        ]
+        staged_columns = ", ".join(
+            self._quote_column(column)
+            for column in (*unique_columns, *columns_to_update)
+        )
+        key_list = ", ".join(self._quote_column(column) for column in unique_columns)
+        set_values_of_comparison_columns = ", ".join(
+            f"{column} = staged.{column}"
+            for column in map(self._quote_column, columns_to_update)
+        )
+        where_unique_columns_are_matching = " AND ".join(
+            f"target.{column} = staged.{column}"
+            for column in map(self._quote_column, unique_columns)
+        )
 
-            query = f"""
-                UPDATE {self.source_configuration.table} AS {destination_table_name}
-                {set_values_of_comparison_columns}
-                FROM {temp_table_name} AS {source_table_name}
-                {where_unique_columns_are_matching}
-            """
+        with connection.connection.cursor() as cursor:
+            # Only the staged columns are created, without the constraints of the table,
+            # since the rows of a partial update don't hold every column
+            cursor.execute(
+                f"CREATE TEMP TABLE beetl_update_rows ON COMMIT DROP AS SELECT {staged_columns} FROM {self.source_configuration.table} WHERE 1=0"
+            )
 
-            self._query(customQuery=query, returnData=False)
+        self._insert(
+            data.select(*unique_columns, *columns_to_update),
+            table="beetl_update_rows",
+            connection=connection,
+        )
 
-            return len(data)
-        finally:
-            # Pylint failes to acnowledge that the context manager is used
-            # The changes won't commit if you remove it
-            # pylint: disable=not-context-manager
-            with psycopg.connect(
-                self.connection_settings.connection_string
-            ) as connection:
-                with connection.cursor() as cursor:
-                    cursor.execute(f"DROP TABLE IF EXISTS {temp_table_name}")
+        with connection.connection.cursor() as cursor:
+            cursor.execute(f"CREATE INDEX ON beetl_update_rows ({key_list})")
+            cursor.execute("ANALYZE beetl_update_rows")
+            cursor.execute(f"""
+                UPDATE {self.source_configuration.table} AS target
+                SET {set_values_of_comparison_columns}
+                FROM beetl_update_rows AS staged
+                WHERE {where_unique_columns_are_matching}
+                """)
+            # Every group of changed columns stages its rows in the same transaction
+            cursor.execute("DROP TABLE beetl_update_rows")
 
     def delete(self, data: pl.DataFrame):
+        """Deletes the rows matching the unique columns of the data.
+        The keys are loaded into a temporary table, deleteBatchSize at a time, and deleted with a join on it.
+        """
         self._validate_unique_columns()
-        batch_size = 500
-        batches = [data]
-
-        if len(data) > batch_size:
-            batches = []
-
-            for i in range(0, len(data), batch_size):
-                batches.append(data[i : i + batch_size])
+        unique_columns = self.source_configuration.unique_columns
+        keys = data.select(unique_columns)
+        key_list = ", ".join(self._quote_column(column) for column in unique_columns)
+        matching_keys = " AND ".join(
+            f"target.{column} = staged.{column}"
+            for column in map(self._quote_column, unique_columns)
+        )
 
-        for batch in batches:
-            id_clause = " AND ".join(
-                (
-                    f"{columnName} IN ({','.join([self._quote_if_needed(x) for x in batch[columnName].to_list()])})"
-                    for columnName in self.source_configuration.unique_columns
+        with self._transaction() as connection:
+            with connection.connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE beetl_delete_keys ON COMMIT DROP AS SELECT {key_list} FROM {self.source_configuration.table} WHERE 1=0"
                 )
-            )
-
-            query = f"""
-                DELETE FROM {self.source_configuration.table}
-                WHERE {id_clause}
-            """
-
-            self._query(customQuery=query, returnData=False)
+                cursor.execute(f"CREATE INDEX ON beetl_delete_keys ({key_list})")
+
+            for batch in keys.iter_slices(self.source_configuration.delete_batch_size):
+                self._insert(batch, table="beetl_delete_keys", connection=connection)
+                with connection.connection.cursor() as cursor:
+                    cursor.execute("ANALYZE beetl_delete_keys")
+                    cursor.execute(f"""
+                        DELETE FROM {self.source_configuration.table} AS target
+                        USING beetl_delete_keys AS staged
+                        WHERE {matching_keys}
+                        """)
+                    cursor.execute("TRUNCATE beetl_delete_keys")
 
         return len(data)
 
-    def store_diff(self, diff):
+    def store_diff(self, diff: Diff):
         if not self.diff_config:
             raise ValueError("Diff configuration is missing")
 
@@ -197,30 +348,45 @@ class PostgresSource(SourceInterface):
         INSERT INTO {self.diff_config.table} (uuid, name, date, version, updates, inserts, deletes, stats) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
 
+        as_rows = self.diff_config.format == "rows"
         row_data = (
             str(diff.uuid),
             diff.name,
             diff.date_as_string(),
             diff.version,
-            json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-            json.dumps(diff.inserts),
-            json.dumps(diff.deletes),
-            json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
+            None if as_rows else diff.updates_json(),
+            None if as_rows else diff.inserts_json(),
+            None if as_rows else diff.deletes_json(),
+            diff.stats_json(),
         )
 
-        # Pylint failes to acnowledge that the context manager is used
-        # The changes won't commit if you remove it
-        # pylint: disable=not-context-manager
-        with psycopg.connect(self.connection_settings.connection_string) as connection:
-            with connection.cursor() as cursor:
+        with self._transaction() as connection:
+            with connection.connection.cursor() as cursor:
                 cursor.execute(create_table_sql)
                 cursor.execute(insert_sql, row_data)
-                connection.commit()
-
-    def _quote_if_needed(self, identifier: Any) -> str:
-        if isinstance(identifier, str):
-            return f"'{identifier}'"
-        return str(identifier)
+                if as_rows:
+                    self._store_diff_rows(cursor, diff)
+
+    def _store_diff_rows(self, cursor: psycopg.Cursor, diff: Diff):
+        """Stores one row per change in the changes table of the diff table"""
+        changes_table = f"{self.diff_config.table}_changes"
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {changes_table} (
+                diff_uuid UUID NOT NULL,
+                operation VARCHAR(16) NOT NULL,
+                "old" JSONB,
+                "new" JSONB
+            )
+            """)
+        insert_sql = f"""
+        INSERT INTO {changes_table} (diff_uuid, operation, "old", "new") VALUES (%s, %s, %s, %s)
+        """
+        diff_uuid = str(diff.uuid)
+        for chunk in diff.change_rows().iter_slices(CHUNK_SIZE):
+            cursor.executemany(
+                insert_sql,
+                [(diff_uuid, *row) for row in chunk.iter_rows()],
+            )
 
     def _validate_unique_columns(self):
         if not self.source_configuration.unique_columns:
@@ -7,7 +7,12 @@ from ...errors import (
     RequiredDestinationFieldError,
     RequiredSourceFieldError,
 )
-from ..interface import SourceSync, SourceSyncArguments
+from ..interface import (
+    Partition,
+    PartitionArguments,
+    SourceSync,
+    SourceSyncArguments,
+)
 
 
 class PostgresSyncArguments(SourceSyncArguments):
@@ -16,6 +21,41 @@ class PostgresSyncArguments(SourceSyncArguments):
     uniqueColumns: Annotated[list[str], Field(default=[])]
     skipColumns: Annotated[list[str], Field(default=[])]
     type: Annotated[Literal["Postgresql"], Field(defauls="Postgresql")] = "Postgresql"
+    readProtocol: Annotated[
+        Literal["binary", "csv", "cursor"],
+        Field(
+            default="binary",
+            description="How connectorx reads the rows. 'binary' and 'csv' stream the result of COPY (query) TO STDOUT into arrow, 'cursor' fetches the rows with a regular cursor.",
+        ),
+    ]
+    insertMethod: Annotated[
+        Literal["write_database", "copy"],
+        Field(
+            default="write_database",
+            description="How rows are written. 'write_database' issues batched INSERT statements, 'copy' streams the rows with COPY FROM STDIN. Also used to fill the staging table of updates.",
+        ),
+    ]
+    deleteBatchSize: Annotated[
+        int,
+        Field(
+            default=100_000,
+            ge=1,
+            description="The amount of keys staged in a temporary table and deleted per statement.",
+        ),
+    ]
+    partitionOn: Annotated[
+        Optional[PartitionArguments],
+        Field(
+            default=None,
+            description="Reads the rows in parallel, one partition of the column per connection.",
+        ),
+    ]
+
+    @model_validator(mode="before")
+    def propagate_nested_location(cls, values: dict):
+        cls.propagate_location("partitionOn", values)
+
+        return values
 
     @model_validator(mode="after")
     def validate_as_source(cls, instance: "PostgresSyncArguments"):
@@ -54,6 +94,10 @@ class PostgresSync(SourceSync):
     skip_columns: list[str] = None
     table: str = None
     query: str = None
+    partition_on: Partition = None
+    read_protocol: Literal["binary", "csv", "cursor"] = "binary"
+    insert_method: Literal["write_database", "copy"] = "write_database"
+    delete_batch_size: int = 100_000
 
     def __init__(self, arguments: PostgresSyncArguments):
         super().__init__(arguments)
@@ -62,3 +106,9 @@ class PostgresSync(SourceSync):
         self.query = arguments.query
         self.unique_columns = arguments.uniqueColumns
         self.skip_columns = arguments.skipColumns
+        self.read_protocol = arguments.readProtocol
+        self.insert_method = arguments.insertMethod
+        self.delete_batch_size = arguments.deleteBatchSize
+        self.partition_on = (
+            Partition(arguments.partitionOn) if arguments.partitionOn else None
+        )
@@ -9,6 +9,7 @@ from ..interface.interface_diff import (
 
 class SqlserverDiffConfigArguments(SourceDiffConfigArguments):
     table: str
+    format: Literal["json", "rows"] = "json"
 
 
 class SqlserverDiffArguments(SourceDiffArguments):
@@ -18,6 +19,8 @@ class SqlserverDiffArguments(SourceDiffArguments):
 
 class SqlserverDiff(SourceDiff):
     table: str
+    format: Literal["json", "rows"]
 
     def __init__(self, diff_config: SqlserverDiffArguments) -> None:
         self.table = diff_config.config.table
+        self.format = diff_config.config.format
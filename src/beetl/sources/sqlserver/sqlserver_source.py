@@ -2,8 +2,8 @@
 Definition for the SqlServer source
 """
 
-import json
-from typing import Optional
+from decimal import Decimal
+from typing import Any, Iterator, Optional
 from uuid import uuid4, UUID
 
 import pandas as pd
@@ -11,7 +11,8 @@ import polars as pl
 import pyodbc
 import sqlalchemy as sqla
 
-from ...diff import Diff, DiffStats, DiffUpdate
+from ...diff import Diff
+from ...diff.diff_model import CHUNK_SIZE
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .sqlserver_config import SqlserverConfig, SqlserverConfigArguments
@@ -36,6 +37,8 @@ class SqlserverSource(SourceInterface):
     diff_config: Optional[SqlserverDiff] = None
     connection: Optional[pyodbc.Connection] = None
     engine: Optional[sqla.Engine] = None
+    supports_range_checksum = True
+    supports_partial_updates = True
 
     def _configure(self):
         pass
@@ -68,16 +71,14 @@ class SqlserverSource(SourceInterface):
         query = customQuery
 
         if query is None:
-            if self.source_configuration.query is not None:
-                query = self.source_configuration.query
-
-            if query is None:
-                if self.source_configuration.table is None:
-                    raise Exception("No query or table specified")
-
-                query = f"SELECT * FROM [{self.source_configuration.table}]"
+            partition = self.source_configuration.partition_on
+            if returnData and partition is not None:
+                return self._query_partitioned(partition, f"[{partition.column}]")
+            query = self._source_query()
 
         if returnData:
+            if self.source_configuration.read_method == "fetchmany":
+                return self._query_fetchmany(query)
             pdd = pd.read_sql_query(sql=query, con=self.connection)
             return pl.from_pandas(pdd)
 
@@ -85,36 +86,162 @@ class SqlserverSource(SourceInterface):
             query = sqla.text(query)
         self.connection.execute(query)
 
+    def _source_query(self) -> str:
+        if self._has_custom_query():
+            return self.source_configuration.query
+
+        if self.source_configuration.table is None:
+            raise Exception("No query or table specified")
+
+        return f"SELECT {self._select_list()} FROM {self.source_configuration.table}{self._where_clause()}"
+
+    def _has_custom_query(self) -> bool:
+        # The sync configuration fills in SELECT * FROM table when no query is given
+        return bool(
+            self.source_configuration_arguments
+            and self.source_configuration_arguments.query
+        )
+
+    def _select_list(self) -> str:
+        """The columns read from the table, limited to the required columns when they are known"""
+        if self.required_columns is None or self._has_custom_query():
+            return "*"
+        # A connection of its own, since partitions are read from several threads
+        with self.engine.connect() as connection:
+            cursor = connection.connection.cursor()
+            try:
+                cursor.execute(f"SELECT TOP 0 * FROM {self.source_configuration.table}")
+                names = [column[0] for column in cursor.description]
+            finally:
+                cursor.close()
+        columns = self._projected_columns(names)
+        if columns is None:
+            return "*"
+        return ", ".join(self._quote_column(column) for column in columns)
+
+    def _quote_column(self, column: str) -> str:
+        return "[" + column.replace("]", "]]") + "]"
+
+    def _sql_literal(self, value: Any) -> str:
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, str):
+            return "N'" + value.replace("'", "''") + "'"
+        return super()._sql_literal(value)
+
+    def _query_chunks(
+        self, params=None, chunk_size: int = 100_000
+    ) -> Iterator[pl.DataFrame]:
+        """Yields the rows of the query in chunks read with fetchmany.
+        SQL Server sends the rows of a forward only result set as they are read,
+          so only one chunk is held in memory at a time.
+        A connection of its own is used, since the connection of the source can not run
+          other statements while a result set is being read.
+        """
+        with self.engine.connect() as connection:
+            cursor = connection.connection.cursor()
+            try:
+                cursor.execute(self._source_query())
+                column_names = [column[0] for column in cursor.description]
+                while rows := cursor.fetchmany(chunk_size):
+                    yield self._rows_to_frame(column_names, rows)
+            finally:
+                cursor.close()
+
+    def _query_partition(self, partition_filter: str) -> pl.DataFrame:
+        query = f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(partition_filter)}"
+        with self.engine.connect() as connection:
+            if self.source_configuration.read_method == "fetchmany":
+                return self._query_fetchmany(query, connection)
+            return pl.from_pandas(pd.read_sql_query(sql=query, con=connection))
+
+    def _query_fetchmany(
+        self, query: str, connection: Optional[sqla.Connection] = None
+    ) -> pl.DataFrame:
+        """Reads the result of the query with pyodbc in batches of fetch_batch_size rows.
+        Every batch is turned into a polars frame column by column, so no pandas frame is built
+          and the rows of only one batch are held as python objects at a time.
+        """
+        if connection is None:
+            connection = self.connection
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(query)
+            column_names = [column[0] for column in cursor.description]
+            frames = []
+            while rows := cursor.fetchmany(self.source_configuration.fetch_batch_size):
+                frames.append(self._rows_to_frame(column_names, rows))
+        finally:
+            cursor.close()
+
+        if not frames:
+            return pl.DataFrame(
+                schema={
+                    column_name: self.column_types.get(column_name, pl.String)
+                    for column_name in column_names
+                }
+            )
+        return pl.concat(frames, how="vertical_relaxed")
+
+    def _relation(self) -> str:
+        """The query of the sync, usable in a FROM clause"""
+        if self.source_configuration.query is not None:
+            return f"({self.source_configuration.query}) AS beetl_relation"
+        if self.source_configuration.table is None:
+            raise Exception("No query or table specified")
+        return f"[{self.source_configuration.table}]"
+
+    def key_bounds(self, key: str):
+        bounds = self._query(
+            customQuery=f"SELECT MIN([{key}]) AS lower, MAX([{key}]) AS upper FROM {self._relation()}"
+        )
+        return bounds.row(0)
+
+    def range_checksums(
+        self, key: str, columns: tuple[str, ...], lower: int, upper: int, width: int
+    ) -> pl.DataFrame:
+        # CHECKSUM_AGG alone misses changes that cancel each other out,
+        # the sum of the row checksums is added to make that unlikely
+        row = (
+            f"BINARY_CHECKSUM({', '.join(f'[{column}]' for column in (key, *columns))})"
+        )
+        bucket = f"([{key}] - {lower}) / {width}"
+        query = f"""
+            SELECT
+                {bucket} AS bucket,
+                COUNT_BIG(*) AS row_count,
+                CONCAT(CHECKSUM_AGG({row}), ':', SUM(CAST({row} AS BIGINT))) AS checksum
+            FROM {self._relation()}
+            WHERE [{key}] >= {lower} AND [{key}] < {upper}
+            GROUP BY {bucket}
+        """
+        return self._query(customQuery=query)
+
+    def query_ranges(self, key: str, ranges: list[tuple[int, int]]) -> pl.DataFrame:
+        range_clause = " OR ".join(
+            f"([{key}] >= {lower} AND [{key}] < {upper})" for lower, upper in ranges
+        )
+        return self._query(
+            customQuery=f"SELECT {self._select_list()} FROM {self._relation()}{self._where_clause(range_clause)}"
+        )
+
     def _insert(
         self,
         data: pl.DataFrame,
         table: str = None,
         tempDB: bool = False,
     ):
-        # Check for binary tables
-        data_columns = data.get_columns()
-        for column in data_columns:
-            if column.dtype == pl.Binary:
-                data = data.with_columns(
-                    pl.col(column.name).map_elements(
-                        lambda x: bytes(x), return_dtype=pl.Binary
-                    )
-                )
-
-        # Replace empty strings with None
-        if self.source_configuration.replace_empty_strings:
-            for column_name in data.columns:
-                if data[column_name].dtype in (pl.Utf8, pl.String):
-                    data = data.with_columns(
-                        pl.when(pl.col(column_name).eq(""))
-                        .then(None)
-                        .otherwise(pl.col(column_name))
-                        .alias(column_name)
-                    )
+        data = self._prepare_insert_data(data)
 
         if table is None:
             table = self.source_configuration.table
 
+        if self.source_configuration.insert_method == "fast_executemany":
+            if tempDB:
+                self._create_temp_table(table, data.columns)
+            self._insert_fast_executemany(data, table)
+            return len(data)
+
         pand_df = data.to_pandas()
         try:
             pand_df.to_sql(
@@ -132,6 +259,79 @@ class SqlserverSource(SourceInterface):
 
         return len(data)
 
+    def _prepare_insert_data(self, data: pl.DataFrame) -> pl.DataFrame:
+        """Replaces empty strings with None in all text columns at once, when configured.
+        Binary columns are passed on as is, polars already hands them out as bytes.
+        """
+        if not self.source_configuration.replace_empty_strings:
+            return data
+
+        return data.with_columns(
+            pl.when(pl.col(column_name).eq(""))
+            .then(None)
+            .otherwise(pl.col(column_name))
+            .alias(column_name)
+            for column_name, dtype in data.schema.items()
+            if dtype in (pl.Utf8, pl.String)
+        )
+
+    def _create_temp_table(self, temp_table: str, columns: list[str]):
+        """Creates an empty temporary table with the types of the columns in the destination table"""
+        column_list = ", ".join(f"[{column_name}]" for column_name in columns)
+        # The union keeps SELECT INTO from copying the identity property of a column
+        self._query(
+            customQuery=f"""
+                SELECT {column_list} INTO {temp_table}
+                FROM {self.source_configuration.table} WHERE 1 = 0
+                UNION ALL
+                SELECT {column_list} FROM {self.source_configuration.table} WHERE 1 = 0
+            """,
+            returnData=False,
+        )
+
+    def _insert_fast_executemany(self, data: pl.DataFrame, table: str):
+        """Inserts the rows in batches using pyodbc fast_executemany.
+        The parameter types are taken from the columns of the table,
+          so the driver does not have to guess them from the first row of every batch.
+        """
+        # The raw cursor shares the transaction of the connection, which is committed on disconnect
+        if not self.connection.in_transaction():
+            self.connection.begin()
+
+        column_list = ", ".join(f"[{column_name}]" for column_name in data.columns)
+        placeholders = ", ".join("?" for _ in data.columns)
+        insert_sql = f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"
+
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.execute(f"SELECT TOP 0 {column_list} FROM {table}")
+            input_sizes = [self._input_size(column) for column in cursor.description]
+            cursor.fast_executemany = True
+            for batch in data.iter_slices(self.source_configuration.insert_batch_size):
+                cursor.setinputsizes(input_sizes)
+                cursor.executemany(insert_sql, batch.rows())
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _input_size(column: tuple) -> Optional[tuple[int, int, int]]:
+        """The parameter type of a column in a pyodbc cursor description, None lets the driver decide"""
+        _, type_code, _, size, precision, scale, _ = column
+        if type_code is str:
+            # A size of 0 sends the values of nvarchar(max) columns without a fixed size buffer
+            return (pyodbc.SQL_WVARCHAR, size if 0 < size <= 4000 else 0, 0)
+        if type_code in (bytes, bytearray):
+            return (pyodbc.SQL_VARBINARY, size if 0 < size <= 8000 else 0, 0)
+        if type_code is Decimal:
+            return (pyodbc.SQL_DECIMAL, precision, scale)
+        if type_code is bool:
+            return (pyodbc.SQL_BIT, 0, 0)
+        if type_code is int:
+            return (pyodbc.SQL_BIGINT, 0, 0)
+        if type_code is float:
+            return (pyodbc.SQL_DOUBLE, 0, 0)
+        return None
+
     def insert(self, data: pl.DataFrame):
         if len(data) == 0:
             return 0
@@ -174,6 +374,14 @@ class SqlserverSource(SourceInterface):
         if len(data) == 0:
             return 0
 
+        for group in self._split_by_unchanged_columns(
+            data, tuple(self.source_configuration.unique_columns)
+        ):
+            self._update(group)
+
+        return len(data)
+
+    def _update(self, data: pl.DataFrame):
         tempDB = self._get_temp_table_name(self.source_configuration.table)
 
         # Insert data into temporary table
@@ -209,8 +417,6 @@ class SqlserverSource(SourceInterface):
         except Exception:
             pass
 
-        return len(data)
-
     def delete(self, data: pl.DataFrame):
         self._validate_unique_columns()
         if len(data) == 0:
@@ -277,6 +483,7 @@ class SqlserverSource(SourceInterface):
     def store_diff(self, diff: Diff):
         if not self.diff_config:
             raise ValueError("Diff configuration is missing")
+        as_rows = self.diff_config.format == "rows"
         metadata = sqla.MetaData()
         table = sqla.Table(
             self.diff_config.table,
@@ -290,16 +497,42 @@ class SqlserverSource(SourceInterface):
             sqla.Column("deletes", sqla.String),
             sqla.Column("stats", sqla.String),
         )
-        metadata.create_all(self.connection)
+        changes_table = sqla.Table(
+            f"{self.diff_config.table}_changes",
+            metadata,
+            sqla.Column("diff_uuid", sqla.Uuid, nullable=False, index=True),
+            sqla.Column("operation", sqla.String(length=16), nullable=False),
+            sqla.Column("old", sqla.String),
+            sqla.Column("new", sqla.String),
+        )
+        metadata.create_all(
+            self.connection, tables=[table, changes_table] if as_rows else [table]
+        )
 
         insert_statement = sqla.insert(table).values(
             name=diff.name,
             date=diff.date,
             uuid=diff.uuid,
             version=diff.version,
-            updates=json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-            inserts=json.dumps(diff.inserts),
-            deletes=json.dumps(diff.deletes),
-            stats=json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
+            updates=None if as_rows else diff.updates_json(),
+            inserts=None if as_rows else diff.inserts_json(),
+            deletes=None if as_rows else diff.deletes_json(),
+            stats=diff.stats_json(),
         )
         self.connection.execute(insert_statement)
+        if as_rows:
+            self._store_diff_rows(self.connection, changes_table, diff)
+
+    @staticmethod
+    def _store_diff_rows(
+        connection: sqla.Connection, changes_table: sqla.Table, diff: Diff
+    ):
+        """Stores one row per change in the changes table, a chunk at a time with executemany"""
+        for chunk in diff.change_rows().iter_slices(CHUNK_SIZE):
+            connection.execute(
+                sqla.insert(changes_table),
+                [
+                    {"diff_uuid": diff.uuid, **row}
+                    for row in chunk.iter_rows(named=True)
+                ],
+            )
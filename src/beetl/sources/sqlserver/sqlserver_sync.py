@@ -8,7 +8,12 @@ from ...errors import (
     ForbiddenSourceFieldError,
     RequiredDestinationFieldError,
 )
-from ..interface import SourceSync, SourceSyncArguments
+from ..interface import (
+    Partition,
+    PartitionArguments,
+    SourceSync,
+    SourceSyncArguments,
+)
 
 
 class SqlserverSyncArguments(SourceSyncArguments):
@@ -69,6 +74,49 @@ class SqlserverSyncArguments(SourceSyncArguments):
             description="If True, empty strings ('') in text columns will be replaced with None.",
         ),
     ]
+    readMethod: Annotated[
+        Literal["pandas", "fetchmany"],
+        Field(
+            default="pandas",
+            description="How rows are read. 'fetchmany' reads the rows with pyodbc in batches and builds the polars frame without pandas, using the types of the comparison columns.",
+        ),
+    ]
+    fetchBatchSize: Annotated[
+        int,
+        Field(
+            default=10_000,
+            ge=1,
+            description="The amount of rows read per batch when readMethod is 'fetchmany'.",
+        ),
+    ]
+    partitionOn: Annotated[
+        Optional[PartitionArguments],
+        Field(
+            default=None,
+            description="Reads the rows in parallel, one partition of the column per connection.",
+        ),
+    ]
+    insertMethod: Annotated[
+        Literal["to_sql", "fast_executemany"],
+        Field(
+            default="to_sql",
+            description="How rows are written. 'to_sql' creates missing tables through pandas, 'fast_executemany' sends the rows in batches with explicit parameter types to existing tables. Only used when used as a destination.",
+        ),
+    ]
+    insertBatchSize: Annotated[
+        int,
+        Field(
+            default=10_000,
+            ge=1,
+            description="The amount of rows sent per batch when insertMethod is 'fast_executemany'.",
+        ),
+    ]
+
+    @model_validator(mode="before")
+    def propagate_nested_location(cls, values: dict):
+        cls.propagate_location("partitionOn", values)
+
+        return values
 
     @model_validator(mode="after")
     def validate_as_source(cls, instance: "SqlserverSyncArguments"):
@@ -148,6 +196,11 @@ class SqlserverSync(SourceSync):
     unique_columns: list[str] = None
     skip_columns: list[str] = None
     replace_empty_strings: bool = False
+    read_method: Literal["pandas", "fetchmany"] = "pandas"
+    fetch_batch_size: int = 10_000
+    partition_on: Optional[Partition] = None
+    insert_method: Literal["to_sql", "fast_executemany"] = "to_sql"
+    insert_batch_size: int = 10_000
 
     def __init__(
         self,
@@ -164,3 +217,10 @@ class SqlserverSync(SourceSync):
         self.unique_columns = arguments.uniqueColumns
         self.skip_columns = arguments.skipColumns
         self.replace_empty_strings = arguments.replace_empty_strings
+        self.read_method = arguments.readMethod
+        self.fetch_batch_size = arguments.fetchBatchSize
+        self.partition_on = (
+            Partition(arguments.partitionOn) if arguments.partitionOn else None
+        )
+        self.insert_method = arguments.insertMethod
+        self.insert_batch_size = arguments.insertBatchSize
@@ -1,4 +1,3 @@
-import json
 import os
 from pathlib import Path
 from typing import Optional
@@ -6,7 +5,6 @@ from typing import Optional
 import pandas as pd
 import polars as pl
 
-from ...diff import DiffStats, DiffUpdate
 from ..interface import SourceInterface
 from ..registrated_source import register_source
 from .xml_config import XmlConfig, XmlConfigArguments
@@ -172,10 +170,10 @@ class XmlSource(SourceInterface):
                 "name": diff.name,
                 "date": diff.date_as_string(),
                 "version": diff.version,
-                "updates": json.dumps(diff.updates, cls=DiffUpdate.JsonEncoder),
-                "inserts": json.dumps(diff.inserts),
-                "deletes": json.dumps(diff.deletes),
-                "stats": json.dumps(diff.stats, cls=DiffStats.JsonEncoder),
+                "updates": diff.updates_json(),
+                "inserts": diff.inserts_json(),
+                "deletes": diff.deletes_json(),
+                "stats": diff.stats_json(),
             }
         )
 
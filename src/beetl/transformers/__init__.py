@@ -1,13 +1,14 @@
 import os
 from typing import Union
 
+from .frames import ColumnFilter
 from .frames_schema import FramesTransformerSchemas
 from .integer_schema import IntegerTransformerSchemas
 from .interface import TransformerConfiguration
 from .itop_schema import ItopTransformerSchemas
 from .misc_schema import MiscTransformerSchemas
 from .regex_schema import RegexTransformerSchemas
-from .run_transformers import run_transformers
+from .run_transformers import leading_filters, referenced_columns, run_transformers
 from .strings_schema import StringTransformerSchemas
 from .structs_schema import StructTransformerSchemas
 
@@ -1,15 +1,66 @@
 import json
-from typing import List, Optional
+import math
+from dataclasses import dataclass
+from typing import Any, List, Optional
 
 import polars as pl
 
 from ..constants import RESERVED_IDENTIFIERS
-from .interface import TransformerInterface, register_transformer_class
+from .interface import (
+    TransformerInterface,
+    reads_all_columns_unless,
+    register_transformer_class,
+    supports_lazy,
+)
+
+
+@dataclass(frozen=True)
+class ColumnFilter:
+    """A condition of the frames.filter transformer on one column.
+    Sources can apply it while reading, the transformer still filters the rows afterwards.
+    """
+
+    column: str
+    value: Any
+    reverse: bool = False
+
+    def expression(self) -> pl.Expr:
+        """The condition as a polars expression, the same one the transformer uses"""
+        if self.value is None:
+            return (
+                pl.col(self.column).is_not_null()
+                if self.reverse
+                else pl.col(self.column).is_null()
+            )
+        if self.reverse:
+            return pl.col(self.column) != self.value
+        return pl.col(self.column) == self.value
+
+    @staticmethod
+    def from_transformer_config(config: dict) -> list["ColumnFilter"]:
+        """The conditions of a frames.filter configuration that sources can apply.
+        Only values that compare the same in the databases are included,
+        leaving out conditions still returns every row the transformer keeps.
+        Strings are only included for equality, since databases may compare them case insensitively.
+        """
+        reverse = config.get("reverse", False)
+        filters = []
+        for column, value in (config.get("filter") or {}).items():
+            comparable = (
+                value is None
+                or isinstance(value, (str, int))
+                or (isinstance(value, float) and math.isfinite(value))
+            )
+            if not comparable or (reverse and isinstance(value, str)):
+                continue
+            filters.append(ColumnFilter(column, value, reverse))
+        return filters
 
 
 @register_transformer_class("frames")
 class FrameTransformer(TransformerInterface):
     @staticmethod
+    @supports_lazy
     def filter(data: pl.DataFrame, filter: dict, reverse: bool = False):
         """Filter a DataFrame
 
@@ -20,21 +71,22 @@ class FrameTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The filtered DataFrame
         """
-        __class__._validate_fields(data.columns, [x for x in filter.keys()])
+        __class__._validate_fields(__class__._columns(data), [x for x in filter.keys()])
 
         for key, value in filter.items():
             if value is None and reverse:
-                data = data.filter(data[key].is_not_null())
+                data = data.filter(pl.col(key).is_not_null())
             elif value is None:
-                data = data.filter(data[key].is_null())
+                data = data.filter(pl.col(key).is_null())
             elif reverse:
-                data = data.filter(data[key] != value)
+                data = data.filter(pl.col(key) != value)
             else:
-                data = data.filter(data[key] == value)
+                data = data.filter(pl.col(key) == value)
 
         return data
 
     @staticmethod
+    @supports_lazy
     def conditional(
         data: pl.DataFrame,
         conditionField: str,
@@ -57,10 +109,10 @@ class FrameTransformer(TransformerInterface):
         if targetField == "":
             targetField = conditionField
 
-        __class__._validate_fields(data.columns, [conditionField])
+        __class__._validate_fields(__class__._columns(data), [conditionField])
 
         data = data.with_columns(
-            pl.when(data[conditionField] == True)
+            pl.when(pl.col(conditionField) == True)
             .then(ifTrue)
             .otherwise(ifFalse)
             .alias(
@@ -73,6 +125,7 @@ class FrameTransformer(TransformerInterface):
         return data
 
     @staticmethod
+    @supports_lazy
     def rename_columns(data: pl.DataFrame, columns: List[dict]):
         """Rename columns in the dataset
 
@@ -90,7 +143,7 @@ class FrameTransformer(TransformerInterface):
         else:
             columns_to_validate = [x["from"] for x in columns]
 
-        __class__._validate_fields(data.columns, columns_to_validate)
+        __class__._validate_fields(__class__._columns(data), columns_to_validate)
         ncolumns = columns
 
         if isinstance(columns, dict):
@@ -104,6 +157,7 @@ class FrameTransformer(TransformerInterface):
         return data
 
     @staticmethod
+    @supports_lazy
     def copy_columns(data: pl.DataFrame, columns: List[dict]):
         """Copies a given column to another column
 
@@ -114,15 +168,18 @@ class FrameTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: DataFrame with renamed columns
         """
-        __class__._validate_fields(data.columns, [x["from"] for x in columns])
+        __class__._validate_fields(
+            __class__._columns(data), [x["from"] for x in columns]
+        )
         for column in columns:
             fromField = column["from"]
             toField = column["to"]
-            data = data.with_columns(data[fromField].alias(toField))
+            data = data.with_columns(pl.col(fromField).alias(toField))
 
         return data
 
     @staticmethod
+    @supports_lazy
     def drop_columns(data: pl.DataFrame, columns: List[str]) -> pl.DataFrame:
         """Drop columns from a DataFrame
 
@@ -133,10 +190,11 @@ class FrameTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The dataframe without the columns
         """
-        __class__._validate_fields(data.columns, columns)
+        __class__._validate_fields(__class__._columns(data), columns)
         return data.drop(columns)
 
     @staticmethod
+    @supports_lazy
     def project_columns(data: pl.DataFrame, columns: List[str]) -> pl.DataFrame:
         """Project the DataFrame to only include the specified columns
 
@@ -147,11 +205,13 @@ class FrameTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The projected DataFrame
         """
-        __class__._validate_fields(data.columns, columns)
+        __class__._validate_fields(__class__._columns(data), columns)
         columns = [col for col in columns if col not in RESERVED_IDENTIFIERS]
         return data.select(columns)
 
     @staticmethod
+    @supports_lazy
+    @reads_all_columns_unless("columns")
     def distinct(data: pl.DataFrame, columns: List[str] = None) -> pl.DataFrame:
         """Only keep distinct rows in the dataframe. Optionally set a list of columns
 
@@ -163,7 +223,7 @@ class FrameTransformer(TransformerInterface):
             pl.DataFrame: DataFrame with only the distinct values
         """
         if columns is not None and len(columns) > 0:
-            __class__._validate_fields(data.columns, columns)
+            __class__._validate_fields(__class__._columns(data), columns)
 
         return data.unique(
             subset=columns if columns is not None and len(columns) > 0 else None,
@@ -229,6 +289,7 @@ class FrameTransformer(TransformerInterface):
         return pl.DataFrame(new_obj)
 
     @staticmethod
+    @supports_lazy
     def coalesce(
         data: pl.DataFrame,
         fields: tuple[str, ...],
@@ -245,7 +306,7 @@ class FrameTransformer(TransformerInterface):
             pl.DataFrame: DataFrame with the new field
         """
         for field in fields:
-            if field is None or field not in data.columns:
+            if field is None or field not in __class__._columns(data):
                 raise ValueError(
                     f"When using the frames.coalesce transformer all fields must be valid fields present in the data. The field {field} is either Null or not in the dataframe."
                 )
@@ -258,6 +319,7 @@ class FrameTransformer(TransformerInterface):
         return data.with_columns(pl.coalesce(fields).alias(outField))
 
     @staticmethod
+    @supports_lazy
     def coalesce_if(
         data: pl.DataFrame,
         conditionField: str,
@@ -267,7 +329,7 @@ class FrameTransformer(TransformerInterface):
         outField: str,
     ) -> pl.DataFrame:
         __class__._validate_fields(
-            data.columns,
+            __class__._columns(data),
             [conditionField, trueField, falseField],
         )
 
@@ -1,5 +1,5 @@
 import polars as pl
-from .interface import TransformerInterface, register_transformer_class
+from .interface import TransformerInterface, register_transformer_class, supports_lazy
 
 NAN_SUPPORTED_TYPES = [pl.Decimal, pl.Float32, pl.Float64, pl.Int8,
                        pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64]
@@ -8,6 +8,7 @@ NAN_SUPPORTED_TYPES = [pl.Decimal, pl.Float32, pl.Float64, pl.Int8,
 @register_transformer_class("int")
 class IntegerTransformer(TransformerInterface):
     @staticmethod
+    @supports_lazy
     def divide(data: pl.DataFrame, inField: str, outField: str, factor: int, inType: str = "Int64", outType: str = "Int32") -> pl.DataFrame:
         """Divide the numbers in a given column with the given factor to a rounded integer
 
@@ -24,7 +25,7 @@ class IntegerTransformer(TransformerInterface):
         outType = getattr(pl, outType)
 
         data = data.with_columns(
-            (data[inField].cast(inType) / factor).round(0).cast(outType).alias(outField))
+            (pl.col(inField).cast(inType) / factor).round(0).cast(outType).alias(outField))
 
         return data
 
@@ -52,6 +53,7 @@ class IntegerTransformer(TransformerInterface):
         return data
 
     @staticmethod
+    @supports_lazy
     def to_int64(data: pl.DataFrame, inField: str, outField: str = None) -> pl.DataFrame:
         """Convert the numbers in a given column to Int64
 
@@ -63,9 +65,9 @@ class IntegerTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The resulting DataFrame
         """
-        old_series = data[inField]
-        new_series = old_series.cast(pl.Int64)
-        series_with_alias = new_series.alias(outField or inField)
-        data = data.with_columns(series_with_alias)
+        old_column = pl.col(inField)
+        new_column = old_column.cast(pl.Int64)
+        column_with_alias = new_column.alias(outField or inField)
+        data = data.with_columns(column_with_alias)
 
         return data
@@ -1,7 +1,8 @@
 from enum import Enum
-from typing import Any, Literal, Union
+from typing import Any, Literal, Optional, Union
 
 from polars import DataFrame as POLARS_DF
+from polars import LazyFrame as POLARS_LF
 from pydantic import BaseModel, ConfigDict
 
 FUNC_TYPE = type(print)
@@ -24,7 +25,32 @@ def register_transformer_class(namespace: str):
     return wrapper
 
 
+def supports_lazy(func: FUNC_TYPE):
+    """Marks a transformer as only using expressions, which lets it append to the plan of a LazyFrame.
+    Transformers without the mark collect lazy data before they run.
+    """
+    func.supports_lazy = True
+    return func
+
+
+def reads_all_columns_unless(argument: str):
+    """Marks a transformer that reads every column of the data when the argument isn't set.
+    The reads of a sync using it are then not limited to the columns named in the configuration.
+    """
+
+    def wrapper(func: FUNC_TYPE):
+        func.reads_all_columns_unless = argument
+        return func
+
+    return wrapper
+
+
 class TransformerInterface:
+    @staticmethod
+    def _columns(data: Union[POLARS_DF, POLARS_LF]) -> list[str]:
+        """Returns the column names of an eager or a lazy frame without collecting it"""
+        return data.collect_schema().names()
+
     @staticmethod
     def _validate_fields(
         columns: Union[list, set, tuple], fields: Union[str, list, set, tuple]
@@ -57,6 +83,20 @@ class Transformers:
             if not fun.startswith("_"):
                 Transformers._registerFunction(namespace, fun, getattr(cls, fun))
 
+    @staticmethod
+    def supportsLazy(transformer: str) -> bool:
+        return getattr(
+            Transformers.transformers.get(transformer), "supports_lazy", False
+        )
+
+    @staticmethod
+    def readsAllColumns(transformer: str, config: dict) -> bool:
+        func = Transformers.transformers.get(transformer)
+        if func is None:
+            return True
+        argument = getattr(func, "reads_all_columns_unless", None)
+        return argument is not None and not config.get(argument)
+
     @staticmethod
     def runTransformer(transformer: str, data: POLARS_DF, **kwargs) -> POLARS_DF:
         try:
@@ -90,8 +130,42 @@ class TransformerConfiguration:
         self.config = config
         self.include_sync = include_sync
 
-    def transform(self, data: POLARS_DF, **kwargs):
+    def referenced_names(self) -> Optional[set[str]]:
+        """The strings in the configuration, which include the columns the transformer reads.
+        Returns None when the transformer may read columns that aren't named in the configuration.
+        """
         config = self.config or {}
+        if self.include_sync or Transformers.readsAllColumns(self.identifier, config):
+            return None
+
+        names = set()
+        values = [config]
+        while values:
+            value = values.pop()
+            if isinstance(value, str):
+                names.add(value)
+                # Paths like a.b read the column a
+                names.add(value.split(".")[0])
+            elif isinstance(value, dict):
+                values.extend(value.keys())
+                values.extend(value.values())
+            elif isinstance(value, (list, tuple, set)):
+                values.extend(value)
+        return names
+
+    def transform(self, data: Union[POLARS_DF, POLARS_LF], **kwargs):
+        config = self.config or {}
+        if isinstance(data, POLARS_LF):
+            if len(data.collect_schema()) == 0:
+                return data
+
+            if Transformers.supportsLazy(self.identifier):
+                return Transformers.runTransformer(
+                    self.identifier, data, **config, **kwargs
+                )
+
+            return self.transform(data.collect(), **kwargs).lazy()
+
         if data.is_empty():
             return data
 
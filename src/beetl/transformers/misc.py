@@ -1,7 +1,7 @@
 from uuid import NAMESPACE_DNS, uuid5
 
 import polars as pl
-from .interface import TransformerInterface, register_transformer_class
+from .interface import TransformerInterface, register_transformer_class, supports_lazy
 
 
 def dn_to_samaccountname(dn):
@@ -38,6 +38,7 @@ class MiscTransformer(TransformerInterface):
         return data
     
     @staticmethod
+    @supports_lazy
     def lookup(data: pl.DataFrame,
         inField: str,
         outField: str,
@@ -58,7 +59,7 @@ class MiscTransformer(TransformerInterface):
             pl.DataFrame: Dataframe with mapped values in outField
         """
 
-        __class__._validate_fields(data.columns, inField)
+        __class__._validate_fields(__class__._columns(data), inField)
 
         lookup_map = {
         (str(k).upper() if caseInsensitive else str(k)): v
@@ -1,21 +1,34 @@
 """Resources related to running transformers"""
 
+from typing import Optional, Union
+
 import polars as pl
 
+from ..instrumentation import SyncInstrumentation
+from .frames import ColumnFilter
 from .interface import TransformerConfiguration
 
 
 def run_transformers(
-    source: pl.DataFrame,
+    source: Union[pl.DataFrame, pl.LazyFrame],
     transformers: list[TransformerConfiguration],
-) -> pl.DataFrame:
+    instrumentation: Optional[SyncInstrumentation] = None,
+    phase: str = "transform",
+) -> Union[pl.DataFrame, pl.LazyFrame]:
     """
     Applies a list of transformers to a source DataFrame.
+    A LazyFrame stays lazy, transformers that do not support lazy frames collect it before they run.
+    When instrumentation is passed, every transformer is recorded as a span named <phase>.<transformer>.
     """
     transformed = source.clone()
 
     if transformers is not None and len(transformers) > 0:
         for transformer in transformers:
+            if instrumentation is not None:
+                with instrumentation.span(f"{phase}.{transformer.identifier}") as span:
+                    transformed = span.measure(transformer.transform(transformed))
+                continue
+
             if transformer.include_sync:
                 transformed = transformer.transform(transformed)
                 continue
@@ -23,3 +36,33 @@ def run_transformers(
             transformed = transformer.transform(transformed)
 
     return transformed
+
+
+def referenced_columns(
+    transformers: Optional[list[TransformerConfiguration]],
+) -> Optional[set[str]]:
+    """
+    The names referenced by the configuration of the transformers, a superset of the columns they read.
+    Returns None when any of the transformers may read columns that aren't named in its configuration.
+    """
+    names = set()
+    for transformer in transformers or []:
+        referenced = transformer.referenced_names()
+        if referenced is None:
+            return None
+        names |= referenced
+    return names
+
+
+def leading_filters(
+    transformers: Optional[list[TransformerConfiguration]],
+) -> list[ColumnFilter]:
+    """The conditions of the frames.filter transformers that run before any other transformer,
+    so they refer to the columns as they are read from the source.
+    """
+    filters = []
+    for transformer in transformers or []:
+        if transformer.identifier != "frames.filter" or transformer.include_sync:
+            break
+        filters.extend(ColumnFilter.from_transformer_config(transformer.config or {}))
+    return filters
@@ -8,6 +8,7 @@ from .interface import (
     TransformerInterface,
     register_transformer,
     register_transformer_class,
+    supports_lazy,
 )
 
 
@@ -29,6 +30,7 @@ class StringTransformer(TransformerInterface):
         return data
 
     @staticmethod
+    @supports_lazy
     def set_default(
         data: pl.DataFrame, inField: str, defaultValue: str
     ) -> pl.DataFrame:
@@ -42,9 +44,9 @@ class StringTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The resulting DataFrame
         """
-        __class__._validate_fields(data.columns, inField)
+        __class__._validate_fields(__class__._columns(data), inField)
 
-        data = data.with_columns(data[inField].fill_null(defaultValue))
+        data = data.with_columns(pl.col(inField).fill_null(defaultValue))
         return data
 
     @staticmethod
@@ -71,6 +73,7 @@ class StringTransformer(TransformerInterface):
         return data
 
     @staticmethod
+    @supports_lazy
     def lowercase(
         data: pl.DataFrame, inField: str = "", outField: str = "", inOutMap: dict = {}
     ) -> pl.DataFrame:
@@ -85,7 +88,7 @@ class StringTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The resulting DataFrame
         """
-        __class__._validate_fields(data.columns, inField)
+        __class__._validate_fields(__class__._columns(data), inField)
 
         if len(inOutMap) == 0:
             inOutMap = {
@@ -95,11 +98,12 @@ class StringTransformer(TransformerInterface):
             }
 
         for inf, outf in inOutMap.items():
-            data = data.with_columns(data[inf].str.to_lowercase().alias(outf))
+            data = data.with_columns(pl.col(inf).str.to_lowercase().alias(outf))
 
         return data
 
     @staticmethod
+    @supports_lazy
     def uppercase(
         data: pl.DataFrame, inField: str = "", outField: str = "", inOutMap: dict = {}
     ) -> pl.DataFrame:
@@ -122,11 +126,12 @@ class StringTransformer(TransformerInterface):
             }
 
         for inf, outf in inOutMap.items():
-            data = data.with_columns(data[inf].str.to_uppercase().alias(outf))
+            data = data.with_columns(pl.col(inf).str.to_uppercase().alias(outf))
 
         return data
 
     @staticmethod
+    @supports_lazy
     def match_contains(
         data: pl.DataFrame, inField: str, match: str, outField: str = ""
     ) -> pl.DataFrame:
@@ -140,12 +145,13 @@ class StringTransformer(TransformerInterface):
         """
 
         return data.with_columns(
-            data[inField]
+            pl.col(inField)
             .str.contains(match)
             .alias(outField if outField is not None and outField != "" else inField)
         )
 
     @staticmethod
+    @supports_lazy
     def join(
         data: pl.DataFrame, inFields: list, outField: str, separator: str = ""
     ) -> pl.DataFrame:
@@ -160,7 +166,9 @@ class StringTransformer(TransformerInterface):
         Returns:
             pl.DataFrame: The resulting DataFrame
         """
-        nCol = pl.concat_str(data[inFields], separator=separator).alias(outField)
+        nCol = pl.concat_str(
+            [pl.col(field) for field in inFields], separator=separator
+        ).alias(outField)
 
         return data.with_columns(nCol.alias(outField))
 
@@ -247,6 +255,7 @@ class StringTransformer(TransformerInterface):
         return new
 
     @staticmethod
+    @supports_lazy
     def replace(
         data: pl.DataFrame,
         search: str,
@@ -257,12 +266,13 @@ class StringTransformer(TransformerInterface):
         """Replace a section in a string with another section"""
 
         return data.with_columns(
-            data[inField]
+            pl.col(inField)
             .str.replace(search, replace)
             .alias(outField if outField is not None else inField)
         )
 
     @staticmethod
+    @supports_lazy
     def replace_all(
         data: pl.DataFrame,
         search: str,
@@ -273,12 +283,13 @@ class StringTransformer(TransformerInterface):
         """Replace all matching sections in a string with another section"""
 
         return data.with_columns(
-            data[inField]
+            pl.col(inField)
             .str.replace_all(search, replace)
             .alias(outField if outField is not None else inField)
         )
 
     @staticmethod
+    @supports_lazy
     def substring(
         data: pl.DataFrame,
         inField: str,
@@ -289,29 +300,31 @@ class StringTransformer(TransformerInterface):
         """Returns a substring of the given string column"""
 
         return data.with_columns(
-            data[inField]
+            pl.col(inField)
             .str.slice(start, length)
             .alias(outField if outField is not None else inField)
         )
 
     @staticmethod
+    @supports_lazy
     def add_prefix(data: pl.DataFrame, inField: str, prefix: str, outField: str = None):
         """Add a prefix to the given column"""
 
         return data.with_columns(
-            pl.concat_str(
-                pl.Series("ccTempField", [prefix] * len(data)), data[inField]
-            ).alias(outField if outField is not None else inField)
+            pl.concat_str(pl.lit(prefix), pl.col(inField)).alias(
+                outField if outField is not None else inField
+            )
         )
 
     @staticmethod
+    @supports_lazy
     def cast(data: pl.DataFrame, inField: str, outField: str = ""):
         """Cast a column to a different type"""
 
         if outField == "":
             outField = inField
 
-        return data.with_columns(data[inField].cast(pl.Utf8).alias(outField))
+        return data.with_columns(pl.col(inField).cast(pl.Utf8).alias(outField))
 
     @staticmethod
     def to_object_id(data: pl.DataFrame, inField: str) -> pl.DataFrame:
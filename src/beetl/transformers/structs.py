@@ -1,6 +1,10 @@
 from typing import Any, Dict
 import polars as pl
-from .interface import TransformerInterface, register_transformer_class
+from .interface import (
+    TransformerInterface,
+    reads_all_columns_unless,
+    register_transformer_class,
+)
 import json
 
 
@@ -185,6 +189,7 @@ class StructTransformers(TransformerInterface):
         return data
 
     @staticmethod
+    @reads_all_columns_unless("objSource")
     def list_columns_to_key_value_rows(data: pl.DataFrame, keyField: str, listField: str, objSource: str | None = None):
         """Convert list-valued DataFrame columns into key-value rows.
 
@@ -1,4 +1,5 @@
 import os
+import shutil
 from pathlib import Path
 
 TEMP_PATH = os.path.join(
@@ -41,6 +42,6 @@ def clean_temp_directory():
                 if os.path.isfile(file_path):
                     os.remove(file_path)
                 elif os.path.isdir(file_path):
-                    os.rmdir(file_path)
+                    shutil.rmtree(file_path)
             except Exception as e:
                 print(f"Error deleting {file_path}: {e}")
@@ -1,10 +1,11 @@
 import os
 from unittest import TestCase
 
-from polars import read_csv
+from polars import DataFrame, read_csv
 
 from src.beetl.beetl import Beetl
 from src.beetl.config import BeetlConfig
+from src.beetl.diff import read_diff_file
 from tests.helpers.temp import TEMP_PATH, clean_temp_directory, create_temp_file
 
 
@@ -83,3 +84,320 @@ class TestCsvSource(TestCase):
                     self.assertIsNotNone(value)
         finally:
             clean_temp_directory()
+
+    def test_save_diff__when_format_is_parquet__indexes_diff_file_in_csv(self):
+        clean_temp_directory()
+        try:
+            diff_file_name = "diff.csv"
+            create_temp_file(diff_file_name)
+
+            config_dict = {
+                "version": "V1",
+                "sources": [
+                    {
+                        "name": "source",
+                        "type": "Static",
+                        "connection": {
+                            "static": [
+                                {"id": 2, "name": "test2", "age": 20},
+                                {"id": 3, "name": "test3", "age": 20},
+                            ]
+                        },
+                    },
+                    {
+                        "type": "Csv",
+                        "name": "diff",
+                        "connection": {"path": os.path.join(TEMP_PATH, diff_file_name)},
+                    },
+                    {
+                        "type": "Static",
+                        "name": "destination",
+                        "connection": {
+                            "static": [
+                                {"id": 3, "name": "test", "age": 20},
+                                {"id": 5, "name": "test5", "age": 20},
+                            ]
+                        },
+                    },
+                ],
+                "sync": [
+                    {
+                        "name": "test_diff",
+                        "source": "source",
+                        "destination": "destination",
+                        "sourceConfig": {},
+                        "destinationConfig": {},
+                        "comparisonColumns": [
+                            {"name": "id", "type": "Int64", "unique": True},
+                            {"name": "name", "type": "Utf8"},
+                            {"name": "age", "type": "Int64"},
+                        ],
+                        "diff": {
+                            "destination": {
+                                "type": "Csv",
+                                "name": "diff",
+                                "config": {"format": "parquet"},
+                            }
+                        },
+                    }
+                ],
+            }
+
+            Beetl(BeetlConfig(config_dict)).sync()
+
+            index = read_csv(os.path.join(TEMP_PATH, diff_file_name))
+            self.assertEqual(
+                ["uuid", "name", "date", "version", "stats", "file"], index.columns
+            )
+            diff_file_path = index["file"][0]
+            self.assertEqual(
+                os.path.join(TEMP_PATH, "diff_diffs"), os.path.dirname(diff_file_path)
+            )
+            changes = read_diff_file(diff_file_path)
+            self.assertEqual(
+                ["insert", "update", "delete"], changes["operation"].to_list()
+            )
+        finally:
+            clean_temp_directory()
+
+    def test_save_diff__when_called_twice__appends_rows_to_segment_file(self):
+        clean_temp_directory()
+        try:
+            config_dict = {
+                "version": "V1",
+                "sources": [
+                    {
+                        "name": "source",
+                        "type": "Static",
+                        "connection": {"static": [{"id": 2, "name": "test2"}]},
+                    },
+                    {
+                        "type": "Csv",
+                        "name": "diff",
+                        "connection": {"path": os.path.join(TEMP_PATH, "diff.csv")},
+                    },
+                    {
+                        "type": "Static",
+                        "name": "destination",
+                        "connection": {"static": [{"id": 3, "name": "test3"}]},
+                    },
+                ],
+                "sync": [
+                    {
+                        "name": "test_diff",
+                        "source": "source",
+                        "destination": "destination",
+                        "sourceConfig": {},
+                        "destinationConfig": {},
+                        "comparisonColumns": [
+                            {"name": "id", "type": "Int64", "unique": True},
+                            {"name": "name", "type": "Utf8"},
+                        ],
+                        "diff": {
+                            "destination": {
+                                "type": "Csv",
+                                "name": "diff",
+                                "config": {"segment": "day", "retention": 7},
+                            }
+                        },
+                    }
+                ],
+            }
+
+            Beetl(BeetlConfig(config_dict)).sync()
+            Beetl(BeetlConfig(config_dict)).sync()
+
+            segment_files = [
+                name for name in os.listdir(TEMP_PATH) if name.startswith("diff.")
+            ]
+            self.assertEqual(1, len(segment_files))
+            result = read_csv(os.path.join(TEMP_PATH, segment_files[0]))
+            self.assertEqual(2, result.height)
+            self.assertEqual(2, result["uuid"].n_unique())
+        finally:
+            clean_temp_directory()
+
+    def test_sync__when_lazy__scans_file_and_returns_same_result_as_eager(self):
+        clean_temp_directory()
+        try:
+            source_file_name = "source.csv"
+            DataFrame(
+                {"id": [2, 3, 4], "name": ["test2", "test3", "test4"], "age": [20] * 3}
+            ).write_csv(create_temp_file(source_file_name))
+
+            def create_config(lazy: bool) -> dict:
+                return {
+                    "version": "V1",
+                    "sources": [
+                        {
+                            "type": "Csv",
+                            "name": "source",
+                            "connection": {
+                                "path": os.path.join(TEMP_PATH, source_file_name)
+                            },
+                        },
+                        {
+                            "type": "Static",
+                            "name": "destination",
+                            "connection": {
+                                "static": [
+                                    {"id": 3, "name": "test", "age": 20},
+                                    {"id": 4, "name": "test4", "age": 20},
+                                    {"id": 5, "name": "test5", "age": 20},
+                                ]
+                            },
+                        },
+                    ],
+                    "sync": [
+                        {
+                            "name": "test_lazy",
+                            "source": "source",
+                            "destination": "destination",
+                            "sourceConfig": {},
+                            "destinationConfig": {},
+                            "lazy": lazy,
+                            "comparisonColumns": [
+                                {"name": "id", "type": "Int64", "unique": True},
+                                {"name": "name", "type": "Utf8"},
+                                {"name": "age", "type": "Int64"},
+                            ],
+                            "sourceTransformers": [
+                                {
+                                    "transformer": "strings.uppercase",
+                                    "config": {"inField": "name"},
+                                }
+                            ],
+                        }
+                    ],
+                }
+
+            eager_result = Beetl(BeetlConfig(create_config(False))).sync()
+            lazy_result = Beetl(BeetlConfig(create_config(True))).sync()
+
+            self.assertEqual(eager_result, lazy_result)
+            self.assertEqual(
+                (1, 2, 1),
+                (lazy_result.inserts, lazy_result.updates, lazy_result.deletes),
+            )
+        finally:
+            clean_temp_directory()
+
+    def test_query__when_sync_projects_columns__reads_only_used_columns(self):
+        clean_temp_directory()
+        try:
+            source_file_name = "source.csv"
+            DataFrame(
+                {
+                    "id": [1, 2],
+                    "name": ["test1", "test2"],
+                    "unused": ["a", "b"],
+                    "nickname": ["x", "y"],
+                }
+            ).write_csv(create_temp_file(source_file_name))
+            config = BeetlConfig(
+                {
+                    "version": "V1",
+                    "sources": [
+                        {
+                            "type": "Csv",
+                            "name": "source",
+                            "connection": {
+                                "path": os.path.join(TEMP_PATH, source_file_name)
+                            },
+                        },
+                        {
+                            "type": "Static",
+                            "name": "destination",
+                            "connection": {"static": [{"id": 1, "name": "test1"}]},
+                        },
+                    ],
+                    "sync": [
+                        {
+                            "source": "source",
+                            "destination": "destination",
+                            "sourceConfig": {},
+                            "destinationConfig": {},
+                            "projectColumns": True,
+                            "comparisonColumns": [
+                                {"name": "id", "type": "Int64", "unique": True},
+                                {"name": "name", "type": "Utf8"},
+                            ],
+                            "sourceTransformers": [
+                                {
+                                    "transformer": "frames.coalesce",
+                                    "config": {
+                                        "fields": ["nickname", "name"],
+                                        "outField": "name",
+                                    },
+                                }
+                            ],
+                        }
+                    ],
+                }
+            )
+            source = config.sync_list[0].source
+
+            eager = source.query()
+            lazy = source.query_lazy().collect()
+
+            self.assertEqual(["id", "name", "nickname"], eager.columns)
+            self.assertEqual(["id", "name", "nickname"], lazy.columns)
+        finally:
+            clean_temp_directory()
+
+    def test_query__when_sync_starts_with_filter__skips_rows_while_scanning(self):
+        clean_temp_directory()
+        try:
+            source_file_name = "source.csv"
+            DataFrame(
+                {"id": [1, 2, 3], "name": ["a", "b", "c"], "active": [1, 0, 1]}
+            ).write_csv(create_temp_file(source_file_name))
+            config = BeetlConfig(
+                {
+                    "version": "V1",
+                    "sources": [
+                        {
+                            "type": "Csv",
+                            "name": "source",
+                            "connection": {
+                                "path": os.path.join(TEMP_PATH, source_file_name)
+                            },
+                        },
+                        {
+                            "type": "Static",
+                            "name": "destination",
+                            "connection": {"static": [{"id": 1, "name": "a"}]},
+                        },
+                    ],
+                    "sync": [
+                        {
+                            "source": "source",
+                            "destination": "destination",
+                            "sourceConfig": {},
+                            "destinationConfig": {},
+                            "comparisonColumns": [
+                                {"name": "id", "type": "Int64", "unique": True},
+                                {"name": "name", "type": "Utf8"},
+                            ],
+                            "sourceTransformers": [
+                                {
+                                    "transformer": "frames.filter",
+                                    "config": {"filter": {"active": 1}},
+                                }
+                            ],
+                        }
+                    ],
+                }
+            )
+            source = config.sync_list[0].source
+
+            result = source.query()
+            sync_result = Beetl(config).sync()
+
+            self.assertEqual([1, 3], result["id"].to_list())
+            self.assertEqual(
+                (1, 0, 0),
+                (sync_result.inserts, sync_result.updates, sync_result.deletes),
+            )
+        finally:
+            clean_temp_directory()
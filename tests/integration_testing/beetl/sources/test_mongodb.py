@@ -228,3 +228,26 @@ class TestMongodbSource(unittest.TestCase):
             self.assertIsNotNone(result)
             for value in result.values():
                 self.assertIsNotNone(value)
+
+    def test_store_diff__when_format_is_chunks__diff_can_be_read_back(self):
+        with MongoDbContainer() as mongodb:
+            connection_string = mongodb.get_connection_url()
+            config = diff_to_mongodb(connection_string)
+            config["sync"][0]["diff"]["destination"]["config"].update(
+                format="chunks", chunkSize=1
+            )
+            beetl_config = beetl.BeetlConfig(config)
+            diff_source = beetl_config.sync_list[0].diff_destination_instance
+
+            # Act
+            beetl.Beetl(beetl_config).sync()
+
+            mongo_client = MongoClient(connection_string)
+            db = mongo_client[DATABASE_NAME]
+            header = db["diff"].find_one()
+            self.assertEqual("chunks", header["format"])
+            self.assertNotIn("inserts", header)
+            self.assertEqual(header["chunks"], db["diff_chunks"].count_documents({}))
+
+            diff = diff_source.read_diff(header["uuid"])
+            self.assertEqual(header["stats"], diff.stats.to_dict())
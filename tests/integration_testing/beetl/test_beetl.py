@@ -8,8 +8,10 @@ from polars import DataFrame
 
 from src.beetl import beetl, config
 from src.beetl.comparison_result import ComparisonResult
+from src.beetl.instrumentation import CallbackSink
 from src.beetl.sources import interface as src_if
 from tests.configurations.static import to_static
+from tests.helpers.temp import TEMP_PATH, clean_temp_directory, ensure_temp_directory
 
 
 class TestBeetlFunctions(unittest.TestCase):
@@ -102,3 +104,92 @@ class TestBeetlFunctions(unittest.TestCase):
 
         changed_columns = comparison_results[0][1]
         self.assertIsNotNone(changed_columns)
+
+    def test_sync__with_concurrent_fetch__returns_same_result_as_sequential_fetch(
+        self,
+    ):
+        # Arrange
+        sequential_config = beetl.BeetlConfig(to_static())
+        concurrent_config_dict = to_static()
+        concurrent_config_dict["execution"] = {"concurrentFetch": True}
+        concurrent_config = beetl.BeetlConfig(concurrent_config_dict)
+
+        # Act
+        sequential_result = beetl.Beetl(sequential_config).sync()
+        concurrent_result = beetl.Beetl(concurrent_config).sync()
+
+        # Assert
+        self.assertEqual(sequential_result, concurrent_result)
+
+    def test_sync__with_sorted_merge__returns_same_result_as_full_comparison(self):
+        # Arrange
+        config_dict = to_static()
+        for source in config_dict["sources"]:
+            source["connection"]["static"].sort(key=lambda row: row["id"])
+        full_config = beetl.BeetlConfig(config_dict)
+        sorted_merge_config_dict = to_static()
+        for source in sorted_merge_config_dict["sources"]:
+            source["connection"]["static"].sort(key=lambda row: row["id"])
+        sorted_merge_config_dict["sync"][0]["sortedMerge"] = True
+        sorted_merge_config_dict["sync"][0]["chunkSize"] = 1
+        sorted_merge_config = beetl.BeetlConfig(sorted_merge_config_dict)
+
+        # Act
+        full_result = beetl.Beetl(full_config).sync()
+        sorted_merge_result = beetl.Beetl(sorted_merge_config).sync()
+
+        # Assert
+        self.assertEqual(full_result, sorted_merge_result)
+
+    def test_sync__with_sorted_merge_and_unsorted_data__raises_value_error(self):
+        # Arrange
+        config_dict = to_static()
+        config_dict["sync"][0]["sortedMerge"] = True
+        beetl_instance = beetl.Beetl(beetl.BeetlConfig(config_dict))
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            beetl_instance.sync()
+
+    def test_sync__with_manifest__compares_against_manifest_until_reconciliation(
+        self,
+    ):
+        # Arrange
+        ensure_temp_directory()
+        config_dict = to_static()
+        config_dict["sync"][0]["manifest"] = {
+            "path": os.path.join(TEMP_PATH, "manifest.parquet"),
+            "reconcileEvery": 2,
+        }
+        beetl_instance = beetl.Beetl(beetl.BeetlConfig(config_dict))
+
+        try:
+            # Act
+            results = [beetl_instance.sync() for _ in range(3)]
+        finally:
+            clean_temp_directory()
+
+        # Assert
+        # the static destination never changes, so only the runs reading it see changes
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(
+            (0, 0, 0), (results[1].inserts, results[1].updates, results[1].deletes)
+        )
+        self.assertNotEqual(results[0], results[1])
+
+    def test_sync__when_finished__result_contains_instrumentation_summary(self):
+        # Arrange
+        beetl_config = beetl.BeetlConfig(to_static())
+        received_spans = []
+        beetl_instance = beetl.Beetl(
+            beetl_config, sinks=[CallbackSink(received_spans.append)]
+        )
+
+        # Act
+        result = beetl_instance.sync()
+
+        # Assert
+        phases = [span.phase for span in result.instrumentation.spans]
+        for phase in ("fetch_source", "fetch_destination", "diff", "insert"):
+            self.assertIn(phase, phases)
+        self.assertEqual(len(result.instrumentation.spans), len(received_spans))
@@ -0,0 +1,82 @@
+"""Unit tests for the Difftool class."""
+
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.compare import Difftool
+
+
+class DifftoolUnitTests(TestCase):
+    update = pl.DataFrame(
+        {"id": [2, 1, 3], "name": ["b", "A", "c"], "age": [30, 20, None]}
+    )
+    destination = pl.DataFrame(
+        {"id": [1, 2, 3], "name": ["a", "b", "c"], "age": [20, 20, None]}
+    )
+
+    def test_diff_update__when_values_differ__returns_a_frame_per_differing_row(self):
+        # act
+        diffs, changed_columns = Difftool.diff_update(
+            self.update, self.destination, ["name", "age"], ["id"]
+        )
+
+        # assert
+        self.assertEqual({"name", "age"}, changed_columns)
+        self.assertEqual(2, len(diffs))
+        self.assertEqual(
+            {
+                "dataset": ["update", "destination"],
+                "keys": [["2"], ["2"]],
+                "age": [30, 20],
+            },
+            diffs[0].to_dict(as_series=False),
+        )
+        self.assertEqual(
+            {
+                "dataset": ["update", "destination"],
+                "keys": [["1"], ["1"]],
+                "name": ["A", "a"],
+            },
+            diffs[1].to_dict(as_series=False),
+        )
+
+    def test_diff_update__when_compact__returns_one_row_per_differing_value(self):
+        # act
+        diffs, changed_columns = Difftool.diff_update(
+            self.update, self.destination, ["name", "age"], ["id"], compact=True
+        )
+
+        # assert
+        self.assertEqual({"name", "age"}, changed_columns)
+        self.assertEqual(
+            [
+                {"id": 1, "column": "name", "update": "A", "destination": "a"},
+                {"id": 2, "column": "age", "update": "30", "destination": "20"},
+            ],
+            diffs.to_dicts(),
+        )
+
+    def test_diff_update__when_keys_are_duplicated__raises_exception(self):
+        # arrange
+        destination = pl.concat([self.destination, self.destination.head(1)])
+
+        # act & assert
+        with self.assertRaises(Exception):
+            Difftool.diff_update(self.update, destination, ["name", "age"], ["id"])
+
+    def test_diff_update__when_unrelated_destination_keys_are_duplicated__compares_the_update(
+        self,
+    ):
+        # arrange
+        unrelated = pl.DataFrame({"id": [4, 4], "name": ["d", "e"], "age": [1, 2]})
+        destination = pl.concat([self.destination, unrelated])
+
+        # act
+        diffs, changed_columns = Difftool.diff_update(
+            self.update, destination, ["name", "age"], ["id"]
+        )
+
+        # assert
+        self.assertEqual({"name", "age"}, changed_columns)
+        self.assertEqual(2, len(diffs))
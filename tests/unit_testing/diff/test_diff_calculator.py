@@ -4,6 +4,7 @@ from unittest import TestCase
 
 import polars as pl
 
+from src.beetl.constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
 from src.beetl.diff import DiffCalculator
 from src.beetl.transformers.interface import TransformerConfiguration
 from src.beetl.typings import ComparisonColumn
@@ -138,3 +139,156 @@ class DiffCalculatorUnitTests(TestCase):
         self.assertEqual(diff.stats.deletes, 1)
 
         print(diff.dump_json())
+
+    def test_diff_calculator__when_passed_lazy_frames__returns_same_result_as_eager(
+        self,
+    ):
+        # arrange
+        source = pl.DataFrame(
+            {"id": [1, 6], "name": ["test1", "test6"], "age": [20, 20]}
+        )
+        destination = pl.DataFrame(
+            {"id": [5, 6], "name": ["test5", "test"], "age": [20, 20]}
+        )
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+            ComparisonColumn("age", "Int64", False),
+        ]
+        eager = DiffCalculator("name", source, destination, columns)
+
+        # act
+        lazy = DiffCalculator(
+            "name", source.lazy(), destination.lazy(), columns, streaming=True
+        )
+
+        # assert
+        for eager_frame, lazy_frame in zip(
+            eager.get_create_update_delete_for_sync(),
+            lazy.get_create_update_delete_for_sync(),
+        ):
+            self.assertIsInstance(lazy_frame, pl.DataFrame)
+            self.assertTrue(eager_frame.equals(lazy_frame))
+        self.assertTrue(eager.updates_diff_mask.equals(lazy.updates_diff_mask))
+
+    def test_diff_calculator__when_lazy_source_has_no_columns__treats_all_as_deletes(
+        self,
+    ):
+        # arrange
+        destination = pl.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+        ]
+
+        # act
+        diff_calculator = DiffCalculator(
+            "name", pl.LazyFrame(), destination.lazy(), columns
+        )
+
+        # assert
+        create, update, delete = diff_calculator.get_create_update_delete_for_sync()
+        self.assertEqual((0, 0, 2), (len(create), len(update), len(delete)))
+
+    def test_diff_calculator__with_hash_engine__returns_same_result_as_join_engine(
+        self,
+    ):
+        # arrange
+        source = pl.DataFrame(
+            {"id": [1, 2, 6], "name": ["test1", "test2", "test6"], "age": [20, 21, 20]}
+        )
+        destination = pl.DataFrame(
+            {"id": [2, 5, 6], "name": ["test2", "test5", "test"], "age": [21, 20, 20]}
+        )
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+            ComparisonColumn("age", "Int64", False),
+        ]
+        join = DiffCalculator("name", source, destination, columns)
+
+        # act
+        hash = DiffCalculator("name", source, destination, columns, engine="hash")
+
+        # assert
+        for join_frame, hash_frame in zip(
+            join.get_create_update_delete_for_sync(),
+            hash.get_create_update_delete_for_sync(),
+        ):
+            self.assertTrue(join_frame.equals(hash_frame))
+        self.assertTrue(join.updates_old.equals(hash.updates_old))
+        self.assertTrue(join.updates_diff_mask.equals(hash.updates_diff_mask))
+
+    def test_diff_calculator__with_hash_engine_and_value_changed_to_null__detects_update(
+        self,
+    ):
+        # arrange
+        source = pl.DataFrame(
+            {"id": [1], "name": [None]}, schema={"id": pl.Int64, "name": pl.String}
+        )
+        destination = pl.DataFrame({"id": [1], "name": ["test"]})
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+        ]
+
+        # act
+        diff_calculator = DiffCalculator(
+            "name", source, destination, columns, engine="hash"
+        )
+
+        # assert
+        self.assertEqual(
+            [{"id": 1, "diff_name": True}],
+            diff_calculator.updates_diff_mask.to_dicts(),
+        )
+
+    def test_diff_calculator__with_hash_engine_and_different_column_types__compares_values(
+        self,
+    ):
+        # arrange
+        source = pl.DataFrame(
+            {"id": [1, 2], "amount": [1, 2]}, schema_overrides={"amount": pl.Int32}
+        )
+        destination = pl.DataFrame(
+            {"id": [1, 2], "amount": [1, 3]}, schema_overrides={"amount": pl.Int16}
+        )
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("amount", "Decimal", False),
+        ]
+
+        # act
+        diff_calculator = DiffCalculator(
+            "name", source, destination, columns, engine="hash"
+        )
+
+        # assert
+        self.assertEqual([2], diff_calculator.updates_new["id"].to_list())
+
+    def test_get_updates_with_unchanged_columns__when_rows_change__lists_unchanged_columns_per_row(
+        self,
+    ):
+        # arrange
+        source = pl.DataFrame(
+            {"id": [1, 2, 3], "name": ["a", "B", "C"], "age": [21, 20, 30]}
+        )
+        destination = pl.DataFrame(
+            {"id": [1, 2, 3], "name": ["a", "b", "c"], "age": [20, 20, None]}
+        )
+        columns = [
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+            ComparisonColumn("age", "Int64", False),
+        ]
+
+        # act
+        diff_calculator = DiffCalculator("name", source, destination, columns)
+        result = diff_calculator.get_updates_with_unchanged_columns()
+
+        # assert
+        unchanged = {
+            row["id"]: row[BEETL_UNCHANGED_COLUMNS_IDENTIFIER]
+            for row in result.to_dicts()
+        }
+        self.assertEqual({1: ["name"], 2: ["age"], 3: []}, unchanged)
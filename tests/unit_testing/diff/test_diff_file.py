@@ -0,0 +1,42 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import Diff, read_diff_file, write_diff_file
+
+
+class DiffFileUnitTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.diff = Diff(
+            "name",
+            pl.DataFrame({"old": [{"id": 2, "a": "b"}], "new": [{"id": 2, "a": "B"}]}),
+            pl.DataFrame({"id": [1], "a": ["a"]}),
+            pl.DataFrame({"id": [3]}),
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_diff_file__when_format_is_parquet__round_trips_changes(self):
+        # act
+        path = write_diff_file(self.diff, self.directory.name, "parquet")
+
+        # assert
+        self.assertEqual(f"{self.diff.uuid}.parquet", os.path.basename(path))
+        self.assertTrue(read_diff_file(path).equals(self.diff.changes_frame()))
+
+    def test_write_diff_file__when_format_is_ipc__round_trips_changes(self):
+        # act
+        path = write_diff_file(self.diff, self.directory.name, "ipc")
+
+        # assert
+        self.assertEqual(f"{self.diff.uuid}.arrow", os.path.basename(path))
+        self.assertTrue(read_diff_file(path).equals(self.diff.changes_frame()))
+
+    def test_write_diff_file__when_format_is_unknown__raises_value_error(self):
+        # act & assert
+        with self.assertRaises(ValueError):
+            write_diff_file(self.diff, self.directory.name, "json")
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import DiffLog
+
+
+class DiffLogUnitTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "diffs.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_segment(self, key: str, rows: dict) -> str:
+        path = os.path.join(self.directory.name, f"diffs.{key}.csv")
+        pl.DataFrame(rows).write_csv(path)
+        return path
+
+    def test_path_for__without_segment__returns_configured_path(self):
+        # arrange
+        sut = DiffLog(self.path)
+
+        # act
+        result = sut.path_for(datetime(2024, 5, 17))
+
+        # assert
+        self.assertEqual(self.path, result)
+
+    def test_path_for__when_segment_is_month__adds_month_before_extension(self):
+        # arrange
+        sut = DiffLog(self.path, "month")
+
+        # act
+        result = sut.path_for(datetime(2024, 5, 17))
+
+        # assert
+        self.assertEqual(os.path.join(self.directory.name, "diffs.2024-05.csv"), result)
+
+    def test_init__when_retention_is_set_without_segment__raises_value_error(self):
+        # act & assert
+        with self.assertRaises(ValueError):
+            DiffLog(self.path, retention=3)
+
+    def test_maintain__when_segments_exceed_retention__removes_oldest_segments_and_their_files(
+        self,
+    ):
+        # arrange
+        diff_file = os.path.join(self.directory.name, "old.parquet")
+        pl.DataFrame({"operation": ["insert"]}).write_parquet(diff_file)
+        oldest = self.write_segment("2024-03", {"uuid": ["a"], "file": [diff_file]})
+        older = self.write_segment("2024-04", {"uuid": ["b"], "file": [None]})
+        current = self.write_segment("2024-05", {"uuid": ["c"], "file": [None]})
+        sut = DiffLog(self.path, "month", retention=2)
+
+        # act
+        sut.maintain(current, pl.read_csv)
+
+        # assert
+        self.assertFalse(os.path.exists(oldest))
+        self.assertFalse(os.path.exists(diff_file))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(current))
+
+    def test_maintain__when_compact__converts_closed_segments_to_parquet(self):
+        # arrange
+        closed = self.write_segment("2024-04", {"uuid": ["a", "b"]})
+        current = self.write_segment("2024-05", {"uuid": ["c"]})
+        sut = DiffLog(self.path, "month", compact=True)
+
+        # act
+        sut.maintain(current, pl.read_csv)
+
+        # assert
+        self.assertFalse(os.path.exists(closed))
+        self.assertTrue(os.path.exists(current))
+        compacted = pl.read_parquet(
+            os.path.join(self.directory.name, "diffs.2024-04.parquet")
+        )
+        self.assertEqual(["a", "b"], compacted["uuid"].to_list())
+        self.assertEqual(
+            ["2024-04", "2024-05"], list(sut.segments()), "compacted segments are kept"
+        )
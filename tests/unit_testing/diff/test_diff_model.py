@@ -3,6 +3,8 @@ from datetime import datetime
 from unittest import TestCase
 from uuid import uuid4
 
+import polars as pl
+
 from src.beetl.diff.diff_model import Diff, DiffRow, DiffUpdate
 
 
@@ -44,3 +46,104 @@ class DiffModelUnitTests(TestCase):
         self.maxDiff = None
 
         self.assertEqual(expected_dict, result_dict)
+
+    def test_diff__when_created_from_frames__stats_and_rows_come_from_frames(self):
+        # arrange
+        inserts = pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+        updates = pl.DataFrame(
+            {"old": [{"id": 4, "name": "d"}], "new": [{"id": 4, "name": "D"}]}
+        )
+        deletes = pl.DataFrame({"id": [5]})
+
+        # act
+        diff = Diff("name", updates, inserts, deletes)
+
+        # assert
+        self.assertEqual(
+            {"updates": 1, "inserts": 3, "deletes": 1}, diff.stats.to_dict()
+        )
+        self.assertEqual(
+            ({"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 3, "name": "c"}),
+            diff.inserts,
+        )
+        self.assertEqual({"id": 4, "name": "D"}, diff.updates[0].new)
+        self.assertEqual(({"id": 5},), diff.deletes)
+
+    def test_iter_json__when_rows_exceed_chunk_size__yields_same_json_as_dump_json(
+        self,
+    ):
+        # arrange
+        inserts = pl.DataFrame({"id": list(range(25))})
+        diff = Diff("name", pl.DataFrame(), inserts, pl.DataFrame())
+
+        # act
+        result = json.loads("".join(diff.iter_json(chunk_size=10)))
+
+        # assert
+        self.assertEqual(json.loads(diff.dump_json()), result)
+        self.assertEqual([{"id": i} for i in range(25)], result["inserts"])
+        self.assertEqual([], result["updates"])
+        self.assertEqual(25, result["stats"]["inserts"])
+
+    def test_changes_frame__when_diff_has_all_operations__returns_one_row_per_change(
+        self,
+    ):
+        # arrange
+        inserts = pl.DataFrame({"id": [1], "name": ["a"]})
+        updates = pl.DataFrame(
+            {"old": [{"id": 2, "name": "b"}], "new": [{"id": 2, "name": "B"}]}
+        )
+        deletes = pl.DataFrame({"id": [3]})
+        diff = Diff("name", updates, inserts, deletes)
+
+        # act
+        result = diff.changes_frame()
+
+        # assert
+        self.assertEqual(
+            {
+                "operation": ["insert", "update", "delete"],
+                "new.id": [1, 2, None],
+                "new.name": ["a", "B", None],
+                "old.id": [None, 2, 3],
+                "old.name": [None, "b", None],
+            },
+            result.to_dict(as_series=False),
+        )
+
+    def test_changes_frame__when_diff_is_empty__returns_operation_column_only(self):
+        # arrange
+        diff = Diff("name", [], [], [])
+
+        # act
+        result = diff.changes_frame()
+
+        # assert
+        self.assertEqual(["operation"], result.columns)
+        self.assertEqual(0, result.height)
+
+    def test_change_rows__when_diff_has_all_operations__encodes_rows_as_json(self):
+        # arrange
+        inserts = pl.DataFrame({"id": [1]})
+        updates = pl.DataFrame({"old": [{"id": 2}], "new": [{"id": 20}]})
+        diff = Diff("name", updates, inserts, [])
+
+        # act
+        result = diff.change_rows()
+
+        # assert
+        self.assertEqual(
+            {
+                "operation": ["insert", "update"],
+                "old": [None, {"id": 2}],
+                "new": [{"id": 1}, {"id": 20}],
+            },
+            {
+                "operation": result["operation"].to_list(),
+                "old": [
+                    json.loads(value) if value else None
+                    for value in result["old"].to_list()
+                ],
+                "new": [json.loads(value) for value in result["new"].to_list()],
+            },
+        )
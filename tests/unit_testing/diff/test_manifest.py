@@ -0,0 +1,92 @@
+"""Unit tests for the RowHashManifest class."""
+
+import os
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import RowHashManifest
+from src.beetl.typings import ComparisonColumn
+from tests.helpers.temp import TEMP_PATH, clean_temp_directory, ensure_temp_directory
+
+
+class RowHashManifestUnitTests(TestCase):
+    columns = [
+        ComparisonColumn("id", "Int64", True),
+        ComparisonColumn("name", "String", False),
+    ]
+    source = pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+
+    def setUp(self):
+        ensure_temp_directory()
+        self.path = os.path.join(TEMP_PATH, "manifest.parquet")
+
+    def tearDown(self):
+        clean_temp_directory()
+
+    def committed_manifest(self, reconcile_every: int = 10) -> RowHashManifest:
+        manifest = RowHashManifest(self.path, self.columns, reconcile_every)
+        manifest.stage(self.source)
+        manifest.commit(full_read=True)
+        return manifest
+
+    def test_requires_full_read__without_manifest__returns_true(self):
+        # arrange
+        manifest = RowHashManifest(self.path, self.columns)
+
+        # act
+        result = manifest.requires_full_read()
+
+        # assert
+        self.assertTrue(result)
+
+    def test_diff__when_source_changed__returns_changes_against_manifest(self):
+        # arrange
+        manifest = self.committed_manifest()
+        changed_source = pl.DataFrame({"id": [1, 2, 4], "name": ["a", "B", "d"]})
+
+        # act
+        create, update, delete = manifest.diff("name", changed_source)
+
+        # assert
+        self.assertEqual([{"id": 4, "name": "d"}], create.to_dicts())
+        self.assertEqual([{"id": 2, "name": "B"}], update.to_dicts())
+        self.assertEqual([{"id": 3}], delete.to_dicts())
+
+    def test_requires_full_read__when_reconciliation_is_due__returns_true(self):
+        # arrange
+        manifest = self.committed_manifest(reconcile_every=3)
+        results = []
+
+        # act
+        for _ in range(3):
+            results.append(manifest.requires_full_read())
+            manifest.diff("name", self.source)
+            manifest.commit(full_read=results[-1])
+
+        # assert
+        self.assertEqual([False, False, True], results)
+
+    def test_requires_full_read__when_columns_changed__returns_true(self):
+        # arrange
+        self.committed_manifest()
+        manifest = RowHashManifest(
+            self.path, [*self.columns, ComparisonColumn("age", "Int64", False)]
+        )
+
+        # act
+        result = manifest.requires_full_read()
+
+        # assert
+        self.assertTrue(result)
+
+    def test_invalidate__when_called__removes_manifest(self):
+        # arrange
+        manifest = self.committed_manifest()
+
+        # act
+        manifest.invalidate()
+
+        # assert
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(manifest.requires_full_read())
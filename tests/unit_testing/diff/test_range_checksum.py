@@ -0,0 +1,143 @@
+"""Unit tests for the RangeChecksum class."""
+
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import RangeChecksum
+
+
+class InMemoryChecksumSource:
+    """Calculates the checksums the way a database would, and counts the queries made"""
+
+    def __init__(self, data: pl.DataFrame):
+        self.data = data
+        self.checksum_queries = 0
+        self.fetched_ranges = []
+
+    def key_bounds(self, key):
+        if self.data.height == 0:
+            return None, None
+        return self.data[key].min(), self.data[key].max()
+
+    def range_checksums(self, key, columns, lower, upper, width):
+        self.checksum_queries += 1
+        return (
+            self.data.filter((pl.col(key) >= lower) & (pl.col(key) < upper))
+            .with_columns(
+                ((pl.col(key) - lower) // width).alias("bucket"),
+                pl.struct(key, *columns).hash().alias("row_hash"),
+            )
+            .group_by("bucket")
+            .agg(
+                pl.len().alias("row_count"),
+                pl.col("row_hash").sum().alias("checksum"),
+            )
+        )
+
+    def query_ranges(self, key, ranges):
+        self.fetched_ranges.extend(ranges)
+        in_range = pl.lit(False)
+        for lower, upper in ranges:
+            in_range = in_range | ((pl.col(key) >= lower) & (pl.col(key) < upper))
+        return self.data.filter(in_range)
+
+
+class RangeChecksumUnitTests(TestCase):
+    data = pl.DataFrame(
+        {"id": list(range(1000)), "name": [f"name {i}" for i in range(1000)]}
+    )
+
+    def create_sut(self, source, destination, leaf_rows=10):
+        return RangeChecksum(
+            source, destination, "id", ("name",), buckets=10, leaf_rows=leaf_rows
+        )
+
+    def test_differing_ranges__when_sides_are_equal__returns_no_ranges(self):
+        # arrange
+        sut = self.create_sut(
+            InMemoryChecksumSource(self.data), InMemoryChecksumSource(self.data)
+        )
+
+        # act
+        result = sut.differing_ranges()
+
+        # assert
+        self.assertEqual([], result)
+
+    def test_fetch__when_one_row_changed__fetches_only_the_leaf_bucket_of_that_row(
+        self,
+    ):
+        # arrange
+        changed = self.data.with_columns(
+            pl.when(pl.col("id") == 555)
+            .then(pl.lit("changed"))
+            .otherwise(pl.col("name"))
+            .alias("name")
+        )
+        source = InMemoryChecksumSource(changed)
+        destination = InMemoryChecksumSource(self.data)
+        sut = self.create_sut(source, destination)
+
+        # act
+        source_rows, destination_rows = sut.fetch()
+
+        # assert
+        self.assertEqual([(550, 560)], source.fetched_ranges)
+        self.assertEqual(10, source_rows.height)
+        self.assertEqual(
+            "changed", source_rows.filter(pl.col("id") == 555)["name"].item()
+        )
+        self.assertEqual(10, destination_rows.height)
+
+    def test_fetch__when_rows_are_inserted_and_deleted__fetches_rows_of_both_changes(
+        self,
+    ):
+        # arrange
+        source = InMemoryChecksumSource(
+            pl.concat(
+                [
+                    self.data.filter(pl.col("id") != 3),
+                    pl.DataFrame({"id": [1200], "name": ["new"]}),
+                ]
+            )
+        )
+        destination = InMemoryChecksumSource(self.data)
+        sut = self.create_sut(source, destination)
+
+        # act
+        source_rows, destination_rows = sut.fetch()
+
+        # assert
+        self.assertIn(1200, source_rows["id"].to_list())
+        self.assertNotIn(3, source_rows["id"].to_list())
+        self.assertIn(3, destination_rows["id"].to_list())
+        self.assertLess(destination_rows.height, 100)
+
+    def test_differing_ranges__when_destination_is_empty__returns_the_whole_range(
+        self,
+    ):
+        # arrange
+        sut = self.create_sut(
+            InMemoryChecksumSource(self.data),
+            InMemoryChecksumSource(self.data.clear()),
+            leaf_rows=100,
+        )
+
+        # act
+        result = sut.differing_ranges()
+
+        # assert
+        self.assertEqual([(0, 1000)], result)
+
+    def test_differing_ranges__when_both_sides_are_empty__returns_no_ranges(self):
+        # arrange
+        source = InMemoryChecksumSource(self.data.clear())
+        sut = self.create_sut(source, InMemoryChecksumSource(self.data.clear()))
+
+        # act
+        result = sut.differing_ranges()
+
+        # assert
+        self.assertEqual([], result)
+        self.assertEqual(0, source.checksum_queries)
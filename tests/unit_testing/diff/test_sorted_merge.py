@@ -0,0 +1,134 @@
+"""Unit tests for the SortedMergeDiff class."""
+
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import DiffCalculator, SortedMergeDiff
+from src.beetl.typings import ComparisonColumn
+
+
+class SortedMergeDiffUnitTests(TestCase):
+    columns = [
+        ComparisonColumn("id", "Int64", True),
+        ComparisonColumn("name", "String", False),
+    ]
+    source = pl.DataFrame(
+        {"id": [1, 2, 3, 4, 7, 8], "name": ["a", "b", "c", "D", "g", "h"]}
+    )
+    destination = pl.DataFrame(
+        {"id": [2, 4, 5, 6, 7, 9], "name": ["b", "d", "e", "f", "G", "i"]}
+    )
+
+    def merge(self, source_chunk_size: int, destination_chunk_size: int):
+        merge = SortedMergeDiff(
+            "name",
+            self.source.iter_slices(source_chunk_size),
+            self.destination.iter_slices(destination_chunk_size),
+            self.columns,
+        )
+        create, update, delete = [], [], []
+        for diff_calculator in merge:
+            chunk_create, chunk_update, chunk_delete = (
+                diff_calculator.get_create_update_delete_for_sync()
+            )
+            create.append(chunk_create)
+            update.append(chunk_update)
+            delete.append(chunk_delete)
+
+        return tuple(
+            pl.concat([frame for frame in frames if frame.width]).sort("id")
+            for frames in (create, update, delete)
+        )
+
+    def test_iter__with_any_chunk_size__returns_same_changes_as_diff_calculator(
+        self,
+    ):
+        # arrange
+        expected = DiffCalculator(
+            "name", self.source, self.destination, self.columns
+        ).get_create_update_delete_for_sync()
+
+        for source_chunk_size, destination_chunk_size in ((1, 1), (2, 5), (10, 3)):
+            # act
+            result = self.merge(source_chunk_size, destination_chunk_size)
+
+            # assert
+            for expected_frame, result_frame in zip(expected, result):
+                self.assertTrue(expected_frame.sort("id").equals(result_frame))
+
+    def test_iter__when_chunks_are_merged__buffers_at_most_one_chunk_per_side(self):
+        # arrange
+        merge = SortedMergeDiff(
+            "name",
+            self.source.iter_slices(2),
+            self.destination.iter_slices(2),
+            self.columns,
+        )
+
+        # act
+        sizes = [
+            (len(diff_calculator.source), len(diff_calculator.destination))
+            for diff_calculator in merge
+        ]
+
+        # assert
+        for source_size, destination_size in sizes:
+            self.assertLessEqual(source_size, 2)
+            self.assertLessEqual(destination_size, 2)
+
+    def test_iter__with_composite_unique_columns__compares_keys_lexicographically(
+        self,
+    ):
+        # arrange
+        columns = [
+            ComparisonColumn("group", "Int64", True),
+            ComparisonColumn("id", "Int64", True),
+            ComparisonColumn("name", "String", False),
+        ]
+        source = pl.DataFrame(
+            {"group": [1, 1, 2, 2], "id": [1, 5, 1, 2], "name": ["a", "b", "c", "d"]}
+        )
+        destination = pl.DataFrame(
+            {"group": [1, 2, 2], "id": [5, 0, 2], "name": ["B", "x", "d"]}
+        )
+
+        # act
+        merge = SortedMergeDiff(
+            "name", source.iter_slices(1), destination.iter_slices(2), columns
+        )
+        amounts = [0, 0, 0]
+        for diff_calculator in merge:
+            for index, frame in enumerate(
+                diff_calculator.get_create_update_delete_for_sync()
+            ):
+                amounts[index] += len(frame)
+
+        # assert
+        self.assertEqual([2, 1, 1], amounts)
+
+    def test_iter__when_input_is_not_sorted__raises_value_error(self):
+        # arrange
+        source = pl.DataFrame({"id": [2, 1], "name": ["b", "a"]})
+
+        # act
+        merge = SortedMergeDiff(
+            "name", [source], self.destination.iter_slices(2), self.columns
+        )
+
+        # assert
+        with self.assertRaises(ValueError):
+            list(merge)
+
+    def test_iter__when_key_repeats_across_chunks__raises_value_error(self):
+        # arrange
+        source = pl.DataFrame({"id": [1, 2, 2], "name": ["a", "b", "c"]})
+
+        # act
+        merge = SortedMergeDiff(
+            "name", source.iter_slices(2), self.destination.iter_slices(2), self.columns
+        )
+
+        # assert
+        with self.assertRaises(ValueError):
+            list(merge)
@@ -0,0 +1,138 @@
+"""Unit tests for the SyncExecutor class."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from src.beetl.execution import SyncExecutor
+
+
+def create_sync(
+    name: str,
+    depends_on: list[str] = None,
+    source_name: str = "src",
+    destination_name: str = "dst",
+):
+    return SimpleNamespace(
+        name=name,
+        depends_on=depends_on or [],
+        source_name=source_name,
+        destination_name=destination_name,
+        diff_destination_name="",
+    )
+
+
+class SyncExecutorUnitTests(TestCase):
+    def test_execution_order__when_there_are_no_dependencies__keeps_configuration_order(
+        self,
+    ):
+        # arrange
+        syncs = [create_sync("a"), create_sync("b"), create_sync("c")]
+
+        # act
+        order = SyncExecutor.execution_order(syncs)
+
+        # assert
+        self.assertEqual([0, 1, 2], order)
+
+    def test_execution_order__when_sync_depends_on_later_sync__runs_dependency_first(
+        self,
+    ):
+        # arrange
+        syncs = [create_sync("a", ["c"]), create_sync("b"), create_sync("c")]
+
+        # act
+        order = SyncExecutor.execution_order(syncs)
+
+        # assert
+        self.assertEqual([1, 2, 0], order)
+
+    def test_execution_order__when_dependencies_contain_cycle__raises_value_error(
+        self,
+    ):
+        # arrange
+        syncs = [create_sync("a", ["b"]), create_sync("b", ["a"])]
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            SyncExecutor.execution_order(syncs)
+
+    def test_execution_order__when_dependency_is_unknown__raises_value_error(self):
+        # arrange
+        syncs = [create_sync("a", ["missing"])]
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            SyncExecutor.execution_order(syncs)
+
+    def test_run__with_multiple_workers__returns_outcomes_in_configuration_order(
+        self,
+    ):
+        # arrange
+        syncs = [create_sync("a"), create_sync("b"), create_sync("c")]
+        delays = {"a": 0.05, "b": 0.0, "c": 0.02}
+
+        def run_sync(index, sync):
+            time.sleep(delays[sync.name])
+            return (index, sync.name)
+
+        # act
+        outcomes = SyncExecutor(3).run(syncs, run_sync)
+
+        # assert
+        self.assertEqual([(1, "a"), (2, "b"), (3, "c")], outcomes)
+
+    def test_run__with_multiple_workers__starts_dependent_sync_after_dependency_finished(
+        self,
+    ):
+        # arrange
+        syncs = [create_sync("a"), create_sync("b", ["a"])]
+        finished = []
+
+        def run_sync(_, sync):
+            if sync.name == "b":
+                self.assertIn("a", finished)
+            time.sleep(0.02)
+            finished.append(sync.name)
+
+        # act
+        SyncExecutor(2).run(syncs, run_sync)
+
+        # assert
+        self.assertEqual(["a", "b"], finished)
+
+    def test_run__with_source_concurrency_limit__never_exceeds_limit(self):
+        # arrange
+        syncs = [create_sync(str(i), source_name="sqlserver") for i in range(6)]
+        lock = threading.Lock()
+        active = {"current": 0, "max": 0}
+
+        def run_sync(_, __):
+            with lock:
+                active["current"] += 1
+                active["max"] = max(active["max"], active["current"])
+            time.sleep(0.02)
+            with lock:
+                active["current"] -= 1
+
+        # act
+        SyncExecutor(4, {"sqlserver": 2}).run(syncs, run_sync)
+
+        # assert
+        self.assertEqual(2, active["max"])
+
+    def test_run__when_sync_fails__raises_error_and_skips_dependent_syncs(self):
+        # arrange
+        syncs = [create_sync("a"), create_sync("b", ["a"])]
+        started = []
+
+        def run_sync(_, sync):
+            started.append(sync.name)
+            if sync.name == "a":
+                raise ValueError("failed")
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            SyncExecutor(2).run(syncs, run_sync)
+        self.assertEqual(["a"], started)
@@ -0,0 +1,130 @@
+"""Unit tests for the Instrumentation class and its sinks."""
+
+import json
+import os
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.instrumentation import (
+    CallbackSink,
+    Instrumentation,
+    JsonFileSink,
+    PrometheusTextfileSink,
+)
+from src.beetl.transformers import run_transformers
+from src.beetl.transformers.interface import TransformerConfiguration
+from tests.helpers.temp import TEMP_PATH, clean_temp_directory, ensure_temp_directory
+
+
+class InstrumentationUnitTests(TestCase):
+    def test_span__when_data_is_measured__records_rows_and_estimated_size(self):
+        # arrange
+        instrumentation = Instrumentation()
+        data = pl.DataFrame({"id": [1, 2, 3]})
+
+        # act
+        with instrumentation.span("sync", "fetch_source") as span:
+            span.measure(data)
+
+        # assert
+        recorded = instrumentation.summary().spans[0]
+        self.assertEqual("sync", recorded.sync)
+        self.assertEqual("fetch_source", recorded.phase)
+        self.assertEqual(3, recorded.rows)
+        self.assertEqual(data.estimated_size(), recorded.estimated_size)
+        self.assertGreaterEqual(recorded.duration, 0)
+
+    def test_span__when_block_raises__still_records_span(self):
+        # arrange
+        instrumentation = Instrumentation()
+
+        # act
+        with self.assertRaises(ValueError):
+            with instrumentation.span("sync", "insert"):
+                raise ValueError("failed")
+
+        # assert
+        self.assertEqual(1, len(instrumentation.summary().spans))
+
+    def test_callback_sink__when_span_finishes__is_called_with_span(self):
+        # arrange
+        received = []
+        instrumentation = Instrumentation([CallbackSink(received.append)])
+
+        # act
+        with instrumentation.span("sync", "diff"):
+            pass
+
+        # assert
+        self.assertEqual(["diff"], [span.phase for span in received])
+
+    def test_run_transformers__with_instrumentation__records_one_span_per_transformer(
+        self,
+    ):
+        # arrange
+        instrumentation = Instrumentation()
+        transformers = [
+            TransformerConfiguration("strings.lowercase", {"inField": "name"}),
+            TransformerConfiguration("strings.uppercase", {"inField": "name"}),
+        ]
+
+        # act
+        run_transformers(
+            pl.DataFrame({"name": ["Test"]}),
+            transformers,
+            instrumentation.for_sync("sync"),
+            "transform_source",
+        )
+
+        # assert
+        self.assertEqual(
+            [
+                "transform_source.strings.lowercase",
+                "transform_source.strings.uppercase",
+            ],
+            [span.phase for span in instrumentation.summary().spans],
+        )
+
+
+class InstrumentationFileSinkUnitTests(TestCase):
+    def setUp(self):
+        ensure_temp_directory()
+
+    def tearDown(self):
+        clean_temp_directory()
+
+    def test_json_file_sink__when_run_finishes__writes_all_spans(self):
+        # arrange
+        path = os.path.join(TEMP_PATH, "spans.json")
+        instrumentation = Instrumentation([JsonFileSink(path)])
+        with instrumentation.span("sync", "fetch_source"):
+            pass
+
+        # act
+        instrumentation.finish()
+
+        # assert
+        with open(path, "r", encoding="utf-8") as file:
+            written = json.load(file)
+        self.assertEqual("fetch_source", written["spans"][0]["phase"])
+
+    def test_prometheus_textfile_sink__when_run_finishes__writes_labelled_gauges(
+        self,
+    ):
+        # arrange
+        path = os.path.join(TEMP_PATH, "beetl.prom")
+        instrumentation = Instrumentation([PrometheusTextfileSink(path)])
+        with instrumentation.span('my "sync"', "insert") as span:
+            span.measure(pl.DataFrame({"id": [1]}))
+
+        # act
+        instrumentation.finish()
+
+        # assert
+        with open(path, "r", encoding="utf-8") as file:
+            written = file.read()
+        self.assertIn("# TYPE beetl_phase_duration_seconds gauge", written)
+        self.assertIn(
+            'beetl_phase_rows{sync="my \\"sync\\"",phase="insert"} 1', written
+        )
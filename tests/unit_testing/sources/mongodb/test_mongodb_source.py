@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.diff import Diff
+from src.beetl.sources import MongodbSource
+from src.beetl.transformers import ColumnFilter
+
+
+class UnitTestMongodbSource(TestCase):
+    def _generate_diff(self) -> Diff:
+        return Diff(
+            "name",
+            pl.DataFrame({"old": [{"id": 1, "a": "b"}], "new": [{"id": 1, "a": "B"}]}),
+            pl.DataFrame({"id": [2, 3, 4], "a": ["c", "d", "e"]}),
+            pl.DataFrame({"id": [5]}),
+        )
+
+    def test_diff_chunk_documents__when_changes_exceed_chunk_size__splits_changes_into_chunks(
+        self,
+    ):
+        # arrange
+        diff = self._generate_diff()
+
+        # act
+        result = list(MongodbSource._diff_chunk_documents(diff, 2))
+
+        # assert
+        self.assertEqual(
+            [("update", 1), ("insert", 2), ("insert", 1), ("delete", 1)],
+            [(document["operation"], len(document["changes"])) for document in result],
+        )
+        self.assertEqual([0, 1, 2, 3], [document["sequence"] for document in result])
+        self.assertTrue(
+            all(document["diff_uuid"] == str(diff.uuid) for document in result)
+        )
+
+    def test_diff_from_documents__when_stored_as_chunks__reassembles_diff(self):
+        # arrange
+        diff = self._generate_diff()
+        header = {
+            "name": diff.name,
+            "date": diff.date_as_string(),
+            "uuid": str(diff.uuid),
+            "version": diff.version,
+            "format": "chunks",
+        }
+        chunks = MongodbSource._diff_chunk_documents(diff, 2)
+
+        # act
+        result = MongodbSource._diff_from_documents(header, chunks)
+
+        # assert
+        self.assertEqual(diff.uuid, result.uuid)
+        self.assertEqual(diff.date, result.date)
+        self.assertEqual(diff.inserts, result.inserts)
+        self.assertEqual(diff.deletes, result.deletes)
+        self.assertEqual(diff.updates[0].to_dict(), result.updates[0].to_dict())
+        self.assertEqual(diff.stats.to_dict(), result.stats.to_dict())
+
+    def test_diff_from_documents__when_stored_as_document__reads_changes_from_header(
+        self,
+    ):
+        # arrange
+        header = {
+            "name": "name",
+            "date": "2024-05-17T10:00:00",
+            "uuid": "00000000-0000-0000-0000-000000000000",
+            "version": "1.0.0",
+            "updates": [],
+            "inserts": [{"id": 1}],
+            "deletes": [],
+        }
+
+        # act
+        result = MongodbSource._diff_from_documents(header, [])
+
+        # assert
+        self.assertEqual(({"id": 1},), result.inserts)
+        self.assertEqual((), result.updates)
+        self.assertEqual(
+            {"updates": 0, "inserts": 1, "deletes": 0}, result.stats.to_dict()
+        )
+
+    def test_required_projection__when_path_inside_required_field__projects_the_field(
+        self,
+    ):
+        # arrange
+        sut = MongodbSource.__new__(MongodbSource)
+        sut.required_columns = {"name", "address", "address.city", "$id", ""}
+
+        # act
+        result = sut._required_projection()
+
+        # assert
+        self.assertEqual({"address": 1, "name": 1}, result)
+
+    def test_query_filter__with_configured_filter__combines_it_with_pushed_filters(
+        self,
+    ):
+        # arrange
+        sut = MongodbSource.__new__(MongodbSource)
+        sut.source_configuration = SimpleNamespace(filter={"type": "person"})
+        sut.pushed_filters = (
+            ColumnFilter("active", True),
+            ColumnFilter("age", 20, True),
+            ColumnFilter("_id", "abc"),
+        )
+
+        # act
+        result = sut._query_filter()
+
+        # assert
+        self.assertEqual(
+            {
+                "$and": [
+                    {"type": "person"},
+                    {"active": True, "age": {"$nin": [20, None]}},
+                ]
+            },
+            result,
+        )
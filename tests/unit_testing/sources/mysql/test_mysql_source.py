@@ -0,0 +1,76 @@
+import re
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.sources import MysqlSource
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.files = []
+
+    def execute(self, statement):
+        self.statements.append(" ".join(statement.split()))
+        path = re.search(r"INFILE '(.*?)'", statement).group(1)
+        with open(path, encoding="utf-8") as file:
+            self.files.append(file.read())
+
+    def close(self):
+        pass
+
+
+class UnitTestMysqlSource(TestCase):
+    def _generate_minimum_viable_sut(self) -> MysqlSource:
+        sut = MysqlSource(
+            {
+                "name": "test",
+                "connection": {
+                    "settings": {
+                        "connection_string": "mysql://test",
+                    }
+                },
+            }
+        )
+        sut.set_sourceconfig(
+            {"table": "people", "uniqueColumns": ["id"], "insertMethod": "load_data"},
+            "destination",
+            "test",
+            ("sync",),
+        )
+        return sut
+
+    def test_insert__when_insert_method_is_load_data__loads_a_csv_file(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        cursor = FakeCursor()
+        connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+        data = pl.DataFrame(
+            {
+                "id": [1, 2],
+                "name": ['say "hi"\\n', None],
+                "active": [True, False],
+                "seen": [datetime(2024, 1, 2, 3, 4, 5), None],
+            }
+        )
+
+        # act
+        result = sut._insert(data, connection=connection)
+
+        # assert
+        self.assertEqual(2, result)
+        self.assertIn("INTO TABLE people", cursor.statements[0])
+        self.assertIn(
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY ''",
+            cursor.statements[0],
+        )
+        self.assertTrue(
+            cursor.statements[0].endswith("(`id`, `name`, `active`, `seen`)")
+        )
+        self.assertEqual(
+            '1,"say ""hi""\\n",1,"2024-01-02 03:04:05"\n2,NULL,0,NULL\n',
+            cursor.files[0],
+        )
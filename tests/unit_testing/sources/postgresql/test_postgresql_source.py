@@ -0,0 +1,206 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.sources import PostgresSource
+
+
+class FakeCopy:
+    def __init__(self):
+        self.written = []
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def write(self, data):
+        self.written.append(data)
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, statement):
+        self.statements.append(" ".join(statement.split()))
+
+    def copy(self, statement):
+        self.statements.append(statement)
+        self.copies.append(FakeCopy())
+        return self.copies[-1]
+
+
+class UnitTestPostgresSource(TestCase):
+    def _generate_minimum_viable_sut(self) -> PostgresSource:
+        return PostgresSource(
+            {
+                "name": "test",
+                "connection": {
+                    "settings": {
+                        "connection_string": "postgresql://test",
+                    }
+                },
+            }
+        )
+
+    def test_copy_rows__writes_csv_with_unquoted_nulls(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        cursor = FakeCursor()
+        data = pl.DataFrame({"id": [1, 2], "name": ["a,b", None]})
+
+        # act
+        sut._copy_rows(cursor, data, "people")
+
+        # assert
+        self.assertEqual(
+            ["""COPY people ("id", "name") FROM STDIN (FORMAT csv, NULL '\\N')"""],
+            cursor.statements,
+        )
+        self.assertEqual(['1,"a,b"\n2,\\N\n'], cursor.copies[0].written)
+
+    def test_copy_rows__when_a_column_is_nested__writes_rows_in_text_format(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        cursor = FakeCursor()
+        data = pl.DataFrame({"id": [1], "tags": [["a", "b"]]})
+
+        # act
+        sut._copy_rows(cursor, data, "people")
+
+        # assert
+        self.assertEqual(['COPY people ("id", "tags") FROM STDIN'], cursor.statements)
+        self.assertEqual([(1, ["a", "b"])], cursor.copies[0].rows)
+
+    def test_connect__keeps_one_pool_until_disconnected(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+
+        # act
+        sut.connect()
+        engine = sut.engine
+        sut.connect()
+        reused = sut.engine is engine
+        sut.disconnect()
+
+        # assert
+        self.assertTrue(reused)
+        self.assertEqual("psycopg", engine.dialect.driver)
+        self.assertIsNone(sut.engine)
+
+    def test_insert__with_a_connection__copies_over_that_connection(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {"table": "people", "uniqueColumns": ["id"], "insertMethod": "copy"},
+            "destination",
+            "test",
+            ("sync",),
+        )
+        cursor = FakeCursor()
+        connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+
+        # act
+        result = sut._insert(pl.DataFrame({"id": [1]}), connection=connection)
+
+        # assert
+        self.assertEqual(1, result)
+        self.assertEqual(
+            ["""COPY people ("id") FROM STDIN (FORMAT csv, NULL '\\N')"""],
+            cursor.statements,
+        )
+
+    def test_delete__stages_the_keys_and_deletes_them_per_batch(self):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {
+                "table": "people",
+                "uniqueColumns": ["id", "region"],
+                "insertMethod": "copy",
+                "deleteBatchSize": 2,
+            },
+            "destination",
+            "test",
+            ("sync",),
+        )
+        cursor = FakeCursor()
+        connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+        sut._transaction = lambda: nullcontext(connection)
+        data = pl.DataFrame({"id": [1, 2, 3], "region": ["a", "b", "c"], "x": 1})
+
+        # act
+        result = sut.delete(data)
+
+        # assert
+        delete = 'DELETE FROM people AS target USING beetl_delete_keys AS staged WHERE target."id" = staged."id" AND target."region" = staged."region"'
+        self.assertEqual(3, result)
+        self.assertEqual(
+            [
+                'CREATE TEMP TABLE beetl_delete_keys ON COMMIT DROP AS SELECT "id", "region" FROM people WHERE 1=0',
+                'CREATE INDEX ON beetl_delete_keys ("id", "region")',
+                """COPY beetl_delete_keys ("id", "region") FROM STDIN (FORMAT csv, NULL '\\N')""",
+                "ANALYZE beetl_delete_keys",
+                delete,
+                "TRUNCATE beetl_delete_keys",
+                """COPY beetl_delete_keys ("id", "region") FROM STDIN (FORMAT csv, NULL '\\N')""",
+                "ANALYZE beetl_delete_keys",
+                delete,
+                "TRUNCATE beetl_delete_keys",
+            ],
+            cursor.statements,
+        )
+        self.assertEqual(['3,"c"\n'], cursor.copies[1].written)
+
+    def test_update__stages_the_rows_in_a_temporary_table_indexed_after_the_load(
+        self,
+    ):
+        # arrange
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {
+                "table": "people",
+                "uniqueColumns": ["id"],
+                "skipColumns": ["created"],
+                "insertMethod": "copy",
+            },
+            "destination",
+            "test",
+            ("sync",),
+        )
+        cursor = FakeCursor()
+        connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+        sut._transaction = lambda: nullcontext(connection)
+        data = pl.DataFrame({"name": ["a"], "id": [1], "created": ["today"]})
+
+        # act
+        result = sut.update(data)
+
+        # assert
+        self.assertEqual(1, result)
+        self.assertEqual(
+            [
+                'CREATE TEMP TABLE beetl_update_rows ON COMMIT DROP AS SELECT "id", "name" FROM people WHERE 1=0',
+                """COPY beetl_update_rows ("id", "name") FROM STDIN (FORMAT csv, NULL '\\N')""",
+                'CREATE INDEX ON beetl_update_rows ("id")',
+                "ANALYZE beetl_update_rows",
+                'UPDATE people AS target SET "name" = staged."name" FROM beetl_update_rows AS staged WHERE target."id" = staged."id"',
+                "DROP TABLE beetl_update_rows",
+            ],
+            cursor.statements,
+        )
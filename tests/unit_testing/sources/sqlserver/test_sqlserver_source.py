@@ -1,11 +1,35 @@
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
 from unittest import TestCase
+
 import polars as pl
+import pyodbc
 
 from src.beetl.sources import SqlserverSource
 
 EMPTY_GUID = "00000000-0000-0000-0000-000000000000"
 
 
+class FakeCursor:
+    def __init__(self, column_names: list[str], rows: list[tuple]):
+        self.description = [(name, None, None, 0, 0, 0, True) for name in column_names]
+        self.rows = rows
+        self.fetch_sizes = []
+
+    def execute(self, query):
+        pass
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
 class UnitTestSqlserverSource(TestCase):
     def _generate_minimum_viable_sut(self) -> SqlserverSource:
         return SqlserverSource(
@@ -56,3 +80,88 @@ class UnitTestSqlserverSource(TestCase):
         result = sut._collate_clause(column_name, data, "left", "right")
         self.assertTrue("TRY_CONVERT" not in result)
         self.assertTrue("COLLATE" not in result)
+
+    def test_prepare_insert_data__when_replace_empty_strings__replaces_in_all_text_columns(
+        self,
+    ):
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {"table": "test", "uniqueColumns": ["id"], "replace_empty_strings": True},
+            direction="destination",
+            name="test",
+            location=(),
+        )
+        data = pl.DataFrame({"id": [1, 2], "a": ["", "x"], "b": ["y", ""]})
+        result = sut._prepare_insert_data(data)
+        self.assertEqual(
+            {"id": [1, 2], "a": [None, "x"], "b": ["y", None]},
+            result.to_dict(as_series=False),
+        )
+
+    def test_input_size__when_column_is_nvarchar_max__sends_unbounded_wide_string(
+        self,
+    ):
+        result = SqlserverSource._input_size(("a", str, None, 0, 0, 0, True))
+        self.assertEqual((pyodbc.SQL_WVARCHAR, 0, 0), result)
+
+    def test_input_size__when_column_is_decimal__uses_precision_and_scale(self):
+        result = SqlserverSource._input_size(("a", Decimal, None, 18, 18, 4, True))
+        self.assertEqual((pyodbc.SQL_DECIMAL, 18, 4), result)
+
+    def test_input_size__when_type_is_not_mapped__lets_driver_decide(self):
+        result = SqlserverSource._input_size(("a", datetime, None, 27, 27, 7, True))
+        self.assertIsNone(result)
+
+    def _generate_fetchmany_sut(self, cursor: FakeCursor) -> SqlserverSource:
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {"table": "test", "readMethod": "fetchmany", "fetchBatchSize": 2},
+            direction="source",
+            name="test",
+            location=(),
+        )
+        sut.connection = SimpleNamespace(
+            connection=SimpleNamespace(cursor=lambda: cursor)
+        )
+        return sut
+
+    def test_query__when_read_method_is_fetchmany__reads_batches_with_comparison_types(
+        self,
+    ):
+        cursor = FakeCursor(["id", "name"], [(1, "a"), (2, None), (3, "c")])
+        sut = self._generate_fetchmany_sut(cursor)
+        sut.column_types = {"id": pl.Int32(), "name": pl.String()}
+        result = sut._query()
+        self.assertEqual([2, 2, 2], cursor.fetch_sizes)
+        self.assertEqual({"id": pl.Int32, "name": pl.String}, dict(result.schema))
+        self.assertEqual([1, 2, 3], result["id"].to_list())
+
+    def test_query__when_values_do_not_fit_comparison_type__infers_the_column(self):
+        cursor = FakeCursor(["id"], [(1,), (2,)])
+        sut = self._generate_fetchmany_sut(cursor)
+        sut.column_types = {"id": pl.String()}
+        result = sut._query()
+        self.assertEqual([1, 2], result["id"].to_list())
+
+    def test_query__when_read_method_is_fetchmany_and_no_rows__returns_empty_frame(
+        self,
+    ):
+        cursor = FakeCursor(["id", "name"], [])
+        sut = self._generate_fetchmany_sut(cursor)
+        sut.column_types = {"id": pl.Int64()}
+        result = sut._query()
+        self.assertEqual({"id": pl.Int64, "name": pl.String}, dict(result.schema))
+
+    def test_query_chunks__reads_chunks_from_a_cursor_of_its_own(self):
+        cursor = FakeCursor(["id"], [(1,), (2,), (3,)])
+        sut = self._generate_minimum_viable_sut()
+        sut.set_sourceconfig(
+            {"table": "test"}, direction="source", name="test", location=()
+        )
+        sut.engine = SimpleNamespace(
+            connect=lambda: nullcontext(
+                SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+            )
+        )
+        result = [chunk["id"].to_list() for chunk in sut.query_chunks(chunk_size=2)]
+        self.assertEqual([[1, 2], [3]], result)
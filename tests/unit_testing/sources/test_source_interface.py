@@ -0,0 +1,189 @@
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.constants import BEETL_UNCHANGED_COLUMNS_IDENTIFIER
+from src.beetl.sources.interface import (
+    Partition,
+    PartitionArguments,
+    SourceInterface,
+)
+from src.beetl.transformers import ColumnFilter
+
+
+class PartitionedSource(SourceInterface):
+    def __init__(self, bounds):
+        self.bounds = bounds
+
+    def key_bounds(self, key):
+        return self.bounds
+
+    def _query_partition(self, partition_filter):
+        return pl.DataFrame({"filter": [partition_filter]})
+
+
+def _partition(method: str, partitions: int = 3) -> Partition:
+    return Partition(
+        PartitionArguments(column="id", partitions=partitions, method=method)
+    )
+
+
+class UnitTestSourceInterface(TestCase):
+    def test_split_by_unchanged_columns__when_rows_differ__groups_rows_without_unchanged_columns(
+        self,
+    ):
+        # arrange
+        data = pl.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "name": ["a", "b", "c"],
+                "age": [20, 30, 40],
+                BEETL_UNCHANGED_COLUMNS_IDENTIFIER: [["age"], ["name"], ["age"]],
+            }
+        )
+
+        # act
+        result = list(SourceInterface._split_by_unchanged_columns(data, ("id",)))
+
+        # assert
+        self.assertEqual(2, len(result))
+        self.assertEqual(
+            {"id": [1, 3], "name": ["a", "c"]}, result[0].to_dict(as_series=False)
+        )
+        self.assertEqual({"id": [2], "age": [30]}, result[1].to_dict(as_series=False))
+
+    def test_split_by_unchanged_columns__without_unchanged_columns__returns_data_as_is(
+        self,
+    ):
+        # arrange
+        data = pl.DataFrame({"id": [1], "name": ["a"]})
+
+        # act
+        result = list(SourceInterface._split_by_unchanged_columns(data))
+
+        # assert
+        self.assertEqual(1, len(result))
+        self.assertTrue(data.equals(result[0]))
+
+    def test_without_unchanged_fields__when_unique_field_is_listed__keeps_unique_field(
+        self,
+    ):
+        # arrange
+        row = {"id": 1, "name": "a", BEETL_UNCHANGED_COLUMNS_IDENTIFIER: ["id", "age"]}
+
+        # act
+        result = SourceInterface._without_unchanged_fields(row, ("id",))
+
+        # assert
+        self.assertEqual({"id": 1, "name": "a"}, result)
+
+    def test_partition_filters__when_method_is_range__splits_keys_into_open_ended_ranges(
+        self,
+    ):
+        # arrange
+        sut = PartitionedSource((1, 9))
+
+        # act
+        result = sut._partition_filters(_partition("range"), "id")
+
+        # assert
+        self.assertEqual(
+            ["(id < 4) OR id IS NULL", "id >= 4 AND id < 7", "id >= 7"], result
+        )
+
+    def test_partition_filters__when_fewer_keys_than_partitions__skips_empty_ranges(
+        self,
+    ):
+        # arrange
+        sut = PartitionedSource((5, 5))
+
+        # act
+        result = sut._partition_filters(_partition("range"), "id")
+
+        # assert
+        self.assertEqual(["(1 = 1) OR id IS NULL"], result)
+
+    def test_partition_filters__when_method_is_modulo__filters_on_remainder(self):
+        # arrange
+        sut = PartitionedSource(None)
+
+        # act
+        result = sut._partition_filters(_partition("modulo", 2), "[id]")
+
+        # assert
+        self.assertEqual(
+            ["(ABS([id] % 2) = 0) OR [id] IS NULL", "ABS([id] % 2) = 1"], result
+        )
+
+    def test_partition_filters__when_range_key_is_not_an_integer__raises(self):
+        # arrange
+        sut = PartitionedSource(("a", "z"))
+
+        # act & assert
+        with self.assertRaises(ValueError):
+            sut._partition_filters(_partition("range"), "id")
+
+    def test_query_partitioned__reads_every_partition_in_order(self):
+        # arrange
+        sut = PartitionedSource((None, None))
+
+        # act
+        result = sut._query_partitioned(_partition("modulo", 3), "id")
+
+        # assert
+        self.assertEqual(3, result.height)
+        self.assertEqual("ABS(id % 3) = 2", result["filter"][2])
+
+    def test_projected_columns__when_columns_are_required__keeps_source_order(self):
+        # arrange
+        sut = PartitionedSource(None)
+        sut.required_columns = {"name", "id", "not_a_column"}
+
+        # act
+        result = sut._projected_columns(["id", "age", "name"])
+
+        # assert
+        self.assertEqual(["id", "name"], result)
+
+    def test_projected_columns__when_every_column_is_required__reads_every_column(
+        self,
+    ):
+        # arrange
+        sut = PartitionedSource(None)
+        sut.required_columns = {"id", "name"}
+
+        # act
+        result = sut._projected_columns(["id", "name"])
+
+        # assert
+        self.assertIsNone(result)
+
+    def test_where_clause__with_pushed_filters__combines_them_with_the_conditions(
+        self,
+    ):
+        # arrange
+        sut = PartitionedSource(None)
+        sut.pushed_filters = (
+            ColumnFilter("name", "O'Brien"),
+            ColumnFilter("deleted", None, True),
+            ColumnFilter("age", 20, True),
+        )
+
+        # act
+        result = sut._where_clause("id < 4")
+
+        # assert
+        self.assertEqual(
+            """ WHERE (id < 4) AND "name" = 'O''Brien' AND "deleted" IS NOT NULL AND "age" <> 20""",
+            result,
+        )
+
+    def test_where_clause__without_conditions__is_empty(self):
+        # arrange
+        sut = PartitionedSource(None)
+
+        # act
+        result = sut._where_clause()
+
+        # assert
+        self.assertEqual("", result)
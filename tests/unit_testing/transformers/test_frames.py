@@ -3,7 +3,7 @@ from unittest import TestCase
 
 from polars import DataFrame
 
-from src.beetl.transformers.frames import FrameTransformer
+from src.beetl.transformers.frames import ColumnFilter, FrameTransformer
 
 
 class UnitTestFramesTransformers(TestCase):
@@ -158,3 +158,29 @@ class UnitTestFramesTransformers(TestCase):
         self.assertEqual(
             json.dumps(result.to_dicts()), json.dumps(expected.to_dicts())
         )
+
+    def test_column_filter_from_transformer_config__when_reversed__leaves_out_strings_and_lists(
+        self,
+    ):
+        config = {
+            "filter": {"name": "a", "age": 20, "deleted": None, "tags": ["x"]},
+            "reverse": True,
+        }
+
+        result = ColumnFilter.from_transformer_config(config)
+
+        self.assertEqual(
+            [ColumnFilter("age", 20, True), ColumnFilter("deleted", None, True)],
+            result,
+        )
+
+    def test_column_filter_expression__keeps_the_rows_the_transformer_keeps(self):
+        data = DataFrame({"id": [1, 2, 3, None], "name": ["a", "b", None, "d"]})
+        config = {"filter": {"id": 2, "name": None}, "reverse": True}
+
+        expected = FrameTransformer.filter(data, **config)
+        result = data
+        for column_filter in ColumnFilter.from_transformer_config(config):
+            result = result.filter(column_filter.expression())
+
+        self.assertEqual(expected.to_dicts(), result.to_dicts())
@@ -0,0 +1,122 @@
+from unittest import TestCase
+
+import polars as pl
+
+from src.beetl.transformers import (
+    ColumnFilter,
+    leading_filters,
+    referenced_columns,
+    run_transformers,
+)
+from src.beetl.transformers.interface import TransformerConfiguration
+
+
+class UnitTestRunTransformers(TestCase):
+    def test_run_transformers__when_passed_lazy_frame__returns_lazy_frame(self):
+        # arrange
+        data = pl.LazyFrame({"id": [1, 2], "name": ["Test", "Other"]})
+        transformers = [
+            TransformerConfiguration("frames.filter", {"filter": {"id": 1}}),
+            TransformerConfiguration("strings.lowercase", {"inField": "name"}),
+        ]
+
+        # act
+        result = run_transformers(data, transformers)
+
+        # assert
+        self.assertIsInstance(result, pl.LazyFrame)
+        self.assertEqual([{"id": 1, "name": "test"}], result.collect().to_dicts())
+
+    def test_run_transformers__when_transformer_does_not_support_lazy__collects_and_stays_lazy(
+        self,
+    ):
+        # arrange
+        data = pl.LazyFrame({"name": ["test"]})
+        transformers = [
+            TransformerConfiguration(
+                "strings.format",
+                {"inField": "name", "format_string": "_{value}_"},
+            ),
+        ]
+
+        # act
+        result = run_transformers(data, transformers)
+
+        # assert
+        self.assertIsInstance(result, pl.LazyFrame)
+        self.assertEqual("_test_", result.collect()["name"][0])
+
+    def test_transform__when_lazy_frame_has_no_columns__returns_data_as_is(self):
+        # arrange
+        data = pl.LazyFrame()
+        transformer = TransformerConfiguration(
+            "frames.filter", {"filter": {"active": True}}
+        )
+
+        # act
+        result = transformer.transform(data)
+
+        # assert
+        self.assertIsInstance(result, pl.LazyFrame)
+        self.assertEqual((0, 0), result.collect().shape)
+
+    def test_referenced_columns__collects_names_from_nested_configuration(self):
+        # arrange
+        transformers = [
+            TransformerConfiguration(
+                "frames.rename_columns", {"columns": [{"from": "a", "to": "b"}]}
+            ),
+            TransformerConfiguration(
+                "structs.jsonpath",
+                {"inField": "data.raw", "outField": "c", "jsonPath": "$.x"},
+            ),
+        ]
+
+        # act
+        result = referenced_columns(transformers)
+
+        # assert
+        self.assertTrue({"a", "b", "c", "data"} <= result)
+
+    def test_referenced_columns__when_transformer_reads_all_columns__returns_none(
+        self,
+    ):
+        # arrange
+        transformers = [
+            TransformerConfiguration("strings.lowercase", {"inField": "name"}),
+            TransformerConfiguration("frames.distinct", {}),
+        ]
+
+        # act
+        result = referenced_columns(transformers)
+
+        # assert
+        self.assertIsNone(result)
+
+    def test_referenced_columns__when_distinct_names_columns__returns_the_columns(
+        self,
+    ):
+        # arrange
+        transformers = [
+            TransformerConfiguration("frames.distinct", {"columns": ["id"]}),
+        ]
+
+        # act
+        result = referenced_columns(transformers)
+
+        # assert
+        self.assertEqual({"id", "columns"}, result)
+
+    def test_leading_filters__stops_at_the_first_other_transformer(self):
+        # arrange
+        transformers = [
+            TransformerConfiguration("frames.filter", {"filter": {"active": True}}),
+            TransformerConfiguration("strings.lowercase", {"inField": "name"}),
+            TransformerConfiguration("frames.filter", {"filter": {"name": "a"}}),
+        ]
+
+        # act
+        result = leading_filters(transformers)
+
+        # assert
+        self.assertEqual([ColumnFilter("active", True)], result)